@@ -7,7 +7,11 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN, PLATFORMS
+from .account import async_release_account
 from .coordinator import KoolnovaDataUpdateCoordinator
+from .recorder import KoolnovaSnapshotRecorder
+from .schedule import schedule_store
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,13 +23,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Only do first refresh if data is empty (initial setup)
     if not coordinator.data or not coordinator.data.get("projects"):
-        await coordinator.async_config_entry_first_refresh()
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            await async_release_account(hass, entry.entry_id, entry.data["email"])
+            raise
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Programacion semanal: un unico temporizador hasta la siguiente transicion
+    await coordinator.scheduler.async_load()
+    entry.async_on_unload(coordinator.scheduler.async_stop)
+    entry.async_on_unload(coordinator.verifier.async_stop)
+
+    # Canal push opcional; el poll sigue como respaldo
+    await coordinator.async_start_update_sources()
+    entry.async_on_unload(coordinator.async_stop_update_sources)
+
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Register integration services (shared by all entries)
+    async_setup_services(hass)
+
     # Listen for options updates
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
@@ -35,9 +55,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_unload_services(hass)
+        await async_release_account(hass, entry.entry_id, entry.data["email"])
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the snapshot files and the weekly program of a removed entry."""
+    await hass.async_add_executor_job(KoolnovaSnapshotRecorder(hass, entry.entry_id).remove_files)
+    await schedule_store(hass, entry.entry_id).async_remove()
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry when options change."""
     coordinator = hass.data[DOMAIN].get(entry.entry_id)
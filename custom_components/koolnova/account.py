@@ -0,0 +1,505 @@
+"""Per-account resources shared by every config entry of the same Koolnova account."""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .koolnova_api.client import KoolnovaAPIRestClient
+from .koolnova_api.deadline import Deadline
+from .koolnova_api.exceptions import KoolnovaBusyError, KoolnovaCircuitOpenError, KoolnovaTimeoutError
+from .breaker import KoolnovaCircuitBreaker
+
+from .const import (
+    DOMAIN,
+    DATA_ACCOUNTS,
+    COMMAND_MIN_INTERVAL,
+    COMMAND_MAX_QUEUE,
+    ACCOUNT_RELEASE_GRACE,
+    PRIORITY_BACKGROUND_MAX_WAIT,
+    EXECUTOR_MAX_WORKERS,
+    EXECUTOR_MAX_QUEUE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KoolnovaExecutor:
+    """Small thread pool of an account for its blocking Koolnova calls.
+
+    A slow or unreachable cloud holds every request until its deadline; in
+    Home Assistant's shared executor that would starve other integrations of
+    threads. Here it only fills EXECUTOR_MAX_WORKERS threads of our own.
+
+    Background jobs carry a key: a job whose key is already queued or running
+    joins that one instead of queueing a duplicate, and no new background job
+    is accepted while EXECUTOR_MAX_QUEUE jobs are waiting. Jobs whose
+    deadline ran out while queued are dropped without touching the network.
+    """
+
+    def __init__(self, max_workers: int = EXECUTOR_MAX_WORKERS, max_queue: int = EXECUTOR_MAX_QUEUE) -> None:
+        """Initialize the pool (threads are started on demand)."""
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="koolnova")
+        # Los contadores se actualizan desde los hilos del pool
+        self._lock = threading.Lock()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._queued = 0
+        self._running = 0
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "run_time": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of jobs waiting for a thread."""
+        return self._queued
+
+    async def async_run(self, func: Callable, *args, key: Optional[str] = None,
+                        deadline: Optional[Deadline] = None) -> Any:
+        """Run a blocking call in the pool and return its result.
+
+        Raises:
+            KoolnovaBusyError: if a background job finds the queue full.
+            KoolnovaTimeoutError: if the deadline ran out before a thread was free.
+        """
+        if key is not None:
+            future = self._pending.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return await asyncio.shield(future)
+            if self._queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise KoolnovaBusyError(f"Koolnova request queue full ({self._queued} waiting), skipping {key}")
+
+        queued_at = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self.stats["submitted"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queued)
+
+        def _job() -> Any:
+            started = time.monotonic()
+            wait = started - queued_at
+            with self._lock:
+                self._queued -= 1
+                self.stats["wait_time"] += wait
+                self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+                if deadline is not None and deadline.expired():
+                    self.stats["dropped"] += 1
+                    raise KoolnovaTimeoutError(f"Dropped after waiting {wait:.1f}s for a Koolnova worker")
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.stats["run_time"] += time.monotonic() - started
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, _job)
+        except RuntimeError:
+            # Pool cerrado: el trabajo nunca llego a la cola
+            with self._lock:
+                self._queued -= 1
+            raise
+        if key is not None:
+            self._pending[key] = future
+
+            def _forget(done: asyncio.Future) -> None:
+                if self._pending.get(key) is done:
+                    del self._pending[key]
+
+            future.add_done_callback(_forget)
+        # shield: cancelar a quien espera no cancela el resultado compartido
+        return await asyncio.shield(future)
+
+    def shutdown(self) -> None:
+        """Discard queued jobs and let the running ones finish in the background."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the pool counters for diagnostics."""
+        started = self.stats["submitted"] - self._queued
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "queue_depth": self._queued,
+            "running": self._running,
+            "wait_time": round(self.stats["wait_time"], 3),
+            "mean_wait": round(self.stats["wait_time"] / started, 3) if started else None,
+            "max_wait": round(self.stats["max_wait"], 3),
+            "run_time": round(self.stats["run_time"], 3),
+        }
+
+
+class KoolnovaCommandRateLimiter:
+    """Serialize write commands and keep a minimum spacing between them.
+
+    A command carries a key (zone or project plus the attributes it writes):
+    one sent while another with the same key is still waiting replaces that
+    one's arguments, so dragging a slider sends only the latest value, and
+    every caller gets the result of the command actually sent. Once
+    COMMAND_MAX_QUEUE distinct commands are waiting new ones are refused
+    with KoolnovaBusyError, which says nothing about the API itself.
+    """
+
+    def __init__(self, min_interval: float = COMMAND_MIN_INTERVAL, max_queue: int = COMMAND_MAX_QUEUE) -> None:
+        """Initialize the limiter."""
+        self.min_interval = min_interval
+        self.max_queue = max_queue
+        self._lock = asyncio.Lock()
+        self._last_command = 0.0
+        self._queued = 0
+        self._waiting: dict[Hashable, dict[str, Any]] = {}
+        self.stats = {"sent": 0, "merged": 0, "rejected": 0}
+
+    async def async_run(self, executor: KoolnovaExecutor, func, *args, key: Optional[Hashable] = None,
+                        timeout: Optional[float] = None, guard: Optional[Callable] = None):
+        """Run a blocking API call in the account pool once the spacing allows it.
+
+        With a timeout the call receives a Deadline that starts when the
+        command is sent, so time spent queued behind other commands does not
+        count against it. `guard` (the account's circuit breaker) wraps the
+        send itself, so merged callers count as a single request.
+
+        Raises:
+            KoolnovaBusyError: if max_queue distinct commands are already waiting.
+        """
+        command = self._waiting.get(key) if key is not None else None
+        if command is not None:
+            command["args"] = args
+            self.stats["merged"] += 1
+        else:
+            if self._queued >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise KoolnovaBusyError(f"{self._queued} Koolnova commands waiting, refusing a new one")
+            command = {"args": args}
+            self._queued += 1
+            command["task"] = asyncio.get_running_loop().create_task(
+                self._async_send(executor, func, command, key, timeout, guard or contextlib.nullcontext)
+            )
+            # Consumir el error aunque todos los que esperaban se hayan cancelado
+            command["task"].add_done_callback(lambda task: task.cancelled() or task.exception())
+            if key is not None:
+                self._waiting[key] = command
+        # shield: cancelar a quien espera no cancela el comando de los demas
+        return await asyncio.shield(command["task"])
+
+    async def _async_send(self, executor: KoolnovaExecutor, func, command: dict, key: Optional[Hashable],
+                          timeout: Optional[float], guard: Callable):
+        """Wait for the turn of a command and send its latest arguments."""
+        async with self._lock:
+            # A partir de aqui los argumentos quedan fijados: otro comando igual hace cola aparte
+            self._queued -= 1
+            if key is not None and self._waiting.get(key) is command:
+                del self._waiting[key]
+            wait = self._last_command + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if timeout is not None:
+                func = functools.partial(func, deadline=Deadline(timeout))
+            with guard():
+                self.stats["sent"] += 1
+                try:
+                    return await executor.async_run(func, *command["args"])
+                finally:
+                    self._last_command = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the command counters for diagnostics."""
+        return {**self.stats, "waiting": self._queued}
+
+
+class KoolnovaRequestScheduler:
+    """Two priority lanes for the API requests of an account.
+
+    Interactive requests (commands from entities, scenes, schedules) never
+    wait for background work. Background requests (polls, verification
+    reads) wait until no interactive request is queued or in flight, up to
+    PRIORITY_BACKGROUND_MAX_WAIT seconds so polling is never starved. A
+    request already running in the executor cannot be interrupted, so polls
+    yield between their requests.
+    """
+
+    def __init__(self, max_wait: float = PRIORITY_BACKGROUND_MAX_WAIT) -> None:
+        """Initialize the scheduler."""
+        self.max_wait = max_wait
+        self._interactive = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.last_interactive: Optional[float] = None
+        self.stats = {
+            "interactive": 0,
+            "background_waits": 0,
+            "background_wait_time": 0.0,
+            "background_wait_timeouts": 0,
+        }
+
+    @property
+    def interactive_busy(self) -> bool:
+        """Return True while an interactive request is queued or running."""
+        return self._interactive > 0
+
+    @contextlib.asynccontextmanager
+    async def interactive(self):
+        """Run the enclosed requests in the interactive lane."""
+        self._interactive += 1
+        self.stats["interactive"] += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._interactive -= 1
+            self.last_interactive = time.monotonic()
+            if not self._interactive:
+                self._idle.set()
+
+    async def async_background_turn(self, max_wait: Optional[float] = None) -> None:
+        """Wait until the interactive lane is empty before a background request."""
+        if not self._interactive:
+            return
+        max_wait = self.max_wait if max_wait is None else max_wait
+        started = time.monotonic()
+        self.stats["background_waits"] += 1
+        try:
+            await asyncio.wait_for(self._idle.wait(), max_wait)
+        except asyncio.TimeoutError:
+            self.stats["background_wait_timeouts"] += 1
+            _LOGGER.debug("Background request proceeding after waiting %.1fs for commands", max_wait)
+        self.stats["background_wait_time"] += time.monotonic() - started
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the lane counters for diagnostics."""
+        return {
+            **self.stats,
+            "background_wait_time": round(self.stats["background_wait_time"], 3),
+            "interactive_in_flight": self._interactive,
+        }
+
+
+class KoolnovaAccount:
+    """Client, token, poll results and command budget of one Koolnova account.
+
+    Entries of the same account (e.g. after a migration, or one entry per
+    site) share a single authenticated client, so they log in once, and read
+    endpoints through a short-lived response cache, so they poll once per
+    interval between them. Each coordinator then filters the shared data down
+    to its own topics.
+    """
+
+    def __init__(self, hass: HomeAssistant, email: str, password: str,
+                 client: Optional[KoolnovaAPIRestClient] = None) -> None:
+        """Initialize the account, optionally with an already authenticated client."""
+        self.hass = hass
+        self.email = email
+        self.client = client or build_client(email, password)
+        self.executor = KoolnovaExecutor()
+        self.command_limiter = KoolnovaCommandRateLimiter()
+        self.request_scheduler = KoolnovaRequestScheduler()
+        self.breaker = KoolnovaCircuitBreaker()
+        self.entries: set[str] = set()
+        self.release_unsub = None
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._cache: dict[str, tuple[float, Any]] = {}
+        # Lecturas del flujo de configuracion que la siguiente lectura usa sin mirar su edad
+        self._handed_over: set[str] = set()
+
+    async def async_fetch(self, key: str, func: Callable[[], Any], max_age: float,
+                          deadline: Optional[Deadline] = None) -> Any:
+        """Run a read in the account pool unless another entry fetched it within max_age seconds.
+
+        A value handed over by the config flow is served once whatever its age.
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._cache.get(key)
+            handed_over = key in self._handed_over
+            self._handed_over.discard(key)
+            if cached is not None and (handed_over or time.monotonic() - cached[0] < max_age):
+                _LOGGER.debug("Reusing %s fetched %.1fs ago by another entry of %s",
+                              key, time.monotonic() - cached[0], self.email)
+                return cached[1]
+
+            data = await self.async_request(func, key=key, deadline=deadline)
+            self._cache[key] = (time.monotonic(), data)
+            return data
+
+    async def async_request(self, func: Callable, *args, key: Optional[str] = None,
+                            deadline: Optional[Deadline] = None) -> Any:
+        """Run a background API call in the account pool through the circuit breaker."""
+        with self._breaker_guard():
+            return await self.executor.async_run(func, *args, key=key, deadline=deadline)
+
+    async def async_command(self, func: Callable, *args, key: Optional[Hashable] = None,
+                            timeout: Optional[float] = None) -> Any:
+        """Send a write command through the command limiter and the circuit breaker.
+
+        Commands with the same key still waiting are merged and reach the
+        breaker once, when the latest arguments are actually sent.
+        """
+        return await self.command_limiter.async_run(
+            self.executor, func, *args, key=key, timeout=timeout, guard=self._breaker_guard
+        )
+
+    @contextlib.contextmanager
+    def _breaker_guard(self):
+        """Refuse the call while the circuit is open and report its outcome.
+
+        Raises:
+            KoolnovaCircuitOpenError: if the breaker does not let the call through.
+        """
+        if not self.breaker.allow_request():
+            raise KoolnovaCircuitOpenError(
+                f"Koolnova API unavailable, retry in {self.breaker.retry_in:.0f}s "
+                f"(last error: {self.breaker.last_error})"
+            )
+        try:
+            yield
+        except (asyncio.CancelledError, KoolnovaBusyError):
+            # Ni la sonda cancelada ni una cola local llena dicen nada de la API
+            self.breaker.release_probe()
+            raise
+        except Exception as err:
+            self.breaker.record_failure(err)
+            raise
+        self.breaker.record_success()
+
+    def hand_over(self, key: str) -> None:
+        """Let the next read of an endpoint reuse the cached value, however old.
+
+        The config flow lists the projects to choose the sites; the first
+        refresh of the entry it creates takes that list instead of fetching it
+        again, even if the user took minutes to submit the form.
+        """
+        if key in self._cache:
+            self._handed_over.add(key)
+
+    def cached(self, key: str, default: Any = None) -> Any:
+        """Return the last fetched (unfiltered) value of an endpoint."""
+        cached = self._cache.get(key)
+        return cached[1] if cached is not None else default
+
+    @callback
+    def async_discard_session(self, session: Any) -> None:
+        """Close a replaced HTTP session in the account pool, off the event loop."""
+        if session is not None:
+            self.hass.async_create_task(self.executor.async_run(session.close))
+
+    def close(self) -> None:
+        """Close the HTTP session."""
+        if self.client.session is not None:
+            self.client.session.close()
+            self.client.session = None
+
+    async def async_shutdown(self) -> None:
+        """Close the session in the pool, then stop its threads."""
+        try:
+            await self.executor.async_run(self.close)
+        finally:
+            self.executor.shutdown()
+
+
+def build_client(email: str, password: str) -> KoolnovaAPIRestClient:
+    """Create the API client used for an account (also by the config flow)."""
+    return KoolnovaAPIRestClient(username="", email=email, password=password)
+
+
+def _account_key(email: str) -> str:
+    """Normalize an account email for registry lookups."""
+    return email.strip().lower()
+
+
+@callback
+def async_get_account(hass: HomeAssistant, entry_id: str, email: str, password: str) -> KoolnovaAccount:
+    """Return the shared account for an email, creating it on first use."""
+    accounts: dict[str, KoolnovaAccount] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_ACCOUNTS, {})
+    key = _account_key(email)
+    account = accounts.get(key)
+    if account is None:
+        account = accounts[key] = KoolnovaAccount(hass, email, password)
+    elif account.client.password != password:
+        # Credenciales actualizadas (p. ej. reautenticacion): forzar nuevo login
+        account.client.password = password
+        account.client.credentials_changed()
+        old_session, account.client.session = account.client.session, None
+        account.async_discard_session(old_session)
+    if account.release_unsub is not None:
+        account.release_unsub()
+        account.release_unsub = None
+    if account.entries:
+        _LOGGER.info("Sharing Koolnova connection for %s with %d other entries", email, len(account.entries))
+    account.entries.add(entry_id)
+    return account
+
+
+@callback
+def async_adopt_client(hass: HomeAssistant, email: str, password: str,
+                       client: KoolnovaAPIRestClient) -> KoolnovaAccount:
+    """Hand a client authenticated by the config flow over to the account registry.
+
+    The entry created (or reloaded, on reauth) right after picks it up through
+    async_get_account, so setup does not log in a second time. If no entry
+    claims it within ACCOUNT_RELEASE_GRACE seconds the session is closed.
+    """
+    accounts: dict[str, KoolnovaAccount] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_ACCOUNTS, {})
+    key = _account_key(email)
+    account = accounts.get(key)
+    if account is None:
+        account = accounts[key] = KoolnovaAccount(hass, email, password, client)
+    else:
+        # Cuenta ya en uso (reautenticacion): sustituir credenciales y sesion
+        old_session = account.client.session
+        account.client.password = password
+        account.client.credentials_changed()
+        account.client.session = client.session
+        if old_session is not client.session:
+            account.async_discard_session(old_session)
+    if not account.entries:
+        _async_schedule_release(hass, key, account)
+    return account
+
+
+@callback
+def _async_schedule_release(hass: HomeAssistant, key: str, account: KoolnovaAccount) -> None:
+    """Drop an account without entries unless one joins within the grace period."""
+    if account.release_unsub is not None:
+        account.release_unsub()
+
+    @callback
+    def _release(_now) -> None:
+        account.release_unsub = None
+        accounts = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+        if not account.entries and accounts.get(key) is account:
+            accounts.pop(key)
+            hass.async_create_task(account.async_shutdown())
+
+    account.release_unsub = async_call_later(hass, ACCOUNT_RELEASE_GRACE, _release)
+
+
+async def async_release_account(hass: HomeAssistant, entry_id: str, email: str) -> None:
+    """Detach an entry from its account and drop the account when unused."""
+    accounts: dict[str, KoolnovaAccount] = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+    key = _account_key(email)
+    account = accounts.get(key)
+    if account is None:
+        return
+    account.entries.discard(entry_id)
+    if not account.entries:
+        # Mantener la sesion unos segundos: una recarga de la entrada la reutiliza
+        _async_schedule_release(hass, key, account)
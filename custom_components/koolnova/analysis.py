@@ -0,0 +1,101 @@
+"""Trend and anomaly detection over the zone history."""
+
+import time
+from typing import Any, Iterable, Optional
+
+from .const import (
+    ANALYSIS_TREND_WINDOW,
+    ANALYSIS_STUCK_WINDOW,
+    ANALYSIS_MIN_SAMPLES,
+    ANALYSIS_SETPOINT_TOLERANCE,
+    ANALYSIS_MIN_TREND,
+)
+from .history import KoolnovaHistory, ZoneHistory
+
+# Room_status "02" = zona apagada (ver KOOLNOVA_ZONE_STATUS_TO_HVAC)
+_STATUS_OFF = 2
+
+
+def analyze_zone(zone: ZoneHistory, now: float) -> Optional[dict[str, Any]]:
+    """Compute slope, time-to-setpoint and anomaly flags for one zone.
+
+    Constant time: the least squares sums of both windows and the time of the
+    last temperature change are kept by ZoneHistory as samples are appended,
+    so only the samples that expired since the previous call are touched.
+    """
+    zone.expire(now)
+    stuck_window = zone.windows[ANALYSIS_STUCK_WINDOW]
+    if not stuck_window.count:
+        return None
+    trend_window = zone.windows[ANALYSIS_TREND_WINDOW]
+
+    timestamps = zone.timestamps
+    origin = timestamps[zone.window_start(stuck_window)]
+    trend_first = zone.first_valid(trend_window)
+    n, sx, sy, sxx, sxy = trend_window.n, trend_window.sx, trend_window.sy, trend_window.sxx, trend_window.sxy
+
+    last = zone.last_index
+    current = zone.actual[last]
+    setpoint = zone.setpoint[last]
+    status = zone.status[last]
+
+    # Pendiente por minimos cuadrados, en grados/hora
+    slope = None
+    denominator = n * sxx - sx * sx
+    if n >= ANALYSIS_MIN_SAMPLES and denominator > 0:
+        slope = (n * sxy - sx * sy) / denominator * 3600
+
+    error = None
+    if current == current and setpoint == setpoint:
+        error = setpoint - current
+
+    time_to_setpoint = None
+    if error is not None:
+        if abs(error) <= ANALYSIS_SETPOINT_TOLERANCE:
+            time_to_setpoint = 0
+        elif slope is not None and abs(slope) >= ANALYSIS_MIN_TREND and (slope > 0) == (error > 0):
+            time_to_setpoint = round(error / slope * 60)  # minutos
+
+    # No alcanza la consigna: zona encendida, ventana de tendencia completa,
+    # lejos de la consigna y sin avanzar hacia ella.
+    trend_covered = trend_first is not None and timestamps[last] - trend_first >= ANALYSIS_TREND_WINDOW * 0.9
+    setpoint_unreachable = bool(
+        status != _STATUS_OFF
+        and trend_covered
+        and error is not None
+        and abs(error) > ANALYSIS_SETPOINT_TOLERANCE
+        and time_to_setpoint is None
+    )
+
+    # Sensor congelado: lectura identica durante toda la ventana de deteccion
+    stuck_covered = timestamps[last] - origin >= ANALYSIS_STUCK_WINDOW * 0.9
+    # (sin cambios desde la primera lectura valida de la ventana)
+    stuck_first = zone.first_valid(stuck_window)
+    sensor_stuck = bool(
+        stuck_covered
+        and stuck_window.n >= ANALYSIS_MIN_SAMPLES
+        and (zone.last_change is None or zone.last_change <= stuck_first)
+    )
+
+    return {
+        "temperature_trend": round(slope, 2) if slope is not None else None,
+        "time_to_setpoint": time_to_setpoint,
+        "setpoint_unreachable": setpoint_unreachable,
+        "sensor_stuck": sensor_stuck,
+    }
+
+
+def analyze_zones(
+    history: KoolnovaHistory, now: Optional[float] = None, room_ids: Optional[Iterable[int]] = None
+) -> dict[int, dict[str, Any]]:
+    """Run the analysis for the given zones of the history (all when None)."""
+    now = time.time() if now is None else now
+    zones = history.zones
+    if room_ids is not None:
+        zones = {room_id: zones[room_id] for room_id in room_ids if room_id in zones}
+    results = {}
+    for room_id, zone in zones.items():
+        result = analyze_zone(zone, now)
+        if result is not None:
+            results[room_id] = result
+    return results
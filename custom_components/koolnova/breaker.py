@@ -0,0 +1,178 @@
+"""Circuit breaker around the Koolnova API client.
+
+One breaker per account (see account.py): polls, verification reads, logins
+and commands of every entry share the client and its per-IP budget, so they
+all go through the same breaker.
+"""
+
+import logging
+import time
+from typing import Any, Optional
+
+from .koolnova_api.exceptions import (
+    KoolnovaAuthError,
+    KoolnovaConnectionError,
+    KoolnovaRateLimitError,
+    KoolnovaServerError,
+    KoolnovaTimeoutError,
+)
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_BASE_BACKOFF,
+    BREAKER_MAX_BACKOFF,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+ERROR_AUTH = "auth"
+ERROR_RATE_LIMIT = "rate_limit"
+ERROR_SERVER = "server"
+ERROR_TIMEOUT = "timeout"
+ERROR_CONNECTION = "connection"
+ERROR_OTHER = "other"
+
+# Clases de error que abren el circuito en el primer fallo: reintentar
+# agrava el problema (ban de IP por 429 o por logins fallidos, issue #4).
+_TRIP_IMMEDIATELY = {ERROR_AUTH, ERROR_RATE_LIMIT}
+
+
+def find_cause(err: BaseException, exc_type: type) -> Optional[BaseException]:
+    """Return the first exception of exc_type in the chain of err, if any."""
+    cause: Optional[BaseException] = err
+    while cause is not None:
+        if isinstance(cause, exc_type):
+            return cause
+        cause = cause.__cause__ or cause.__context__
+    return None
+
+
+def classify_error(err: BaseException) -> str:
+    """Return the error class of an exception raised by the client.
+
+    Follows the exception chain, since the coordinator wraps client errors
+    in UpdateFailed.
+    """
+    cause: Optional[BaseException] = err
+    while cause is not None:
+        if isinstance(cause, KoolnovaAuthError):
+            return ERROR_AUTH
+        if isinstance(cause, KoolnovaRateLimitError):
+            return ERROR_RATE_LIMIT
+        if isinstance(cause, KoolnovaServerError):
+            return ERROR_SERVER
+        if isinstance(cause, KoolnovaTimeoutError):
+            return ERROR_TIMEOUT
+        if isinstance(cause, KoolnovaConnectionError):
+            return ERROR_CONNECTION
+        cause = cause.__cause__ or cause.__context__
+    return ERROR_OTHER
+
+
+class KoolnovaCircuitBreaker:
+    """Stop calling the API during outages and probe it on a backoff.
+
+    - closed: requests flow; consecutive failures are counted per error class.
+    - open: after BREAKER_FAILURE_THRESHOLD consecutive failures (or a single
+      auth/rate limit failure) no request is made until the backoff expires.
+    - half_open: one probe request is allowed; success closes the circuit,
+      failure re-opens it with a doubled backoff (up to BREAKER_MAX_BACKOFF).
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 base_backoff: float = BREAKER_BASE_BACKOFF,
+                 max_backoff: float = BREAKER_MAX_BACKOFF) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.error_counts: dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self.last_error_class: Optional[str] = None
+        self.opened_at: Optional[float] = None
+        self._backoff = base_backoff
+        self._next_probe = 0.0
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now (moving to half-open if due)."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._next_probe:
+            _LOGGER.debug("Circuit half-open: probing Koolnova API")
+            self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    @property
+    def blocked(self) -> bool:
+        """Return True if allow_request() would refuse now (without changing the state)."""
+        if self.state == STATE_HALF_OPEN:
+            return True
+        return self.state == STATE_OPEN and time.monotonic() < self._next_probe
+
+    def release_probe(self) -> None:
+        """Give the probe back when it was cancelled before getting an answer."""
+        if self.state == STATE_HALF_OPEN:
+            # _next_probe ya paso: la siguiente peticion hace de sonda
+            self.state = STATE_OPEN
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Koolnova API reachable again; circuit closed")
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._backoff = self.base_backoff
+
+    def record_failure(self, err: BaseException) -> str:
+        """Count a failure and open the circuit when needed; returns its error class."""
+        error_class = classify_error(err)
+        self.error_counts[error_class] = self.error_counts.get(error_class, 0) + 1
+        self.consecutive_failures += 1
+        self.last_error = str(err)
+        self.last_error_class = error_class
+
+        if self.state == STATE_HALF_OPEN:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            self._open()
+        elif self.state == STATE_CLOSED and (
+            error_class in _TRIP_IMMEDIATELY or self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+        return error_class
+
+    def _open(self) -> None:
+        """Open the circuit until the next probe."""
+        if self.opened_at is None:
+            self.opened_at = time.time()
+        self.state = STATE_OPEN
+        self._next_probe = time.monotonic() + self._backoff
+        _LOGGER.warning(
+            "Koolnova API circuit open after %d failures (%s); next probe in %.0fs",
+            self.consecutive_failures, self.last_error_class, self._backoff,
+        )
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe (0 if requests are allowed)."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._next_probe - time.monotonic())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "error_counts": dict(self.error_counts),
+            "last_error_class": self.last_error_class,
+            "last_error": self.last_error,
+            "opened_at": self.opened_at,
+            "retry_in": round(self.retry_in, 1),
+        }
@@ -5,9 +5,9 @@
 import asyncio
 import logging
 import statistics
+import time
 from collections import Counter
 from datetime import datetime
-from requests.exceptions import HTTPError
 
 from homeassistant.components.climate import (
     ClimateEntity,
@@ -20,6 +20,8 @@ from homeassistant.components.climate import (
 )
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.const import UnitOfTemperature
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.components.persistent_notification import async_create
 
 from .const import (
@@ -40,8 +42,11 @@ from .const import (
     CONF_MIN_TEMP,
     CONF_MAX_TEMP,
     CONF_TEMP_PRECISION,
+    ZONE_REMOVAL_MISSED_POLLS,
+    ZONE_REMOVAL_MIN_AGE,
 )
 from .coordinator import KoolnovaDataUpdateCoordinator
+from .profiling import profiled_entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -57,11 +62,90 @@ async def async_setup_entry(hass, entry, async_add_entities):
     # Agregar sensor de conectividad único
     entities.append(KoolnovaConnectivitySensor(coordinator, entry))
 
+    zones = KoolnovaZoneDiscovery(hass, coordinator, entry, async_add_entities)
     for sensor in coordinator.data.get("sensors", []):
-        entities.append(KoolnovaZoneEntity(coordinator, entry, sensor))
+        entities.append(zones.create(sensor))
 
     async_add_entities(entities, update_before_add=False)
 
+    # Zonas nuevas/retiradas en el controlador sin recargar la integracion
+    entry.async_on_unload(coordinator.async_add_listener(zones.async_sync))
+
+
+class KoolnovaZoneDiscovery:
+    """Add and retire zone entities when the polled Room_id set changes.
+
+    Runs as a coordinator listener and only looks at the zones reported in
+    changed_zones (new zones have no previous watermark and removed ones
+    are included) plus the zones already missing, so polls without topology
+    changes cost a set lookup. A missing zone is unavailable until it comes
+    back; it is only removed after ZONE_REMOVAL_MISSED_POLLS consecutive
+    polls spanning at least ZONE_REMOVAL_MIN_AGE seconds.
+    """
+
+    def __init__(self, hass, coordinator, config_entry, async_add_entities):
+        """Initialize with the platform's add-entities callback."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.config_entry = config_entry
+        self.async_add_entities = async_add_entities
+        self.entities = {}
+        # Room_id -> {"since": monotonic, "polls": polls seguidos sin la zona, "poll": ultimo poll contado}
+        self.missing = {}
+
+    def create(self, sensor):
+        """Create (and track) the entity of a zone."""
+        entity = self.entities[sensor["Room_id"]] = KoolnovaZoneEntity(self.coordinator, self.config_entry, sensor)
+        return entity
+
+    @callback
+    def async_sync(self):
+        """Create entities for new zones and retire the ones missing for long enough."""
+        sensors = {sensor.get("Room_id"): sensor for sensor in self.coordinator.data.get("sensors", [])}
+        changed = self.coordinator.changed_zones
+        candidates = (set(sensors) | set(self.entities) if changed is None else set(changed)) | set(self.missing)
+
+        added = [self.create(sensors[room_id]) for room_id in candidates
+                 if room_id in sensors and room_id not in self.entities]
+        if added:
+            _LOGGER.info("Adding %d new Koolnova zone(s): %s", len(added),
+                         ", ".join(entity.name for entity in added))
+            self.async_add_entities(added)
+
+        for room_id in candidates:
+            if room_id in sensors:
+                if self.missing.pop(room_id, None) is not None:
+                    _LOGGER.info("Koolnova zone %s reported again", room_id)
+            elif room_id in self.entities:
+                self._async_count_missing(room_id)
+
+    def _async_count_missing(self, room_id):
+        """Count one more poll without a zone and remove its entity past the threshold."""
+        now = time.monotonic()
+        missing = self.missing.get(room_id)
+        if missing is None:
+            missing = self.missing[room_id] = {"since": now, "polls": 0, "poll": None}
+            _LOGGER.info("Koolnova zone %s not reported; marking %s unavailable",
+                         room_id, self.entities[room_id].entity_id)
+        # Solo cuentan los polls: los comandos y el push tambien avisan a los listeners
+        poll = self.coordinator.last_fresh_update
+        if poll != missing["poll"]:
+            missing["poll"] = poll
+            missing["polls"] += 1
+        if missing["polls"] < ZONE_REMOVAL_MISSED_POLLS or now - missing["since"] < ZONE_REMOVAL_MIN_AGE:
+            return
+
+        del self.missing[room_id]
+        entity = self.entities.pop(room_id)
+        _LOGGER.info("Koolnova zone %s missing from %d polls; removing %s",
+                     room_id, missing["polls"], entity.entity_id)
+        if entity.registry_entry is not None:
+            # Quitarla del registro tambien elimina la entidad de HA
+            er.async_get(self.hass).async_remove(entity.entity_id)
+        else:
+            self.hass.async_create_task(entity.async_remove(force_remove=True))
+
+@profiled_entity
 class KoolnovaProjectEntity(ClimateEntity):
     """Project entity with global control: temperature, project HVAC mode, zone fan speed, and zone HVAC mode."""
 
@@ -168,12 +252,21 @@ class KoolnovaProjectEntity(ClimateEntity):
         return self._get_temp_precision()
 
     async def async_added_to_hass(self):
-        """Connect to coordinator."""
+        """Connect to the project coordinator and, for the zone aggregates, to the zone one."""
         await super().async_added_to_hass()
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.project_coordinator.async_add_listener(self.async_write_ha_state)
+        )
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_zones_update)
         )
 
+    @callback
+    def _handle_zones_update(self):
+        """Write the state unless no zone changed (watermarks unchanged)."""
+        if self.coordinator.changed_zones is None or self.coordinator.changed_zones:
+            self.async_write_ha_state()
+
     def _update_project_data(self):
         """Update local project data from coordinator."""
         for project in self.coordinator.data.get("projects", []):
@@ -229,7 +322,9 @@ class KoolnovaProjectEntity(ClimateEntity):
     def available(self):
         """Return if entity is available."""
         self._update_project_data()
-        return self._project.get("is_online", False) and self.coordinator.last_update_success
+        return (self._project.get("is_online", False)
+                and self.coordinator.project_coordinator.last_update_success
+                and self.coordinator.last_update_success)
 
     @property
     def extra_state_attributes(self):
@@ -273,6 +368,21 @@ class KoolnovaProjectEntity(ClimateEntity):
             "zones_fan_breakdown": zone_fan_breakdown,
         }
 
+        # Datos servidos desde cache (API caida o circuito abierto)
+        if self.coordinator.stale_since is not None:
+            attrs["stale_since"] = datetime.fromtimestamp(self.coordinator.stale_since)
+            attrs["api_circuit"] = self.coordinator.breaker.state
+
+        # Resumen del analisis de tendencias (calculado una vez por poll)
+        analysis = self.coordinator.analysis
+        if analysis:
+            attrs["zones_sensor_stuck"] = [
+                room_id for room_id, result in analysis.items() if result["sensor_stuck"]
+            ]
+            attrs["zones_setpoint_unreachable"] = [
+                room_id for room_id, result in analysis.items() if result["setpoint_unreachable"]
+            ]
+
         # Agregar datos de conectividad del sistema (desde sensores)
         if system_connectivity.get("system_rssi") is not None:
             attrs["system_rssi"] = system_connectivity["system_rssi"]
@@ -407,6 +517,7 @@ class KoolnovaProjectEntity(ClimateEntity):
             _LOGGER.error("Error setting global temperature: %s", err)
             async_create(self.hass, f"Error setting global temperature: {err}", title="Koolnova Global Temperature")
 
+@profiled_entity
 class KoolnovaZoneEntity(ClimateEntity):
     """Individual room zone as a climate device."""
 
@@ -466,18 +577,26 @@ class KoolnovaZoneEntity(ClimateEntity):
         """Connect to coordinator."""
         await super().async_added_to_hass()
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
         )
 
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state only if this zone changed (watermark moved)."""
+        changed = self.coordinator.changed_zones
+        if changed is None or self._sensor_id in changed:
+            self.async_write_ha_state()
+
     def _update_sensor_data(self):
-        """Update local sensor data from coordinator."""
+        """Update local sensor data from coordinator; return False if the zone is not reported."""
         if not self.coordinator.data or not isinstance(self.coordinator.data.get("sensors"), list):
-            return
-        
+            return False
+
         for sensor in self.coordinator.data.get("sensors", []):
             if sensor.get("Room_id") == self._sensor_id:
                 self._sensor = sensor
-                break
+                return True
+        return False
 
     @property
     def hvac_mode(self):
@@ -515,7 +634,8 @@ class KoolnovaZoneEntity(ClimateEntity):
     @property
     def available(self):
         """Return if entity is available."""
-        self._update_sensor_data()
+        if not self._update_sensor_data():
+            return False  # zona no reportada en el ultimo poll
         project_online = False
         if self.coordinator.data.get("projects"):
             project_online = self.coordinator.data["projects"][0].get("is_online", False)
@@ -535,7 +655,7 @@ class KoolnovaZoneEntity(ClimateEntity):
             except (ValueError, TypeError):
                 system_last_sync = topic_info["last_sync"]
 
-        return {
+        attrs = {
             "room_id": self._sensor.get("Room_id"),
             "room_status_raw": self._sensor.get("Room_status"),
             "room_speed_raw": self._sensor.get("Room_speed"),
@@ -544,6 +664,18 @@ class KoolnovaZoneEntity(ClimateEntity):
             "system_last_sync": system_last_sync,  # Última sync del sistema
         }
 
+        # Tendencia y anomalias (temperature_trend en grados/hora, time_to_setpoint en minutos)
+        analysis = self.coordinator.analysis.get(self._sensor_id)
+        if analysis:
+            attrs.update(analysis)
+
+        # Estado de la verificacion del ultimo comando (si esta activada)
+        verification = self.coordinator.verifier.results.get(self._sensor_id)
+        if verification:
+            attrs["command_verification"] = verification["state"]
+
+        return attrs
+
     async def async_set_temperature(self, **kwargs):
         """Set target temperature."""
         temp = kwargs.get("temperature")
@@ -606,6 +738,7 @@ class KoolnovaZoneEntity(ClimateEntity):
             async_create(self.hass, f"Error updating zone HVAC mode: {err}", title="Koolnova")
 
 
+@profiled_entity
 class KoolnovaConnectivitySensor(SensorEntity):
     """Sensor único con toda la información de conectividad del sistema Koolnova."""
 
@@ -624,9 +757,15 @@ class KoolnovaConnectivitySensor(SensorEntity):
         """Connect to coordinator."""
         await super().async_added_to_hass()
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
         )
 
+    @callback
+    def _handle_coordinator_update(self):
+        """Write the state unless no zone changed (watermarks unchanged)."""
+        if self.coordinator.changed_zones is None or self.coordinator.changed_zones:
+            self.async_write_ha_state()
+
     @property
     def state(self):
         """Estado: Online/Offline basado en el sistema."""
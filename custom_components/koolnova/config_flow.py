@@ -11,17 +11,18 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
 from homeassistant.components.climate import HVACMode
 
-from .koolnova_api.client import KoolnovaAPIRestClient
-from .koolnova_api.exceptions import KoolnovaError
+from .koolnova_api.exceptions import KoolnovaAuthError, KoolnovaError
+from .account import build_client, async_adopt_client
 
 from .const import (
     DOMAIN,
     DEFAULT_UPDATE_INTERVAL,
     MIN_UPDATE_INTERVAL,
     MAX_UPDATE_INTERVAL,
+    DEFAULT_PROJECT_UPDATE_INTERVAL,
+    MIN_PROJECT_UPDATE_INTERVAL,
+    MAX_PROJECT_UPDATE_INTERVAL,
     DEFAULT_PROJECT_UPDATE_FREQUENCY,
-    MIN_PROJECT_UPDATE_FREQUENCY,
-    MAX_PROJECT_UPDATE_FREQUENCY,
     DEFAULT_PROJECT_HVAC_MODES,
     DEFAULT_ZONE_HVAC_MODES,
     DEFAULT_MIN_TEMP,
@@ -32,12 +33,36 @@ from .const import (
     AVAILABLE_HVAC_MODES,
     AVAILABLE_TEMP_PRECISIONS,
     CONF_UPDATE_INTERVAL,
+    CONF_PROJECT_UPDATE_INTERVAL,
     CONF_PROJECT_UPDATE_FREQUENCY,
     CONF_PROJECT_HVAC_MODES,
     CONF_ZONE_HVAC_MODES,
     CONF_MIN_TEMP,
     CONF_MAX_TEMP,
     CONF_TEMP_PRECISION,
+    CONF_EVENT_MODE,
+    CONF_EVENT_AGGREGATE_POLLS,
+    DEFAULT_EVENT_MODE,
+    DEFAULT_EVENT_AGGREGATE_POLLS,
+    MIN_EVENT_AGGREGATE_POLLS,
+    MAX_EVENT_AGGREGATE_POLLS,
+    AVAILABLE_EVENT_MODES,
+    CONF_VERIFY_COMMANDS,
+    DEFAULT_VERIFY_COMMANDS,
+    CONF_TOPIC_IDS,
+    CONF_POLL_TIMEOUT,
+    CONF_COMMAND_TIMEOUT,
+    CONF_AUTH_TIMEOUT,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_AUTH_TIMEOUT,
+    MIN_OPERATION_TIMEOUT,
+    MAX_OPERATION_TIMEOUT,
+    CONF_PROFILING,
+    DEFAULT_PROFILING,
+    CONF_PUSH_URL,
+    CONF_RECORD_SNAPSHOTS,
+    DEFAULT_RECORD_SNAPSHOTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -49,11 +74,29 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PASSWORD): str,
+    }
+)
+
+def _entry_topics(entry: config_entries.ConfigEntry) -> list:
+    """Return the topic ids an entry is limited to (empty = every project)."""
+    return entry.options.get(CONF_TOPIC_IDS, entry.data.get(CONF_TOPIC_IDS, []))
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Koolnova."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._user_input: Dict[str, Any] = {}
+        self._title = ""
+        self._account = None
+        self._topics: Optional[Dict[str, str]] = None
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
@@ -66,6 +109,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         errors = {}
 
+        # Comprobar duplicados antes de validar: evita un login innecesario.
+        # Una entrada sin topic_ids cubre todos los proyectos de la cuenta.
+        if any(not _entry_topics(entry) for entry in self._account_entries(user_input[CONF_EMAIL])):
+            return self.async_abort(reason="already_configured")
+
         try:
             info = await self._validate_input(user_input)
         except CannotConnect:
@@ -76,23 +124,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown"
         else:
-            await self.async_set_unique_id(user_input[CONF_EMAIL])
-            self._abort_if_unique_id_configured()
-            
-            # Configuracion inicial con valores por defecto
-            config_data = {
-                CONF_EMAIL: user_input[CONF_EMAIL],
-                CONF_PASSWORD: user_input[CONF_PASSWORD],
-                CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
-                CONF_PROJECT_UPDATE_FREQUENCY: DEFAULT_PROJECT_UPDATE_FREQUENCY,
-                CONF_PROJECT_HVAC_MODES: [mode.value for mode in DEFAULT_PROJECT_HVAC_MODES],
-                CONF_ZONE_HVAC_MODES: [mode.value for mode in DEFAULT_ZONE_HVAC_MODES],
-                CONF_MIN_TEMP: DEFAULT_MIN_TEMP,
-                CONF_MAX_TEMP: DEFAULT_MAX_TEMP,
-                CONF_TEMP_PRECISION: DEFAULT_TEMP_PRECISION,
-            }
-
-            return self.async_create_entry(title=info["title"], data=config_data)
+            self._user_input = user_input
+            self._title = info["title"]
+            return await self.async_step_sites()
 
         return self.async_show_form(
             step_id="user", 
@@ -100,22 +134,136 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors
         )
 
+    async def async_step_sites(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Choose the projects (sites) of the new entry.
+
+        Each entry of an account covers its own projects, so the unique_id is
+        the email plus the chosen topics; an entry with every project is
+        keyed on the email alone, as before.
+        """
+        email = self._user_input[CONF_EMAIL]
+        errors = {}
+        if self._topics is None:
+            try:
+                # Queda en la cache de la cuenta: el primer refresco de la entrada la reutiliza
+                projects = await self._account.async_fetch("projects", self._account.client.get_project, 0)
+                self._account.hand_over("projects")
+            except Exception as err:
+                _LOGGER.error("Could not list the projects of %s: %s", email, err)
+                return self.async_show_form(
+                    step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors={"base": "cannot_connect"}
+                )
+            self._topics = {
+                str(project["Topic_id"]): f"{project['Project_Name']} ({project['Topic_Name']})"
+                for project in projects
+            }
+
+        claimed = set()
+        for entry in self._account_entries(email):
+            claimed.update(_entry_topics(entry))
+        available = {topic_id: name for topic_id, name in self._topics.items() if topic_id not in claimed}
+        if not available:
+            return self.async_abort(reason="already_configured")
+
+        if user_input is None and not claimed and len(available) == 1:
+            user_input = {CONF_TOPIC_IDS: list(available)}
+        if user_input is not None:
+            selected = sorted(topic_id for topic_id in user_input[CONF_TOPIC_IDS] if topic_id in available)
+            if not selected:
+                errors["base"] = "no_topics"
+            else:
+                every_topic = not claimed and len(selected) == len(self._topics)
+                await self.async_set_unique_id(email if every_topic else f"{email}_{'_'.join(selected)}")
+                self._abort_if_unique_id_configured()
+                # Configuracion inicial con valores por defecto
+                config_data = {
+                    CONF_EMAIL: email,
+                    CONF_PASSWORD: self._user_input[CONF_PASSWORD],
+                    CONF_UPDATE_INTERVAL: DEFAULT_UPDATE_INTERVAL,
+                    CONF_PROJECT_UPDATE_INTERVAL: DEFAULT_PROJECT_UPDATE_INTERVAL,
+                    CONF_PROJECT_HVAC_MODES: [mode.value for mode in DEFAULT_PROJECT_HVAC_MODES],
+                    CONF_ZONE_HVAC_MODES: [mode.value for mode in DEFAULT_ZONE_HVAC_MODES],
+                    CONF_MIN_TEMP: DEFAULT_MIN_TEMP,
+                    CONF_MAX_TEMP: DEFAULT_MAX_TEMP,
+                    CONF_TEMP_PRECISION: DEFAULT_TEMP_PRECISION,
+                }
+                title = self._title
+                if not every_topic:
+                    config_data[CONF_TOPIC_IDS] = selected
+                    title = f"{title} - {', '.join(available[topic_id] for topic_id in selected)}"
+                return self.async_create_entry(title=title, data=config_data)
+
+        return self.async_show_form(
+            step_id="sites",
+            data_schema=vol.Schema({
+                vol.Required(CONF_TOPIC_IDS, default=list(available)): cv.multi_select(available),
+            }),
+            description_placeholders={"email": email},
+            errors=errors,
+        )
+
+    def _account_entries(self, email: str) -> list:
+        """Return the entries already configured for an account."""
+        return [
+            entry for entry in self._async_current_entries(include_ignore=False)
+            if entry.data.get(CONF_EMAIL, "").strip().lower() == email.strip().lower()
+        ]
+
+    async def async_step_reauth(self, entry_data: Dict[str, Any]) -> FlowResult:
+        """Start reauthentication after the stored password was rejected."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Ask for the new password and validate it like the initial setup."""
+        errors = {}
+        entry = self._reauth_entry
+
+        if user_input is not None:
+            data = {CONF_EMAIL: entry.data[CONF_EMAIL], CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            try:
+                await self._validate_input(data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                self.hass.config_entries.async_update_entry(entry, data={**entry.data, **data})
+                await self.hass.config_entries.async_reload(entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={"email": entry.data[CONF_EMAIL]},
+            errors=errors,
+        )
+
     async def _validate_input(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate the user input allows us to connect."""
+        """Validate the credentials with a login only (no data download).
+
+        The authenticated client is handed over to the account registry, so
+        the entry set up next reuses its session instead of logging in again.
+        """
+        client = build_client(data[CONF_EMAIL], data[CONF_PASSWORD])
         try:
-            client = KoolnovaAPIRestClient(data[CONF_EMAIL], data[CONF_PASSWORD])
-            
-            # Test connection
-            await self.hass.async_add_executor_job(client.get_project)
-            
-        except KoolnovaError as err:
-            if "401" in str(err) or "authentication" in str(err).lower():
-                raise InvalidAuth
+            await self.hass.async_add_executor_job(client.authenticate)
+        except KoolnovaAuthError:
+            raise InvalidAuth
+        except KoolnovaError:
             raise CannotConnect
         except Exception as err:
             _LOGGER.error("Unexpected error validating credentials: %s", err)
             raise CannotConnect
 
+        self._account = async_adopt_client(self.hass, data[CONF_EMAIL], data[CONF_PASSWORD], client)
         return {"title": f"Koolnova ({data[CONF_EMAIL]})"}
 
     @staticmethod
@@ -160,21 +308,46 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         # Obtener valores actuales o por defecto
         current_interval = current_options.get(CONF_UPDATE_INTERVAL, current_data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL))
-        current_project_update_freq = current_options.get(CONF_PROJECT_UPDATE_FREQUENCY, current_data.get(CONF_PROJECT_UPDATE_FREQUENCY, DEFAULT_PROJECT_UPDATE_FREQUENCY))
+        current_project_interval = current_options.get(CONF_PROJECT_UPDATE_INTERVAL, current_data.get(CONF_PROJECT_UPDATE_INTERVAL))
+        if current_project_interval is None:
+            # Entradas antiguas: convertir la frecuencia (polls de zonas) a segundos
+            current_project_interval = current_interval * current_options.get(
+                CONF_PROJECT_UPDATE_FREQUENCY, current_data.get(CONF_PROJECT_UPDATE_FREQUENCY, DEFAULT_PROJECT_UPDATE_FREQUENCY)
+            )
+        current_project_interval = min(max(current_project_interval, MIN_PROJECT_UPDATE_INTERVAL), MAX_PROJECT_UPDATE_INTERVAL)
         current_project_modes = current_options.get(CONF_PROJECT_HVAC_MODES, current_data.get(CONF_PROJECT_HVAC_MODES, [mode.value for mode in DEFAULT_PROJECT_HVAC_MODES]))
         current_zone_modes = current_options.get(CONF_ZONE_HVAC_MODES, current_data.get(CONF_ZONE_HVAC_MODES, [mode.value for mode in DEFAULT_ZONE_HVAC_MODES]))
         current_min_temp = current_options.get(CONF_MIN_TEMP, current_data.get(CONF_MIN_TEMP, DEFAULT_MIN_TEMP))
         current_max_temp = current_options.get(CONF_MAX_TEMP, current_data.get(CONF_MAX_TEMP, DEFAULT_MAX_TEMP))
         current_precision = current_options.get(CONF_TEMP_PRECISION, current_data.get(CONF_TEMP_PRECISION, DEFAULT_TEMP_PRECISION))
+        current_event_mode = current_options.get(CONF_EVENT_MODE, current_data.get(CONF_EVENT_MODE, DEFAULT_EVENT_MODE))
+        current_event_polls = current_options.get(CONF_EVENT_AGGREGATE_POLLS, current_data.get(CONF_EVENT_AGGREGATE_POLLS, DEFAULT_EVENT_AGGREGATE_POLLS))
+        current_verify = current_options.get(CONF_VERIFY_COMMANDS, current_data.get(CONF_VERIFY_COMMANDS, DEFAULT_VERIFY_COMMANDS))
+        current_topic_ids = current_options.get(CONF_TOPIC_IDS, current_data.get(CONF_TOPIC_IDS, []))
+        current_poll_timeout = current_options.get(CONF_POLL_TIMEOUT, current_data.get(CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT))
+        current_command_timeout = current_options.get(CONF_COMMAND_TIMEOUT, current_data.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT))
+        current_auth_timeout = current_options.get(CONF_AUTH_TIMEOUT, current_data.get(CONF_AUTH_TIMEOUT, DEFAULT_AUTH_TIMEOUT))
+        current_profiling = current_options.get(CONF_PROFILING, current_data.get(CONF_PROFILING, DEFAULT_PROFILING))
+        current_push_url = current_options.get(CONF_PUSH_URL, current_data.get(CONF_PUSH_URL, ""))
+        current_record = current_options.get(CONF_RECORD_SNAPSHOTS, current_data.get(CONF_RECORD_SNAPSHOTS, DEFAULT_RECORD_SNAPSHOTS))
+
+        # Proyectos conocidos de la cuenta (sin filtrar) para elegir los de esta entrada
+        available_topics = {}
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self.entry.entry_id)
+        if coordinator is not None:
+            for project in coordinator.account.cached("projects", []):
+                available_topics[str(project["Topic_id"])] = f"{project['Project_Name']} ({project['Topic_Name']})"
+        for topic_id in current_topic_ids:
+            available_topics.setdefault(topic_id, topic_id)
 
         return vol.Schema({
             vol.Required(CONF_UPDATE_INTERVAL, default=current_interval): vol.All(
                 cv.positive_int,
                 vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL)
             ),
-            vol.Required(CONF_PROJECT_UPDATE_FREQUENCY, default=current_project_update_freq): vol.All(
+            vol.Required(CONF_PROJECT_UPDATE_INTERVAL, default=current_project_interval): vol.All(
                 cv.positive_int,
-                vol.Range(min=MIN_PROJECT_UPDATE_FREQUENCY, max=MAX_PROJECT_UPDATE_FREQUENCY)
+                vol.Range(min=MIN_PROJECT_UPDATE_INTERVAL, max=MAX_PROJECT_UPDATE_INTERVAL)
             ),
             vol.Required(CONF_PROJECT_HVAC_MODES, default=current_project_modes): cv.multi_select({
                 mode.value: mode.value.title() for mode in AVAILABLE_HVAC_MODES
@@ -191,6 +364,28 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Range(min=MIN_CONFIGURABLE_TEMP, max=MAX_CONFIGURABLE_TEMP)
             ),
             vol.Required(CONF_TEMP_PRECISION, default=current_precision): vol.In(AVAILABLE_TEMP_PRECISIONS),
+            vol.Required(CONF_EVENT_MODE, default=current_event_mode): vol.In(AVAILABLE_EVENT_MODES),
+            vol.Required(CONF_EVENT_AGGREGATE_POLLS, default=current_event_polls): vol.All(
+                cv.positive_int,
+                vol.Range(min=MIN_EVENT_AGGREGATE_POLLS, max=MAX_EVENT_AGGREGATE_POLLS)
+            ),
+            vol.Required(CONF_VERIFY_COMMANDS, default=current_verify): cv.boolean,
+            vol.Optional(CONF_TOPIC_IDS, default=current_topic_ids): cv.multi_select(available_topics),
+            vol.Required(CONF_POLL_TIMEOUT, default=current_poll_timeout): vol.All(
+                cv.positive_int,
+                vol.Range(min=MIN_OPERATION_TIMEOUT, max=MAX_OPERATION_TIMEOUT)
+            ),
+            vol.Required(CONF_COMMAND_TIMEOUT, default=current_command_timeout): vol.All(
+                cv.positive_int,
+                vol.Range(min=MIN_OPERATION_TIMEOUT, max=MAX_OPERATION_TIMEOUT)
+            ),
+            vol.Required(CONF_AUTH_TIMEOUT, default=current_auth_timeout): vol.All(
+                cv.positive_int,
+                vol.Range(min=MIN_OPERATION_TIMEOUT, max=MAX_OPERATION_TIMEOUT)
+            ),
+            vol.Required(CONF_PROFILING, default=current_profiling): cv.boolean,
+            vol.Optional(CONF_PUSH_URL, default=current_push_url): str,
+            vol.Required(CONF_RECORD_SNAPSHOTS, default=current_record): cv.boolean,
         })
 
 class CannotConnect(Exception):
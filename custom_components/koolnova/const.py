@@ -18,9 +18,11 @@ PLATFORMS = ["climate"]
 DEFAULT_UPDATE_INTERVAL = 30  # segundos
 MIN_UPDATE_INTERVAL = 30      # minimo configurable (limite impuesto por Koolnova)
 MAX_UPDATE_INTERVAL = 3600    # maximo configurable
-DEFAULT_PROJECT_UPDATE_FREQUENCY = 10  # cada cuantas actualizaciones se actualizan proyectos
-MIN_PROJECT_UPDATE_FREQUENCY = 1      # minimo configurable (siempre actualizar)
-MAX_PROJECT_UPDATE_FREQUENCY = 300    # maximo configurable
+DEFAULT_PROJECT_UPDATE_INTERVAL = 300  # segundos; proyectos con su propio coordinator
+MIN_PROJECT_UPDATE_INTERVAL = 30       # mismo limite de Koolnova que las zonas
+MAX_PROJECT_UPDATE_INTERVAL = 86400    # maximo configurable
+# Entradas antiguas: proyectos cada N polls de zonas (se convierte a segundos)
+DEFAULT_PROJECT_UPDATE_FREQUENCY = 10
 
 DEFAULT_PROJECT_HVAC_MODES = [HVACMode.COOL, HVACMode.HEAT]
 DEFAULT_ZONE_HVAC_MODES = [HVACMode.OFF, HVACMode.AUTO]
@@ -37,12 +39,57 @@ AVAILABLE_TEMP_PRECISIONS = [0.5, 1.0]
 
 # Claves de configuracion
 CONF_UPDATE_INTERVAL = "update_interval"
-CONF_PROJECT_UPDATE_FREQUENCY = "project_update_frequency"
+CONF_PROJECT_UPDATE_INTERVAL = "project_update_interval"
+CONF_PROJECT_UPDATE_FREQUENCY = "project_update_frequency"  # obsoleta
 CONF_PROJECT_HVAC_MODES = "project_hvac_modes"
 CONF_ZONE_HVAC_MODES = "zone_hvac_modes"
 CONF_MIN_TEMP = "min_temp"
 CONF_MAX_TEMP = "max_temp"
 CONF_TEMP_PRECISION = "temp_precision"
+CONF_EVENT_MODE = "event_mode"
+CONF_EVENT_AGGREGATE_POLLS = "event_aggregate_polls"
+CONF_VERIFY_COMMANDS = "verify_commands"
+CONF_TOPIC_IDS = "topic_ids"
+CONF_POLL_TIMEOUT = "poll_timeout"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_AUTH_TIMEOUT = "auth_timeout"
+CONF_PROFILING = "profiling"
+CONF_PUSH_URL = "push_url"
+CONF_RECORD_SNAPSHOTS = "record_snapshots"
+
+# Evento disparado en el bus de HA tras cada actualizacion del coordinator
+EVENT_UPDATE_COMPLETED = "koolnova_update_completed"
+
+# Politicas de disparo del evento koolnova_update_completed:
+# - all: un evento por cada poll (comportamiento historico)
+# - on_change: solo cuando cambia el resultado (datos, exito/fallo o error)
+# - aggregate: un evento resumen cada N polls con contadores y latencias
+# - off: nunca se dispara
+EVENT_MODE_ALL = "all"
+EVENT_MODE_ON_CHANGE = "on_change"
+EVENT_MODE_AGGREGATE = "aggregate"
+EVENT_MODE_OFF = "off"
+AVAILABLE_EVENT_MODES = [EVENT_MODE_ALL, EVENT_MODE_ON_CHANGE, EVENT_MODE_AGGREGATE, EVENT_MODE_OFF]
+DEFAULT_EVENT_MODE = EVENT_MODE_ALL
+DEFAULT_EVENT_AGGREGATE_POLLS = 10
+MIN_EVENT_AGGREGATE_POLLS = 2
+MAX_EVENT_AGGREGATE_POLLS = 1000
+
+# Verificacion de comandos con lecturas por zona (desactivada por defecto)
+DEFAULT_VERIFY_COMMANDS = False
+
+# Presupuesto de tiempo (segundos) por operacion, reintentos incluidos
+DEFAULT_POLL_TIMEOUT = 25     # lectura periodica completa (proyectos + zonas)
+DEFAULT_COMMAND_TIMEOUT = 15  # un comando de escritura
+DEFAULT_AUTH_TIMEOUT = 90     # un login (incluye esperas por 429)
+MIN_OPERATION_TIMEOUT = 5
+MAX_OPERATION_TIMEOUT = 300
+
+# Perfilado de listeners/escrituras de estado/propiedades (ver profiling.py)
+DEFAULT_PROFILING = False
+PROFILING_MAX_PATHS = 200         # rutas distintas como maximo
+PROFILING_SAMPLES_PER_PATH = 64   # duraciones recientes por ruta (para el p95)
+PROFILING_TOP_N = 20              # rutas mas lentas expuestas en diagnosticos
 
 # HVAC Mode mappings para proyectos - OPTIMIZADO: Solo definicion principal
 KOOLNOVA_TO_HVAC_MODE = {
@@ -77,6 +124,106 @@ KOOLNOVA_TO_FAN = {
 # Generar mapeo inverso automaticamente para fan speed
 FAN_TO_KOOLNOVA = {v: k for k, v in KOOLNOVA_TO_FAN.items()}
 
+# Historico local de zonas (ring buffer en memoria, ver history.py)
+# 2880 muestras = 24 h a 30 s por poll (~18 bytes por muestra y zona)
+DEFAULT_HISTORY_CAPACITY = 2880
+DEFAULT_HISTORY_WINDOW = 3600  # segundos
+
+# Analisis de tendencias y anomalias sobre el historico (ver analysis.py)
+ANALYSIS_TREND_WINDOW = 3600        # segundos usados para la pendiente
+ANALYSIS_STUCK_WINDOW = 3 * 3600    # segundos sin cambios para marcar sensor congelado
+ANALYSIS_MIN_SAMPLES = 5            # muestras minimas para calcular pendiente/anomalias
+ANALYSIS_SETPOINT_TOLERANCE = 0.5   # grados de margen para considerar alcanzada la consigna
+ANALYSIS_MIN_TREND = 0.1            # grados/hora minimos para estimar tiempo a consigna
+ANALYSIS_REFRESH_INTERVAL = 600     # segundos maximos sin reanalizar las zonas sin datos nuevos
+
+# Registro de cuentas compartidas en hass.data[DOMAIN] (ver account.py)
+DATA_ACCOUNTS = "accounts"
+# Un poll de otra entrada de la misma cuenta se reutiliza si tiene menos de
+# esta fraccion del intervalo de actualizacion
+ACCOUNT_CACHE_MAX_AGE_RATIO = 0.9
+# Segundos que se conserva la sesion de una cuenta sin entradas (recargas,
+# cliente validado por el config flow pendiente de su entrada)
+ACCOUNT_RELEASE_GRACE = 60
+# Pool de hilos propio de cada cuenta para las llamadas bloqueantes: un
+# Koolnova caido solo ocupa estos hilos y no el executor compartido de HA
+EXECUTOR_MAX_WORKERS = 3    # proyectos y zonas en paralelo mas un comando
+EXECUTOR_MAX_QUEUE = 8      # trabajos de fondo en cola antes de rechazar nuevos
+
+# Una zona que deja de aparecer queda no disponible y solo se retira (del
+# registro de entidades) tras faltar en ZONE_REMOVAL_MISSED_POLLS polls
+# consecutivos y al menos ZONE_REMOVAL_MIN_AGE segundos: una respuesta
+# parcial no borra el entity_id, nombre ni area del usuario
+ZONE_REMOVAL_MISSED_POLLS = 5
+ZONE_REMOVAL_MIN_AGE = 3600
+
+# Circuit breaker del cliente (ver breaker.py)
+BREAKER_FAILURE_THRESHOLD = 3   # fallos consecutivos (5xx, timeouts, red) para abrir
+BREAKER_BASE_BACKOFF = 60       # segundos hasta la primera sonda half-open
+BREAKER_MAX_BACKOFF = 900       # tope del backoff entre sondas
+
+# Servicios
+SERVICE_GET_ZONE_HISTORY = "get_zone_history"
+SERVICE_APPLY_SCENE = "apply_scene"
+SERVICE_SET_SCHEDULE = "set_schedule"
+SERVICE_CLEAR_SCHEDULE = "clear_schedule"
+ATTR_ROOM_ID = "room_id"
+ATTR_WINDOW = "window"
+ATTR_ZONES = "zones"
+ATTR_TRANSITIONS = "transitions"
+ATTR_DAYS = "days"
+ATTR_TIME = "time"
+
+# Grabacion de snapshots en disco (ver recorder.py): 2 segmentos de
+# SNAPSHOT_SEGMENT_RECORDS lineas (12 h cada uno con polls de 30 s).
+# Desactivada por defecto: escribe en disco en cada poll, se activa en opciones
+DEFAULT_RECORD_SNAPSHOTS = False
+SNAPSHOT_SEGMENT_RECORDS = 1440
+SNAPSHOT_FORMAT = 1
+
+# Programacion semanal (ver schedule.py)
+SCHEDULE_STORAGE_VERSION = 1
+
 # Retry constants (no configurables)
 MAX_RETRY_ATTEMPTS = 3
 RETRY_DELAY_BASE = 2
+
+# Separacion minima (segundos) entre comandos de escritura consecutivos
+COMMAND_MIN_INTERVAL = 1.0
+# Comandos distintos esperando su turno antes de rechazar nuevos (los que
+# repiten zona y atributos se fusionan y no cuentan)
+COMMAND_MAX_QUEUE = 16
+
+# Salto de poll: si las respuestas de comandos desde el ultimo poll ya han
+# refrescado esta fraccion de zonas, el siguiente poll se aplaza un intervalo
+# (nunca dos seguidos: ninguna zona supera POLL_SKIP_MAX_AGE_FACTOR intervalos)
+POLL_SKIP_FRESH_RATIO = 0.75
+POLL_SKIP_MAX_AGE_FACTOR = 2
+
+# Canal push opcional (ver update_source.py). Con el canal conectado el poll
+# solo se mantiene como red de seguridad cada PUSH_SAFETY_POLL_INTERVAL
+PUSH_SAFETY_POLL_INTERVAL = 600
+# Reconexiones y peticiones long-poll usan el token de la cuenta: nunca mas de
+# una cada 30 s, el mismo limite que los polls (issue #4)
+PUSH_RECONNECT_MIN_BACKOFF = 30
+PUSH_RECONNECT_MAX_BACKOFF = 300
+PUSH_IDLE_TIMEOUT = 120           # segundos sin datos antes de reconectar
+PUSH_LONG_POLL_MIN_INTERVAL = 30  # separacion minima entre peticiones long-poll
+
+# Espera maxima (segundos) de una peticion de fondo (poll, verificacion)
+# mientras haya comandos del usuario en cola o en curso
+PRIORITY_BACKGROUND_MAX_WAIT = 30
+
+# Campo del payload de escritura de zona -> clave en la cache de sensores
+SENSOR_PAYLOAD_TO_CACHE = {
+    "setpoint_temperature": "Room_setpoint_temp",
+    "status": "Room_status",
+    "speed": "Room_speed",
+}
+
+# Verificacion de comandos: segundos entre comprobaciones de la zona modificada.
+# Empieza en 30 s para no superar el limite de consultas de Koolnova (issue #4).
+VERIFY_BACKOFF = (30, 60, 120)
+# Las zonas que tocan comprobacion dentro de esta ventana (segundos) comparten
+# una sola lectura de topics/sensors/
+VERIFY_BATCH_WINDOW = 10
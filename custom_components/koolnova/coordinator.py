@@ -1,25 +1,92 @@
 """DataUpdateCoordinator for Koolnova."""
 
+import asyncio
+import functools
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
+from typing import Callable
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
-from .koolnova_api.client import KoolnovaAPIRestClient
-from .koolnova_api.exceptions import KoolnovaError
+from .koolnova_api.exceptions import (
+    KoolnovaBusyError,
+    KoolnovaCircuitOpenError,
+    KoolnovaError,
+    KoolnovaInvalidCredentialsError,
+)
+from .koolnova_api.deadline import Deadline
+from .account import async_get_account
+from .events import KoolnovaUpdateEventPolicy
+from .history import KoolnovaHistory
+from .analysis import analyze_zones
+from .schedule import KoolnovaScheduler
+from .verify import KoolnovaCommandVerifier, sensor_mismatch
+from .profiling import KoolnovaProfiler
+from .update_source import KoolnovaPollingSource, KoolnovaPushSource
+from .recorder import KoolnovaSnapshotRecorder
+from .breaker import STATE_OPEN, ERROR_AUTH, ERROR_RATE_LIMIT, classify_error, find_cause
 
 from .const import (
+    ANALYSIS_REFRESH_INTERVAL,
     CONF_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
     MIN_UPDATE_INTERVAL,
+    CONF_PROJECT_UPDATE_INTERVAL,
     CONF_PROJECT_UPDATE_FREQUENCY,
     DEFAULT_PROJECT_UPDATE_FREQUENCY,
+    MAX_PROJECT_UPDATE_INTERVAL,
+    CONF_EVENT_MODE,
+    DEFAULT_EVENT_MODE,
+    CONF_EVENT_AGGREGATE_POLLS,
+    DEFAULT_EVENT_AGGREGATE_POLLS,
+    CONF_ZONE_HVAC_MODES,
+    CONF_MIN_TEMP,
+    CONF_MAX_TEMP,
+    CONF_TEMP_PRECISION,
+    DEFAULT_ZONE_HVAC_MODES,
+    DEFAULT_MIN_TEMP,
+    DEFAULT_MAX_TEMP,
+    DEFAULT_TEMP_PRECISION,
+    HVAC_TO_KOOLNOVA_ZONE_STATUS,
+    FAN_TO_KOOLNOVA,
+    CONF_VERIFY_COMMANDS,
+    DEFAULT_VERIFY_COMMANDS,
+    CONF_TOPIC_IDS,
+    ACCOUNT_CACHE_MAX_AGE_RATIO,
+    CONF_POLL_TIMEOUT,
+    CONF_COMMAND_TIMEOUT,
+    CONF_AUTH_TIMEOUT,
+    DEFAULT_POLL_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_AUTH_TIMEOUT,
+    CONF_PROFILING,
+    DEFAULT_PROFILING,
+    POLL_SKIP_FRESH_RATIO,
+    POLL_SKIP_MAX_AGE_FACTOR,
+    CONF_PUSH_URL,
+    PUSH_SAFETY_POLL_INTERVAL,
+    CONF_RECORD_SNAPSHOTS,
+    DEFAULT_RECORD_SNAPSHOTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def zone_watermark(sensor: dict) -> tuple:
+    """Return the change watermark of a zone.
+
+    Room_update_at moves when the zone changes and topic_info.last_sync when
+    the controller pushes to the cloud; is_online is included because a
+    controller going offline stops syncing. Equal watermarks mean the zone
+    data cannot have changed.
+    """
+    topic_info = sensor.get("topic_info") or {}
+    return (sensor.get("Room_update_at"), topic_info.get("last_sync"), topic_info.get("is_online"))
+
+
 class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
     """Coordinator to fetch data from Koolnova API."""
 
@@ -51,27 +118,167 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=update_interval_seconds),
         )
 
-        self.client = KoolnovaAPIRestClient(
-            username="",
-            email=config_data["email"],
-            password=config_data["password"]
+        # Intervalo configurado; con un canal push conectado el efectivo es
+        # PUSH_SAFETY_POLL_INTERVAL (ver async_update_source_changed)
+        self._poll_interval = self.update_interval
+
+        # Cliente, token, polls y presupuesto de comandos compartidos por cuenta
+        self.account = async_get_account(
+            hass, config_entry.entry_id, config_data["email"], config_data["password"]
         )
+        self.client = self.account.client
         self.config_entry = config_entry
         self.data = {"projects": [], "sensors": []}
 
-        # Contador para actualizaciones periódicas de proyectos
-        self._project_update_counter = 0
-        self._project_update_frequency = options_data.get(
-            CONF_PROJECT_UPDATE_FREQUENCY,
-            config_data.get(CONF_PROJECT_UPDATE_FREQUENCY, DEFAULT_PROJECT_UPDATE_FREQUENCY)
+        # Proyectos con su propio coordinator (intervalo, fallos y listeners)
+        self.project_coordinator = KoolnovaProjectCoordinator(hass, self, self._get_project_interval())
+
+        # Politica de eventos koolnova_update_completed
+        self.events = KoolnovaUpdateEventPolicy(
+            hass,
+            config_entry.entry_id,
+            mode=self._get_config_value(CONF_EVENT_MODE, DEFAULT_EVENT_MODE),
+            aggregate_polls=self._get_config_value(
+                CONF_EVENT_AGGREGATE_POLLS, DEFAULT_EVENT_AGGREGATE_POLLS
+            ),
         )
 
-    def _fetch_data(self) -> dict:
-        """Fetch all data from Koolnova API. Called during initial setup."""
+        # Historico en memoria de temperaturas/setpoints por zona
+        self.history = KoolnovaHistory()
+        # Snapshots en disco (completo + deltas) para diagnosticos/reproduccion
+        self.recorder = KoolnovaSnapshotRecorder(hass, config_entry.entry_id)
+        self.recorder.enabled = self._get_config_value(CONF_RECORD_SNAPSHOTS, DEFAULT_RECORD_SNAPSHOTS)
+        # Resultado del analisis de tendencias por zona (Room_id -> dict)
+        self.analysis = {}
+        self._last_full_analysis = None
+
+        # Las llamadas bloqueantes van al pool de hilos de la cuenta
+        self.executor = self.account.executor
+        # Carriles de prioridad: comandos (interactivo) antes que polls (fondo)
+        self.request_scheduler = self.account.request_scheduler
+
+        # Observaciones por zona (poll, respuesta de comando o lectura dirigida)
+        # para saltar el siguiente poll si los comandos ya refrescaron casi todo
+        self._zone_observed = {}
+        self._last_poll = None
+        self._consecutive_skips = 0
+        self.polls_skipped = 0
+
+        # Ultima lista de zonas recibida del cliente y su version filtrada: si
+        # el cliente devuelve el mismo objeto (304 o cuerpo identico) se
+        # reutiliza sin filtrar ni comparar de nuevo
+        self._raw_sensors = None
+        self._filtered_sensors = []
+
+        # Zonas cambiadas en la ultima notificacion (None = todas); las
+        # entidades de zona sin cambios no escriben su estado
+        self.changed_zones = None
+        self.watermark_stats = {"changed": 0, "unchanged": 0}
+
+        # Circuit breaker de la cuenta (polls, lecturas, logins y comandos) y
+        # metadatos de antiguedad de los datos servidos
+        self.breaker = self.account.breaker
+        self.last_fresh_update = None
+        self.stale_since = None
+
+        # Topics (proyectos) visibles para esta entrada; vacio = todos
+        self._topic_ids = set(self._get_config_value(CONF_TOPIC_IDS, []))
+
+        # Presupuestos de tiempo por operacion (poll, comando, login)
+        self._load_timeouts()
+
+        # Programacion semanal (cargada en async_setup_entry)
+        self.scheduler = KoolnovaScheduler(hass, self, config_entry.entry_id)
+
+        # Verificacion opcional de comandos con lecturas por zona
+        self.verifier = KoolnovaCommandVerifier(hass, self)
+        self.verifier.enabled = self._get_config_value(CONF_VERIFY_COMMANDS, DEFAULT_VERIFY_COMMANDS)
+
+        # Fuentes de actualizacion: el poll propio y un canal push opcional
+        self.polling_source = KoolnovaPollingSource(hass, self)
+        self.push_source = None
+
+        # Perfilado opcional de listeners, escrituras de estado y propiedades
+        self.profiler = KoolnovaProfiler()
+        self.profiler.set_enabled(self._get_config_value(CONF_PROFILING, DEFAULT_PROFILING))
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context=None) -> Callable[[], None]:
+        """Register a listener, timed per entity while profiling is enabled."""
+        entity_id = getattr(getattr(update_callback, "__self__", None), "entity_id", None)
+        path = f"listener:{entity_id or getattr(update_callback, '__qualname__', 'unknown')}"
+        return super().async_add_listener(self.profiler.wrap(path, update_callback), context)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify all listeners, timing the whole dispatch while profiling is enabled."""
+        if not self.profiler.enabled:
+            super().async_update_listeners()
+            return
+        start = time.perf_counter()
+        super().async_update_listeners()
+        self.profiler.record("coordinator.async_update_listeners", time.perf_counter() - start)
+
+    def _get_config_value(self, key, default):
+        """Get configuration value from options or data."""
+        return self.config_entry.options.get(key, self.config_entry.data.get(key, default))
+
+    def _get_project_interval(self) -> timedelta:
+        """Return the project polling interval (legacy entries: N zone polls)."""
+        seconds = self._get_config_value(CONF_PROJECT_UPDATE_INTERVAL, None)
+        if seconds is None:
+            seconds = self._poll_interval.total_seconds() * self._get_config_value(
+                CONF_PROJECT_UPDATE_FREQUENCY, DEFAULT_PROJECT_UPDATE_FREQUENCY
+            )
+        return timedelta(seconds=min(max(seconds, MIN_UPDATE_INTERVAL), MAX_PROJECT_UPDATE_INTERVAL))
+
+    def _load_timeouts(self) -> None:
+        """Read the per-operation time budgets from the config entry."""
+        self.poll_timeout = self._get_config_value(CONF_POLL_TIMEOUT, DEFAULT_POLL_TIMEOUT)
+        self.command_timeout = self._get_config_value(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT)
+        self.client.auth_timeout = self._get_config_value(CONF_AUTH_TIMEOUT, DEFAULT_AUTH_TIMEOUT)
+
+    async def _async_fetch(self, key: str, func, max_age: float = None, deadline: Deadline = None):
+        """Read an endpoint through the account cache shared with other entries."""
+        if max_age is None:
+            max_age = self.update_interval.total_seconds() * ACCOUNT_CACHE_MAX_AGE_RATIO
+        return await self.account.async_fetch(key, func, max_age, deadline)
+
+    def _filter_projects(self, projects: list) -> list:
+        """Keep only the projects (topics) assigned to this entry."""
+        if not self._topic_ids:
+            return projects
+        return [project for project in projects if str(project.get("Topic_id")) in self._topic_ids]
+
+    def _filter_sensors(self, sensors: list) -> list:
+        """Keep only the zones of the topics assigned to this entry."""
+        if not self._topic_ids:
+            return sensors
+        return [sensor for sensor in sensors if str(sensor.get("Topic_id")) in self._topic_ids]
+
+    def _use_sensors(self, raw: list) -> list:
+        """Return the filtered zones of a response, reused when it did not change."""
+        if raw is not self._raw_sensors:
+            self._raw_sensors = raw
+            self._filtered_sensors = self._filter_sensors(raw)
+        return self._filtered_sensors
+
+    async def _async_fetch_data(self, deadline: Deadline) -> dict:
+        """Fetch projects and zones from Koolnova API. Called during initial setup."""
         try:
             _LOGGER.debug("Fetching all data from Koolnova API (initial setup)")
-            projects = self.client.get_project()
-            sensors = self.client.get_sensors()
+            # Log in once up front so both requests share the same session,
+            # then fetch both endpoints concurrently: the refresh takes as long
+            # as the slower call instead of the sum of both.
+            await self.account.async_request(self.client.authenticate, deadline, key="authenticate", deadline=deadline)
+            projects, sensors = await asyncio.gather(
+                self._async_fetch("projects", functools.partial(self.client.get_project, deadline=deadline),
+                                  deadline=deadline),
+                self._async_fetch("sensors", functools.partial(self.client.get_sensors, deadline=deadline),
+                                  deadline=deadline),
+            )
+            projects = self._filter_projects(projects)
+            sensors = self._use_sensors(sensors)
             _LOGGER.debug("Successfully fetched %d projects and %d sensors",
                          len(projects), len(sensors))
             return {"projects": projects, "sensors": sensors}
@@ -82,11 +289,13 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Unexpected error fetching data: %s", err)
             raise UpdateFailed(f"Unexpected error: {err}")
 
-    def _fetch_sensors_only(self) -> dict:
+    async def _async_fetch_sensors_only(self, deadline: Deadline) -> dict:
         """Fetch only sensors data from Koolnova API. Called during periodic updates."""
         try:
             _LOGGER.debug("Fetching sensors data from Koolnova API (periodic update)")
-            sensors = self.client.get_sensors()
+            sensors = self._use_sensors(await self._async_fetch(
+                "sensors", functools.partial(self.client.get_sensors, deadline=deadline), deadline=deadline
+            ))
             _LOGGER.debug("Successfully fetched %d sensors", len(sensors))
             # Keep existing projects data, only update sensors
             return {"projects": self.data.get("projects", []), "sensors": sensors}
@@ -99,144 +308,287 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def _async_update_data(self) -> dict:
         """
-        Update data asynchronously with intelligent polling strategy.
+        Update the zones (sensors) data.
 
-        This method implements a smart polling approach to optimize API usage:
         - FIRST RUN: Fetches complete data (projects + sensors) for initial setup
-        - PERIODIC UPDATES: Uses counter-based strategy for project updates
-          * Every Nth update: fetches projects + sensors (N = project_update_frequency)
-          * Other updates: fetches only sensors for efficiency
+          and hands the projects to the project coordinator
+        - PERIODIC UPDATES: fetch only sensors; projects are polled by
+          KoolnovaProjectCoordinator on their own interval and shared through
+          data["projects"] without waking zone listeners
 
         This optimization reduces API load since project data rarely changes,
         while sensor data (temperatures, status) updates frequently.
-        However, project mode is updated periodically to keep Global Control entity current.
 
-        Additionally, this method fires a "koolnova_update_completed" event after each update
-        with detailed information about the update type, success status, and data counts.
-        The event data includes:
-        - update_type: "initial", "full", "sensors_only", "cached", or "failed"
+        Every poll is reported to the event policy (see events.py), which fires
+        "koolnova_update_completed" according to the configured event mode:
+        on every poll ("all"), only when the result changes ("on_change"),
+        as a summary every N polls ("aggregate") or never ("off").
+        The per-poll event data includes:
+        - update_type: "initial", "sensors_only", "projects" (project poll),
+          "skipped" (recent commands already refreshed most zones), "cached",
+          or "failed"
         - success: boolean indicating if the update was successful
         - timestamp: timestamp of when the update occurred
         - entry_id: unique identifier for this integration instance
         - last_sync: timestamp of the last synchronization
-        - projects_count: number of projects (for full/initial updates)
-        - sensors_count: number of sensors (for full/sensors_only updates)
+        - projects_count: number of projects (for initial/projects updates)
+        - sensors_count: number of sensors (for initial/sensors_only updates)
         - error: error message (for failed updates)
 
         Returns:
             dict: Data structure with 'projects' and 'sensors' keys
         """
+        started = time.monotonic()
+        # Until the poll succeeds (failures flip availability) every entity writes
+        self.changed_zones = None
+
+        # Circuit breaker: during an outage serve the cached snapshot and only
+        # let a probe through once the backoff expires.
+        if self.breaker.blocked:
+            return self._serve_cached(
+                UpdateFailed(f"Koolnova API unavailable, retry in {self.breaker.retry_in:.0f}s "
+                             f"(last error: {self.breaker.last_error})"),
+                "circuit_open", 0.0,
+            )
+
+        # Recent command responses already refreshed most zones: push this
+        # poll back one interval instead of re-reading them.
+        if self._should_skip_poll():
+            self.polls_skipped += 1
+            self._consecutive_skips += 1
+            _LOGGER.debug("Skipping poll: zones refreshed by recent commands")
+            self.events.async_record("skipped", True, 0.0, self.data)
+            # Sin datos nuevos: ni notificar ni reanalizar
+            self.changed_zones = set()
+            return self.data
+
+        # Background lane: let queued/in-flight user commands go first. The
+        # poll's time budget starts once it actually gets its turn.
+        await self.request_scheduler.async_background_turn()
+
+        # One time budget for the whole poll, shared by its requests and retries
+        deadline = Deadline(self.poll_timeout)
+
         try:
             if self.data and self.data.get("projects"):
-                # PERIODIC UPDATE STRATEGY with project update counter
-                self._project_update_counter += 1
-
-                if self._project_update_counter >= self._project_update_frequency:
-                    # TIME TO UPDATE PROJECTS: fetch complete dataset
-                    _LOGGER.debug("Project update cycle reached (%d/%d): fetching projects + sensors",
-                                self._project_update_counter, self._project_update_frequency)
-                    self._project_update_counter = 0  # Reset counter
-                    result = await self.hass.async_add_executor_job(self._fetch_data)
-                    
-                    # Disparar evento después de actualización completa
-                    self.hass.bus.async_fire("koolnova_update_completed", {
-                        "update_type": "full",
-                        "success": True,
-                        "timestamp": datetime.now().isoformat(),
-                        "entry_id": self.config_entry.entry_id,
-                        "lastsync": result.get("projects", [{}])[0].get("last_sync") if result.get("projects") else None,
-                        "projects_count": len(result.get("projects", [])),
-                        "sensors_count": len(result.get("sensors", []))
-                    })
-                    
-                    return result
-                else:
-                    # NORMAL UPDATE: Only fetch sensors for efficiency
-                    _LOGGER.debug("Using optimized polling: sensors only (projects cached) - counter: %d/%d",
-                                self._project_update_counter, self._project_update_frequency)
-                    result = await self.hass.async_add_executor_job(self._fetch_sensors_only)
-                    
-                    # Disparar evento después de actualización parcial (solo sensores)
-                    self.hass.bus.async_fire("koolnova_update_completed", {
-                        "update_type": "sensors_only",
-                        "success": True,
-                        "timestamp": datetime.now().isoformat(),
-                        "entry_id": self.config_entry.entry_id,
-                        "lastsync": self.data.get("projects", [{}])[0].get("last_sync") if self.data.get("projects") else None,
-                        "sensors_count": len(result.get("sensors", []))
-                    })
-                    
-                    return result
+                # NORMAL UPDATE: only sensors, projects have their own coordinator
+                result = await self._async_fetch_sensors_only(deadline)
+                update_type = "sensors_only"
             else:
-                # INITIAL SETUP: Fetch complete dataset and reset counter
+                # INITIAL SETUP: Fetch complete dataset
                 _LOGGER.debug("Initial setup: fetching complete dataset (projects + sensors)")
-                self._project_update_counter = 0
-                result = await self.hass.async_add_executor_job(self._fetch_data)
-                
-                # Disparar evento después de setup inicial
-                self.hass.bus.async_fire("koolnova_update_completed", {
-                    "update_type": "initial",
-                    "success": True,
-                    "timestamp": datetime.now().isoformat(),
-                    "entry_id": self.config_entry.entry_id,
-                    "lastsync": result.get("projects", [{}])[0].get("last_sync") if result.get("projects") else None,
-                    "projects_count": len(result.get("projects", [])),
-                    "sensors_count": len(result.get("sensors", []))
-                })
-                
-                return result
+                result = await self._async_fetch_data(deadline)
+                update_type = "initial"
         except Exception as err:
-            # Enhanced error handling for authentication failures
-            error_msg = str(err)
-            if "Authentication failed" in error_msg or "429" in error_msg:
-                _LOGGER.warning("Authentication/rate limiting error during data update: %s", err)
+            latency = time.monotonic() - started
+            if find_cause(err, KoolnovaCircuitOpenError) is not None:
+                # Otra peticion de la cuenta abrio el circuito o esta sondeando
+                return self._serve_cached(err, "circuit_open", latency)
+            if find_cause(err, KoolnovaBusyError) is not None:
+                # Cola local llena: la API no ha fallado
+                return self._serve_cached(err, "busy", latency)
+            # El breaker de la cuenta ya conto el fallo
+            error_class = classify_error(err)
+
+            if error_class in (ERROR_AUTH, ERROR_RATE_LIMIT):
                 # For auth failures, return existing data if available to avoid disabling the integration
-                if self.data and (self.data.get("projects") or self.data.get("sensors")):
-                    _LOGGER.info("Returning cached data due to authentication error")
-                    
-                    # Disparar evento de error con datos cacheados
-                    self.hass.bus.async_fire("koolnova_update_completed", {
-                        "update_type": "cached",
-                        "success": False,
-                        "error": "authentication_failed",
-                        "timestamp": datetime.now().isoformat(),
-                        "entry_id": self.config_entry.entry_id,
-                        "lastsync": self.data.get("projects", [{}])[0].get("last_sync") if self.data.get("projects") else None
-                    })
-                    
-                    return self.data
-                else:
-                    # No cached data available, re-raise to trigger proper error handling
-                    
-                    # Disparar evento de error crítico
-                    self.hass.bus.async_fire("koolnova_update_completed", {
-                        "update_type": "failed",
-                        "success": False,
-                        "error": str(err),
-                        "timestamp": datetime.now().isoformat(),
-                        "entry_id": self.config_entry.entry_id
-                    })
-                    
-                    raise UpdateFailed(f"Authentication failed and no cached data available: {err}")
+                _LOGGER.warning("Authentication/rate limiting error during data update: %s", err)
+                if find_cause(err, KoolnovaInvalidCredentialsError) is not None:
+                    # Contrasena cambiada: pedirla al usuario (flujo de reautenticacion)
+                    self.config_entry.async_start_reauth(self.hass)
+                return self._serve_cached(
+                    UpdateFailed(f"Authentication failed and no cached data available: {err}"),
+                    "authentication_failed", latency,
+                )
+
+            if self.breaker.state == STATE_OPEN:
+                _LOGGER.warning("Koolnova API failing (%s): %s", error_class, err)
+                return self._serve_cached(err, error_class, latency)
+
+            # Re-raise other errors
+            self.events.async_record("failed", False, latency, error=str(err))
+            raise
+
+        if self.stale_since is None:
+            self.changed_zones = self._changed_zones(result.get("sensors", []))
+        self.stale_since = None
+        self.last_fresh_update = time.time()
+        if update_type == "initial":
+            self.project_coordinator.async_set_projects(result["projects"])
+        self._last_poll = time.monotonic()
+        self._consecutive_skips = 0
+        self._mark_observed(sensor.get("Room_id") for sensor in result.get("sensors", []))
+        self.history.async_record(result.get("sensors", []))
+        analysis_changed = self._refresh_analysis(self.changed_zones)
+        if self.changed_zones is None:
+            self.verifier.async_check_sensors(result.get("sensors", []))
+        else:
+            settled = set()
+            if self.changed_zones:
+                settled = self.verifier.async_check_sensors(
+                    [sensor for sensor in result.get("sensors", []) if sensor.get("Room_id") in self.changed_zones]
+                )
+            # Atributos derivados (analisis, verificacion) aunque la zona no cambie
+            self.changed_zones = self.changed_zones | analysis_changed | settled
+        if self.recorder.enabled:
+            self.config_entry.async_create_background_task(
+                self.hass, self.recorder.async_record(result), "koolnova snapshot"
+            )
+        self.events.async_record(update_type, True, time.monotonic() - started, result)
+        return result
+
+    async def async_start_update_sources(self) -> None:
+        """Start the push channel if one is configured (polling always runs)."""
+        url = self._get_config_value(CONF_PUSH_URL, "")
+        if url:
+            self.push_source = KoolnovaPushSource(self.hass, self, url)
+            await self.push_source.async_start()
+
+    async def async_stop_update_sources(self) -> None:
+        """Stop the push channel and go back to the configured polling interval."""
+        push_source, self.push_source = self.push_source, None
+        if push_source is not None:
+            await push_source.async_stop()
+
+    @property
+    def update_source(self):
+        """Return the source currently delivering updates."""
+        if self.push_source is not None and self.push_source.connected:
+            return self.push_source
+        return self.polling_source
+
+    @callback
+    def async_update_source_changed(self) -> None:
+        """Adapt polling to the active source.
+
+        While the push channel is connected polling is only a safety net; when
+        it drops, the configured interval is restored and a poll is requested
+        right away to catch changes missed meanwhile.
+        """
+        pushing = self.update_source is not self.polling_source
+        interval = timedelta(seconds=PUSH_SAFETY_POLL_INTERVAL) if pushing else self._poll_interval
+        if interval != self.update_interval:
+            _LOGGER.debug("Update source is now %s; polling every %ss",
+                          self.update_source.name, interval.total_seconds())
+            self.update_interval = interval
+        if self.push_source is not None and not pushing:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_push_sensors(self, sensors: list) -> None:
+        """Merge zones delivered by a push source into the data."""
+        sensors = self._filter_sensors(sensors)
+        if not sensors:
+            return
+        pushed = {sensor["Room_id"]: sensor for sensor in sensors}
+        merged = [pushed.pop(sensor.get("Room_id"), sensor) for sensor in self.data.get("sensors", [])]
+        merged.extend(pushed.values())
+
+        self._mark_observed(sensor["Room_id"] for sensor in sensors)
+        self.history.async_record(sensors)
+        pushed_ids = {sensor["Room_id"] for sensor in sensors}
+        analysis_changed = self._refresh_analysis(pushed_ids)
+        self.verifier.async_check_sensors(sensors)
+        self.changed_zones = pushed_ids | analysis_changed
+        # Resets the poll timer too: pushed data postpones the next poll
+        self.async_set_updated_data({**self.data, "sensors": merged})
+
+    def _refresh_analysis(self, room_ids=None) -> set:
+        """Recompute the analysis of some zones and return those whose result changed.
+
+        Only the zones with new data are analyzed (every zone when room_ids
+        is None). The trend, time to setpoint and sensor_stuck depend on the
+        clock too, so every zone is still re-analyzed at least once per
+        ANALYSIS_REFRESH_INTERVAL even while its watermark stays put.
+        """
+        now = time.monotonic()
+        if self._last_full_analysis is None or now - self._last_full_analysis >= ANALYSIS_REFRESH_INTERVAL:
+            room_ids = None
+        if room_ids is None:
+            self._last_full_analysis = now
+            analysis = analyze_zones(self.history)
+            room_ids = self.analysis.keys() | analysis.keys()
+        elif not room_ids:
+            return set()
+        else:
+            # Copia nueva: las entidades pueden conservar la anterior
+            analysis = {room_id: result for room_id, result in self.analysis.items() if room_id not in room_ids}
+            analysis.update(analyze_zones(self.history, room_ids=room_ids))
+        previous, self.analysis = self.analysis, analysis
+        return {room_id for room_id in room_ids if previous.get(room_id) != analysis.get(room_id)}
+
+    def _changed_zones(self, sensors: list):
+        """Return the zones whose watermark moved since the cached data.
+
+        Zones without watermark always count as changed, and so do zones
+        that disappeared. Returns None (everything changed) while the
+        coordinator is recovering from a failure, since availability flips.
+        """
+        if not self.last_update_success:
+            return None
+        previous = {sensor.get("Room_id"): zone_watermark(sensor) for sensor in self.data.get("sensors", [])}
+        changed = set()
+        unchanged = 0
+        for sensor in sensors:
+            room_id = sensor.get("Room_id")
+            mark = zone_watermark(sensor)
+            if previous.pop(room_id, None) != mark or mark[:2] == (None, None):
+                changed.add(room_id)
             else:
-                # Re-raise other errors
-                
-                # Disparar evento de error genérico
-                self.hass.bus.async_fire("koolnova_update_completed", {
-                    "update_type": "failed",
-                    "success": False,
-                    "error": str(err),
-                    "timestamp": datetime.now().isoformat(),
-                    "entry_id": self.config_entry.entry_id
-                })
-                
-                raise
+                unchanged += 1
+        changed.update(previous)
+        self.watermark_stats["changed"] += len(changed)
+        self.watermark_stats["unchanged"] += unchanged
+        return changed
+
+    def _mark_observed(self, room_ids) -> None:
+        """Record that the cached state of these zones was just refreshed."""
+        now = time.monotonic()
+        for room_id in room_ids:
+            self._zone_observed[room_id] = now
+
+    def _should_skip_poll(self) -> bool:
+        """Return True if writes since the last poll already refreshed most zones.
+
+        Only sensors-only polls are skipped, and never two in a row, so no
+        zone is older than POLL_SKIP_MAX_AGE_FACTOR intervals.
+        """
+        sensors = self.data.get("sensors", [])
+        if self._last_poll is None or not sensors or not self.data.get("projects"):
+            return False
+        if self._consecutive_skips >= POLL_SKIP_MAX_AGE_FACTOR - 1:
+            return False
+        fresh = sum(
+            1 for sensor in sensors
+            if self._zone_observed.get(sensor.get("Room_id"), 0.0) > self._last_poll
+        )
+        return fresh >= len(sensors) * POLL_SKIP_FRESH_RATIO
+
+    def _serve_cached(self, err: Exception, reason: str, latency: float) -> dict:
+        """Return the cached snapshot marked as stale, or raise if there is none."""
+        if not (self.data and (self.data.get("projects") or self.data.get("sensors"))):
+            # No cached data available, re-raise to trigger proper error handling
+            self.events.async_record("failed", False, latency, error=str(err))
+            raise err
+
+        if self.stale_since is None:
+            self.stale_since = time.time()
+            _LOGGER.info("Returning cached data (%s)", reason)
+        self.events.async_record("cached", False, latency, self.data, error=reason)
+        return self.data
+
+    @property
+    def data_age(self):
+        """Seconds since the last fresh (non cached) update, None before the first one."""
+        if self.last_fresh_update is None:
+            return None
+        return time.time() - self.last_fresh_update
 
     def _fetch_projects(self):
         """Fetch only projects from API."""
         try:
             _LOGGER.debug("Fetching projects from Koolnova API (on-demand)")
-            return self.client.get_project()
+            return self.client.get_project(Deadline(self.poll_timeout))
         except Exception as err:
             _LOGGER.error("Error fetching projects: %s", err)
             raise UpdateFailed(f"Error fetching projects: {err}")
@@ -245,22 +597,22 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
         """Fetch only sensors from API."""
         try:
             _LOGGER.debug("Fetching sensors from Koolnova API (on-demand)")
-            return self.client.get_sensors()
+            return self.client.get_sensors(Deadline(self.poll_timeout))
         except Exception as err:
             _LOGGER.error("Error fetching sensors: %s", err)
             raise UpdateFailed(f"Error fetching sensors: {err}")
 
     async def async_refresh_projects(self):
         """Refresh only the projects (for project entities when accessed)."""
-        projects = await self.hass.async_add_executor_job(self._fetch_projects)
-        self.data["projects"] = projects
-        self.async_update_listeners()
+        projects = self._filter_projects(await self._async_fetch("projects", self._fetch_projects, 0))
+        self.project_coordinator.async_set_projects(projects)
         return projects
 
     async def async_refresh_sensors(self):
         """Refresh only the sensors (for zone entities when accessed)."""
-        sensors = await self.hass.async_add_executor_job(self._fetch_sensors)
+        sensors = self._filter_sensors(await self._async_fetch("sensors", self._fetch_sensors, 0))
         self.data["sensors"] = sensors
+        self.changed_zones = None
         self.async_update_listeners()
         return sensors
 
@@ -269,7 +621,10 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
         if "sensors" in self.data:
             for i, sensor in enumerate(self.data["sensors"]):
                 if sensor.get("Room_id") == sensor_id:
-                    self.data["sensors"][i].update({
+                    # Copia (no in situ): las listas del poll son las que el
+                    # cliente devuelve tal cual cuando la respuesta no cambia
+                    sensors = list(self.data["sensors"])
+                    sensors[i] = {**sensor, **{
                         "Room_setpoint_temp": updated_sensor_data.get("setpoint_temperature"),
                         "Room_actual_temp": updated_sensor_data.get("temperature"),
                         "Room_status": updated_sensor_data.get("status"),
@@ -278,26 +633,54 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
                         "Room_Name": updated_sensor_data.get("name"),
                         "Topic_id": updated_sensor_data.get("topic_info", {}).get("id") if updated_sensor_data.get("topic_info") else None,
                         "Room_update_at": updated_sensor_data.get("updated_at"),
-                    })
+                    }}
+                    self.data = {**self.data, "sensors": sensors}
                     _LOGGER.debug("Updated sensor %s in local cache using API response", sensor_id)
+                    self._mark_observed((sensor_id,))
                     return True
         return False
 
+    def async_set_sensors(self, fresh: list[dict], settled=()) -> None:
+        """Replace some zones in the cache with a fresh read (verification).
+
+        Zones in `settled` are written even if their data did not change
+        (their command_verification attribute did).
+        """
+        by_id = {sensor.get("Room_id"): sensor for sensor in fresh}
+        sensors = list(self.data.get("sensors", []))
+        replaced = set()
+        for i, cached in enumerate(sensors):
+            sensor = by_id.get(cached.get("Room_id"))
+            if sensor is not None and sensor is not cached:
+                sensors[i] = sensor
+                replaced.add(cached.get("Room_id"))
+        if replaced:
+            self.data = {**self.data, "sensors": sensors}
+            self._mark_observed(replaced)
+        if replaced or settled:
+            self.changed_zones = replaced | set(settled)
+            self.async_update_listeners()
+
     def _update_project_in_cache(self, topic_id: int, updated_project_data: dict):
         """Update specific project in local cache using complete API response."""
         if "projects" in self.data:
             for i, project in enumerate(self.data["projects"]):
                 if project.get("Topic_id") == topic_id:
+                    # Copia (no in situ), igual que en _update_sensor_in_cache
+                    project = dict(project)
                     if "mode" in updated_project_data:
-                        self.data["projects"][i]["Mode"] = updated_project_data["mode"]
+                        project["Mode"] = updated_project_data["mode"]
                     if "is_online" in updated_project_data:
-                        self.data["projects"][i]["is_online"] = updated_project_data["is_online"]
+                        project["is_online"] = updated_project_data["is_online"]
                     if "eco" in updated_project_data:
-                        self.data["projects"][i]["eco"] = updated_project_data["eco"]
+                        project["eco"] = updated_project_data["eco"]
                     if "last_sync" in updated_project_data:
-                        self.data["projects"][i]["last_sync"] = updated_project_data["last_sync"]
+                        project["last_sync"] = updated_project_data["last_sync"]
                     if "is_stop" in updated_project_data:
-                        self.data["projects"][i]["is_stop"] = updated_project_data["is_stop"]
+                        project["is_stop"] = updated_project_data["is_stop"]
+                    projects = list(self.data["projects"])
+                    projects[i] = project
+                    self.data["projects"] = self.project_coordinator.data = projects
                     _LOGGER.debug("Updated project %s in local cache using API response", topic_id)
                     return True
         return False
@@ -306,11 +689,16 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
         """Update sensor using API and update local cache - NO additional API calls."""
         try:
             _LOGGER.debug("Updating sensor %s with payload: %s", sensor_id, payload)
-            result = await self.hass.async_add_executor_job(
-                self.client.update_sensor, sensor_id, payload
-            )
-            _LOGGER.debug("API response for sensor %s: %s", sensor_id, result)
+            async with self.request_scheduler.interactive():
+                # Mismos atributos de la misma zona en cola: solo se envia el ultimo valor
+                result = await self.account.async_command(
+                    self.client.update_sensor, sensor_id, payload,
+                    key=("sensor", sensor_id, tuple(sorted(payload))), timeout=self.command_timeout,
+                )
             self._update_sensor_in_cache(sensor_id, result)
+            # Antes de escribir: el estado publicado ya incluye command_verification=pending
+            self.verifier.async_track(sensor_id, payload)
+            self.changed_zones = {sensor_id}
             self.async_update_listeners()
             return result
         except Exception as err:
@@ -321,12 +709,13 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
         """Update project using API and update local cache - NO additional API calls."""
         try:
             _LOGGER.debug("Updating project %s with payload: %s", topic_id, payload)
-            result = await self.hass.async_add_executor_job(
-                self.client.update_project, topic_id, payload
-            )
-            _LOGGER.debug("API response for project %s: %s", topic_id, result)
+            async with self.request_scheduler.interactive():
+                result = await self.account.async_command(
+                    self.client.update_project, topic_id, payload,
+                    key=("project", topic_id, tuple(sorted(payload))), timeout=self.command_timeout,
+                )
             self._update_project_in_cache(topic_id, result)
-            self.async_update_listeners()
+            self.project_coordinator.async_update_listeners()
             return result
         except Exception as err:
             _LOGGER.error("Error updating project %s: %s", topic_id, err)
@@ -416,6 +805,84 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Error updating all sensors fan speed: %s", err)
             raise
 
+    def sensor_payload_from_targets(self, temperature=None, hvac_mode=None, fan_mode=None) -> dict:
+        """Translate Home Assistant zone targets into a Koolnova sensor payload.
+
+        Applies the same rounding and configured limits as the zone entities.
+
+        Raises:
+            ValueError: if a target is outside the configured range/modes.
+        """
+        payload = {}
+
+        if temperature is not None:
+            precision = self._get_config_value(CONF_TEMP_PRECISION, DEFAULT_TEMP_PRECISION)
+            min_temp = self._get_config_value(CONF_MIN_TEMP, DEFAULT_MIN_TEMP)
+            max_temp = self._get_config_value(CONF_MAX_TEMP, DEFAULT_MAX_TEMP)
+            temp = round(temperature / precision) * precision
+            if not (min_temp <= temp <= max_temp):
+                raise ValueError(f"Temperature {temp} out of configured range ({min_temp} - {max_temp})")
+            payload["setpoint_temperature"] = temp
+
+        if hvac_mode is not None:
+            allowed = self._get_config_value(
+                CONF_ZONE_HVAC_MODES, [mode.value for mode in DEFAULT_ZONE_HVAC_MODES]
+            )
+            status_code = HVAC_TO_KOOLNOVA_ZONE_STATUS.get(hvac_mode)
+            if str(hvac_mode) not in allowed or status_code is None:
+                raise ValueError(f"Unsupported HVAC mode for zone: {hvac_mode}. Allowed: {allowed}")
+            payload["status"] = status_code
+
+        if fan_mode is not None:
+            speed_code = FAN_TO_KOOLNOVA.get(fan_mode)
+            if speed_code is None:
+                raise ValueError(f"Unsupported fan mode: {fan_mode}")
+            payload["speed"] = speed_code
+
+        return payload
+
+    @staticmethod
+    def _diff_sensor_payload(sensor: dict, target: dict) -> dict:
+        """Return the subset of a target payload that differs from the cached sensor."""
+        return {field: target[field] for field in sensor_mismatch(sensor, target)}
+
+    async def async_apply_scene(self, targets: dict) -> dict:
+        """Apply per-zone targets sending one combined payload per changed zone.
+
+        Args:
+            targets: Room_id -> payload using Koolnova fields
+                (setpoint_temperature, status, speed).
+
+        Returns:
+            Summary with updated, unchanged, failed and unknown zones.
+        """
+        summary = {"updated": [], "unchanged": [], "failed": {}, "unknown": []}
+        sensors = {sensor.get("Room_id"): sensor for sensor in self.data.get("sensors", [])}
+
+        for room_id, target in targets.items():
+            sensor = sensors.get(room_id)
+            if sensor is None:
+                summary["unknown"].append(room_id)
+                continue
+
+            payload = self._diff_sensor_payload(sensor, target)
+            if not payload:
+                summary["unchanged"].append(room_id)
+                continue
+
+            try:
+                await self.async_update_sensor_data(room_id, payload)
+                summary["updated"].append(room_id)
+            except Exception as err:
+                summary["failed"][room_id] = str(err)
+
+        _LOGGER.info(
+            "Scene applied: %d updated, %d unchanged, %d failed, %d unknown",
+            len(summary["updated"]), len(summary["unchanged"]),
+            len(summary["failed"]), len(summary["unknown"]),
+        )
+        return summary
+
     async def async_options_updated(self):
         """Handle updated options - update coordinator settings without full restart."""
         config_data = self.config_entry.data
@@ -438,22 +905,50 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
 
         new_interval = timedelta(seconds=new_interval_seconds)
 
-        if new_interval != self.update_interval:
+        if new_interval != self._poll_interval:
             _LOGGER.info("Updating coordinator interval from %s to %s seconds",
-                        self.update_interval.total_seconds(), new_interval_seconds)
-            self.update_interval = new_interval
+                        self._poll_interval.total_seconds(), new_interval_seconds)
+            self._poll_interval = new_interval
+            self.async_update_source_changed()
 
-        # Update project update frequency
-        new_frequency = options_data.get(
-            CONF_PROJECT_UPDATE_FREQUENCY,
-            config_data.get(CONF_PROJECT_UPDATE_FREQUENCY, DEFAULT_PROJECT_UPDATE_FREQUENCY)
-        )
+        # Update project interval
+        new_project_interval = self._get_project_interval()
+        if new_project_interval != self.project_coordinator.update_interval:
+            _LOGGER.info("Updating project interval from %s to %s seconds",
+                        self.project_coordinator.update_interval.total_seconds(),
+                        new_project_interval.total_seconds())
+            self.project_coordinator.update_interval = new_project_interval
+
+        # Update push channel
+        new_push_url = self._get_config_value(CONF_PUSH_URL, "")
+        current_push_url = self.push_source.url if self.push_source is not None else ""
+        if new_push_url != current_push_url:
+            await self.async_stop_update_sources()
+            await self.async_start_update_sources()
+
+        # Update visible topics
+        self._topic_ids = set(self._get_config_value(CONF_TOPIC_IDS, []))
+        self._raw_sensors = None
+
+        # Update per-operation time budgets
+        self._load_timeouts()
+
+        # Update command verification
+        self.verifier.enabled = self._get_config_value(CONF_VERIFY_COMMANDS, DEFAULT_VERIFY_COMMANDS)
+        if not self.verifier.enabled:
+            self.verifier.async_stop()
+
+        # Update snapshot recording
+        self.recorder.enabled = self._get_config_value(CONF_RECORD_SNAPSHOTS, DEFAULT_RECORD_SNAPSHOTS)
 
-        if new_frequency != self._project_update_frequency:
-            _LOGGER.info("Updating project update frequency from %s to %s",
-                        self._project_update_frequency, new_frequency)
-            self._project_update_frequency = new_frequency
-            self._project_update_counter = 0  # Reset counter with new frequency
+        # Update profiling
+        self.profiler.set_enabled(self._get_config_value(CONF_PROFILING, DEFAULT_PROFILING))
+
+        # Update event policy
+        self.events.configure(
+            self._get_config_value(CONF_EVENT_MODE, DEFAULT_EVENT_MODE),
+            self._get_config_value(CONF_EVENT_AGGREGATE_POLLS, DEFAULT_EVENT_AGGREGATE_POLLS),
+        )
 
     # Backward compatibility methods
     async def async_update_sensor(self, sensor_id: int, payload: dict) -> dict:
@@ -461,3 +956,100 @@ class KoolnovaDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def async_update_project(self, topic_id: int, payload: dict) -> dict:
         return await self.async_update_project_data(topic_id, payload)
+
+
+class KoolnovaProjectCoordinator(DataUpdateCoordinator):
+    """Coordinator for the projects (topics), polled on their own interval.
+
+    Projects (global mode, eco, online flag) change far less often than
+    zones, so they have their own interval and listeners (the circuit breaker
+    is the account's, shared with the zone polls and commands):
+    a project poll only wakes the entities subscribed here and zone polls
+    never wake them. The list is shared with the zone coordinator through
+    its data["projects"] (without notifying zone listeners), which also owns
+    the client, account cache and time budgets.
+    """
+
+    def __init__(self, hass: HomeAssistant, zones: KoolnovaDataUpdateCoordinator,
+                 update_interval: timedelta):
+        """Initialize the project coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="koolnova_projects",
+            update_interval=update_interval,
+        )
+        self.zones = zones
+        self.config_entry = zones.config_entry
+        self.data = zones.data["projects"]
+        self.breaker = zones.account.breaker
+        self.last_fresh_update = None
+        self.stale_since = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context=None) -> Callable[[], None]:
+        """Register a listener, timed per entity while profiling is enabled."""
+        entity_id = getattr(getattr(update_callback, "__self__", None), "entity_id", None)
+        path = f"project_listener:{entity_id or getattr(update_callback, '__qualname__', 'unknown')}"
+        return super().async_add_listener(self.zones.profiler.wrap(path, update_callback), context)
+
+    @callback
+    def async_set_projects(self, projects: list) -> None:
+        """Publish projects read elsewhere (initial refresh, on-demand read)."""
+        self.zones.data["projects"] = projects
+        self.last_fresh_update = time.time()
+        self.stale_since = None
+        # Also restarts the project interval from now
+        self.async_set_updated_data(projects)
+
+    async def _async_update_data(self) -> list:
+        """Poll the projects and share them with the zone coordinator."""
+        zones = self.zones
+        started = time.monotonic()
+
+        if self.breaker.blocked:
+            return self._serve_cached(
+                UpdateFailed(f"Koolnova API unavailable, retry in {self.breaker.retry_in:.0f}s "
+                             f"(last error: {self.breaker.last_error})"),
+                "circuit_open", 0.0,
+            )
+
+        await zones.request_scheduler.async_background_turn()
+        deadline = Deadline(zones.poll_timeout)
+
+        try:
+            projects = zones._filter_projects(await zones._async_fetch(
+                "projects", functools.partial(zones.client.get_project, deadline=deadline),
+                self.update_interval.total_seconds() * ACCOUNT_CACHE_MAX_AGE_RATIO, deadline,
+            ))
+        except Exception as err:
+            latency = time.monotonic() - started
+            if find_cause(err, KoolnovaCircuitOpenError) is not None:
+                return self._serve_cached(UpdateFailed(f"Error fetching projects: {err}"), "circuit_open", latency)
+            if find_cause(err, KoolnovaBusyError) is not None:
+                return self._serve_cached(UpdateFailed(f"Error fetching projects: {err}"), "busy", latency)
+            error_class = classify_error(err)
+            if error_class in (ERROR_AUTH, ERROR_RATE_LIMIT) or self.breaker.state == STATE_OPEN:
+                # La reautenticacion la gestiona el coordinator de zonas
+                _LOGGER.warning("Koolnova project poll failing (%s): %s", error_class, err)
+                return self._serve_cached(UpdateFailed(f"Error fetching projects: {err}"), error_class, latency)
+            zones.events.async_record("failed", False, latency, error=str(err))
+            raise UpdateFailed(f"Error fetching projects: {err}") from err
+
+        self.last_fresh_update = time.time()
+        self.stale_since = None
+        _LOGGER.debug("Fetched %d projects (project poll)", len(projects))
+        # Visible para las zonas en su proxima escritura, sin despertarlas
+        zones.data["projects"] = projects
+        zones.events.async_record("projects", True, time.monotonic() - started, zones.data)
+        return projects
+
+    def _serve_cached(self, err: Exception, reason: str, latency: float) -> list:
+        """Return the cached projects marked as stale, or raise if there are none."""
+        if not self.data:
+            self.zones.events.async_record("failed", False, latency, error=str(err))
+            raise err
+        if self.stale_since is None:
+            self.stale_since = time.time()
+            _LOGGER.info("Returning cached projects (%s)", reason)
+        return self.data
@@ -0,0 +1,73 @@
+"""Diagnostics support for Koolnova."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "projects_count": len(coordinator.data.get("projects", [])),
+            "sensors_count": len(coordinator.data.get("sensors", [])),
+            "last_fresh_update": coordinator.last_fresh_update,
+            "stale_since": coordinator.stale_since,
+            "data_age": coordinator.data_age,
+            "polls_skipped": coordinator.polls_skipped,
+            "zone_watermarks": dict(coordinator.watermark_stats),
+        },
+        "project_coordinator": {
+            "last_update_success": coordinator.project_coordinator.last_update_success,
+            "update_interval": coordinator.project_coordinator.update_interval.total_seconds(),
+            "last_fresh_update": coordinator.project_coordinator.last_fresh_update,
+            "stale_since": coordinator.project_coordinator.stale_since,
+        },
+        # Uno por cuenta: compartido por polls, lecturas de verificacion y comandos
+        "circuit_breaker": coordinator.account.breaker.as_dict(),
+        "request_lanes": coordinator.request_scheduler.as_dict(),
+        "executor": coordinator.executor.as_dict(),
+        "commands": coordinator.account.command_limiter.as_dict(),
+        "conditional_requests": (
+            dict(coordinator.client.session.conditional_cache.stats)
+            if coordinator.client.session is not None else None
+        ),
+        "token": coordinator.client.token_info(),
+        "retries": (
+            coordinator.client.session.retry_stats.as_dict()
+            if coordinator.client.session is not None else None
+        ),
+        "transfers": (
+            coordinator.client.session.transfer_stats.as_dict()
+            if coordinator.client.session is not None else None
+        ),
+        "update_source": {
+            "active": coordinator.update_source.name,
+            "push": coordinator.push_source.as_dict() if coordinator.push_source is not None else None,
+        },
+        "history": coordinator.history.as_diagnostics(),
+        "schedule": coordinator.scheduler.as_diagnostics(),
+        "command_verification": {
+            "enabled": coordinator.verifier.enabled,
+            "results": coordinator.verifier.results,
+            "reads": coordinator.verifier.reads,
+        },
+        "profiling": coordinator.profiler.as_diagnostics(),
+        # Reproducible offline con tools/koolnova_replay.py
+        "snapshots": await coordinator.recorder.async_export(),
+    }
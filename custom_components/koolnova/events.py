@@ -0,0 +1,189 @@
+"""Event policy for the koolnova_update_completed bus event."""
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    EVENT_UPDATE_COMPLETED,
+    EVENT_MODE_ALL,
+    EVENT_MODE_ON_CHANGE,
+    EVENT_MODE_AGGREGATE,
+    EVENT_MODE_OFF,
+    DEFAULT_EVENT_AGGREGATE_POLLS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Campos que cuentan como cambio para la politica on_change
+_PROJECT_FIELDS = ("Topic_id", "last_sync", "Mode", "is_stop", "eco", "is_online")
+_ZONE_FIELDS = ("Room_id", "Room_update_at", "Room_setpoint_temp", "Room_actual_temp", "Room_status", "Room_speed")
+
+
+def _zone_fingerprint(sensor: dict) -> tuple:
+    """Return the fields of a zone compared by the on_change policy."""
+    topic_info = sensor.get("topic_info") or {}
+    return tuple(sensor.get(key) for key in _ZONE_FIELDS) + (topic_info.get("last_sync"), topic_info.get("is_online"))
+
+
+class KoolnovaUpdateEventPolicy:
+    """Decide when (and with which payload) to fire koolnova_update_completed.
+
+    The coordinator reports every poll through async_record(); the policy only
+    builds the event dict (and its timestamp) when an event is actually fired,
+    so polls that produce no event cost a couple of comparisons.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, mode: str = EVENT_MODE_ALL,
+                 aggregate_polls: int = DEFAULT_EVENT_AGGREGATE_POLLS) -> None:
+        """Initialize the policy."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.mode = mode
+        self.aggregate_polls = aggregate_polls
+
+        # Estado para on_change
+        self._last_fingerprint: Optional[tuple] = None
+        self._fingerprint_sources: Optional[tuple] = None
+
+        # Estado para aggregate (ventana actual + totales acumulados)
+        self._failures_total = 0
+        self._reset_window()
+
+    def configure(self, mode: str, aggregate_polls: int) -> None:
+        """Apply new options; pending aggregated data is flushed first."""
+        if mode == self.mode and aggregate_polls == self.aggregate_polls:
+            return
+        if self.mode == EVENT_MODE_AGGREGATE and self._polls:
+            self._fire_aggregate()
+        _LOGGER.info("Event policy changed to %s (aggregate every %d polls)", mode, aggregate_polls)
+        self.mode = mode
+        self.aggregate_polls = aggregate_polls
+        self._last_fingerprint = self._fingerprint_sources = None
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        """Start a new aggregation window."""
+        self._polls = 0
+        self._failures = 0
+        self._by_type: dict[str, int] = {}
+        self._latency_min: Optional[float] = None
+        self._latency_max: Optional[float] = None
+        self._latency_sum = 0.0
+        self._last_error: Optional[str] = None
+        self._last_data: Optional[dict] = None
+
+    def async_record(self, update_type: str, success: bool, latency: float,
+                     data: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """Record the outcome of one poll and fire an event if the policy says so."""
+        if not success:
+            self._failures_total += 1
+
+        if self.mode == EVENT_MODE_OFF:
+            return
+
+        if self.mode == EVENT_MODE_ALL:
+            self._fire(self._build_event(update_type, success, data, error))
+            return
+
+        if self.mode == EVENT_MODE_ON_CHANGE:
+            fingerprint = self._fingerprint(success, data, error)
+            if fingerprint != self._last_fingerprint:
+                self._last_fingerprint = fingerprint
+                self._fire(self._build_event(update_type, success, data, error))
+            return
+
+        # EVENT_MODE_AGGREGATE
+        self._polls += 1
+        self._by_type[update_type] = self._by_type.get(update_type, 0) + 1
+        if not success:
+            self._failures += 1
+            self._last_error = error
+        if data is not None:
+            self._last_data = data
+        self._latency_sum += latency
+        if self._latency_min is None or latency < self._latency_min:
+            self._latency_min = latency
+        if self._latency_max is None or latency > self._latency_max:
+            self._latency_max = latency
+
+        if self._polls >= self.aggregate_polls:
+            self._fire_aggregate()
+            self._reset_window()
+
+    @staticmethod
+    def _last_sync(data: Optional[dict]) -> Optional[str]:
+        """Return the project last_sync of a coordinator snapshot."""
+        if not data:
+            return None
+        projects = data.get("projects") or []
+        return projects[0].get("last_sync") if projects else None
+
+    def _fingerprint(self, success: bool, data: Optional[dict], error: Optional[str]) -> tuple:
+        """Summary of a poll result used by the on_change policy.
+
+        Covers every zone and project, so a change in any of them fires an
+        event. A poll that returns the same lists as the previous one (an
+        unchanged conditional GET) reuses the previous fingerprint.
+        """
+        if not success:
+            self._fingerprint_sources = None
+            return (False, error)
+        projects = (data or {}).get("projects") or []
+        sensors = (data or {}).get("sensors") or []
+        sources = (projects, sensors)
+        if self._fingerprint_sources is not None and all(
+            new is old for new, old in zip(sources, self._fingerprint_sources)
+        ):
+            return self._last_fingerprint
+        self._fingerprint_sources = sources
+        return (
+            True,
+            tuple(tuple(project.get(key) for key in _PROJECT_FIELDS) for project in projects),
+            tuple(_zone_fingerprint(sensor) for sensor in sensors),
+        )
+
+    def _build_event(self, update_type: str, success: bool,
+                     data: Optional[dict], error: Optional[str]) -> dict[str, Any]:
+        """Build the historical koolnova_update_completed payload."""
+        event: dict[str, Any] = {
+            "update_type": update_type,
+            "success": success,
+            "timestamp": datetime.now().isoformat(),
+            "entry_id": self.entry_id,
+        }
+        if error is not None:
+            event["error"] = error
+        if data is not None:
+            event["lastsync"] = self._last_sync(data)
+            if update_type in ("initial", "projects"):
+                event["projects_count"] = len(data.get("projects", []))
+            if update_type not in ("cached", "projects"):
+                event["sensors_count"] = len(data.get("sensors", []))
+        return event
+
+    def _fire_aggregate(self) -> None:
+        """Fire one summary event for the current aggregation window."""
+        event: dict[str, Any] = {
+            "update_type": "aggregate",
+            "success": self._failures == 0,
+            "timestamp": datetime.now().isoformat(),
+            "entry_id": self.entry_id,
+            "polls": self._polls,
+            "failures": self._failures,
+            "failures_total": self._failures_total,
+            "update_types": dict(self._by_type),
+            "latency_min": round(self._latency_min or 0.0, 3),
+            "latency_max": round(self._latency_max or 0.0, 3),
+            "latency_mean": round(self._latency_sum / self._polls, 3) if self._polls else 0.0,
+            "lastsync": self._last_sync(self._last_data),
+        }
+        if self._last_error is not None:
+            event["error"] = self._last_error
+        self._fire(event)
+
+    def _fire(self, event: dict[str, Any]) -> None:
+        """Fire the event on the Home Assistant bus."""
+        self.hass.bus.async_fire(EVENT_UPDATE_COMPLETED, event)
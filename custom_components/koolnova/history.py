@@ -0,0 +1,285 @@
+"""In-memory time series of zone temperatures and setpoints."""
+
+import math
+import time
+from array import array
+from typing import Any, Optional
+
+from .const import ANALYSIS_STUCK_WINDOW, ANALYSIS_TREND_WINDOW, DEFAULT_HISTORY_CAPACITY
+
+_NAN = float("nan")
+
+
+def _to_float(value) -> float:
+    """Convert an API temperature to float, NaN when missing."""
+    try:
+        return float(value) if value is not None else _NAN
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _to_code(value) -> int:
+    """Convert a Koolnova status/speed code ("02", "4") to int, -1 when unknown."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class WindowSums:
+    """Running sums of the temperatures inside a sliding time window.
+
+    `count` is the number of newest samples in the window (NaN included);
+    the least squares sums cover the valid ones, with x measured in seconds
+    from `origin`, which moves to the first sample added to an empty window
+    and forward on every rebuild to keep the squares small.
+    """
+
+    __slots__ = ("span", "count", "n", "sx", "sy", "sxx", "sxy", "origin")
+
+    def __init__(self, span: float) -> None:
+        """Initialize an empty window."""
+        self.span = span
+        self.reset(0.0)
+
+    def reset(self, origin: float) -> None:
+        """Empty the window."""
+        self.origin = origin
+        self.count = self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add the newest sample."""
+        if not self.count:
+            # Ventana vacia: origen en la primera muestra y sin restos de las restas
+            self.reset(timestamp)
+        self.count += 1
+        if value != value:  # NaN
+            return
+        x = timestamp - self.origin
+        self.n += 1
+        self.sx += x
+        self.sy += value
+        self.sxx += x * x
+        self.sxy += x * value
+
+    def remove(self, timestamp: float, value: float) -> None:
+        """Remove the oldest sample."""
+        self.count -= 1
+        if value != value:
+            return
+        x = timestamp - self.origin
+        self.n -= 1
+        self.sx -= x
+        self.sy -= value
+        self.sxx -= x * x
+        self.sxy -= x * value
+
+
+class ZoneHistory:
+    """Fixed-capacity ring buffer of samples for a single zone.
+
+    Samples live in preallocated typed arrays (about 18 bytes per sample), so
+    memory is bounded by the capacity and appends never allocate.
+
+    The buffer also keeps running sums for the analysis windows and the time
+    of the last temperature change, updated as samples come in and expire,
+    so analysis.py reads them in constant time instead of rescanning.
+    """
+
+    __slots__ = ("capacity", "timestamps", "actual", "setpoint", "status", "speed", "_next", "_size",
+                 "windows", "last_change", "_last_valid", "_appends")
+
+    def __init__(self, capacity: int, windows=(ANALYSIS_TREND_WINDOW, ANALYSIS_STUCK_WINDOW)) -> None:
+        """Initialize the buffer."""
+        self.capacity = capacity
+        self.timestamps = array("d", [0.0]) * capacity
+        self.actual = array("f", [_NAN]) * capacity
+        self.setpoint = array("f", [_NAN]) * capacity
+        self.status = array("b", [-1]) * capacity
+        self.speed = array("b", [-1]) * capacity
+        self._next = 0
+        self._size = 0
+        self.windows = {span: WindowSums(span) for span in windows}
+        # Momento de la ultima lectura valida distinta de la anterior
+        self.last_change: Optional[float] = None
+        self._last_valid: Optional[float] = None
+        self._appends = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._size
+
+    @property
+    def last_index(self) -> int:
+        """Return the buffer index of the newest sample."""
+        return (self._next - 1) % self.capacity
+
+    def append(self, timestamp: float, actual: float, setpoint: float, status: int, speed: int) -> None:
+        """Store a sample, overwriting the oldest one when full."""
+        i = self._next
+        if self._size == self.capacity:
+            # La muestra sobrescrita sale de las ventanas que aun la contienen
+            for window in self.windows.values():
+                if window.count == self._size:
+                    window.remove(self.timestamps[i], self.actual[i])
+        self.timestamps[i] = timestamp
+        self.actual[i] = actual
+        self.setpoint[i] = setpoint
+        self.status[i] = status
+        self.speed[i] = speed
+        self._next = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+        # Valor leido del array (float32): el mismo que se restara al expirar
+        value = self.actual[i]
+        for window in self.windows.values():
+            window.add(timestamp, value)
+        if value == value:
+            if self._last_valid is not None and value != self._last_valid:
+                self.last_change = timestamp
+            self._last_valid = value
+
+        self._appends += 1
+        if self._appends >= self.capacity:
+            # Recalcular de vez en cuando acota el error acumulado de las restas
+            self._rebuild()
+        self.expire(timestamp)
+
+    def window_start(self, window: WindowSums) -> int:
+        """Return the buffer index of the oldest sample in a window."""
+        return (self._next - window.count) % self.capacity
+
+    def expire(self, now: float) -> None:
+        """Drop the samples that fell out of each window by `now`."""
+        for window in self.windows.values():
+            since = now - window.span
+            while window.count:
+                i = self.window_start(window)
+                if self.timestamps[i] >= since:
+                    break
+                window.remove(self.timestamps[i], self.actual[i])
+
+    def first_valid(self, window: WindowSums) -> Optional[float]:
+        """Return the timestamp of the oldest non-NaN sample in a window."""
+        if not window.n:
+            return None
+        i = self.window_start(window)
+        while self.actual[i] != self.actual[i]:
+            i = (i + 1) % self.capacity
+        return self.timestamps[i]
+
+    def _rebuild(self) -> None:
+        """Recompute the window sums from the stored samples."""
+        self._appends = 0
+        for window in self.windows.values():
+            count = window.count
+            start = (self._next - count) % self.capacity
+            window.reset(self.timestamps[start] if count else 0.0)
+            for k in range(count):
+                i = (start + k) % self.capacity
+                window.add(self.timestamps[i], self.actual[i])
+
+    def indices(self, since: float = 0.0) -> list[int]:
+        """Return buffer indices of samples with timestamp >= since, oldest first.
+
+        Samples are appended in time order, so the scan walks backwards from
+        the newest one and stops at the first sample outside the window.
+        """
+        result = []
+        i = self._next
+        for _ in range(self._size):
+            i = (i - 1) % self.capacity
+            if self.timestamps[i] < since:
+                break
+            result.append(i)
+        result.reverse()
+        return result
+
+    def stats(self, since: float = 0.0) -> dict[str, Any]:
+        """Return min/max/mean of temperatures and last codes inside the window."""
+        idx = self.indices(since)
+        result: dict[str, Any] = {
+            "samples": len(idx),
+            "actual_temp": _summary(self.actual, idx),
+            "setpoint_temp": _summary(self.setpoint, idx),
+        }
+        if idx:
+            last = idx[-1]
+            result["first_sample"] = self.timestamps[idx[0]]
+            result["last_sample"] = self.timestamps[last]
+            result["status"] = self.status[last]
+            result["speed"] = self.speed[last]
+        return result
+
+
+def _summary(values: array, idx: list[int]) -> Optional[dict[str, float]]:
+    """Compute min/max/mean over the given indices, skipping NaN samples."""
+    count = 0
+    total = 0.0
+    low = math.inf
+    high = -math.inf
+    for i in idx:
+        value = values[i]
+        if value != value:  # NaN
+            continue
+        count += 1
+        total += value
+        if value < low:
+            low = value
+        if value > high:
+            high = value
+    if not count:
+        return None
+    return {"min": round(low, 2), "max": round(high, 2), "mean": round(total / count, 2)}
+
+
+class KoolnovaHistory:
+    """Per-zone ring buffers fed by the coordinator once per successful poll."""
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY) -> None:
+        """Initialize the history store."""
+        self.capacity = capacity
+        self.zones: dict[int, ZoneHistory] = {}
+
+    def async_record(self, sensors: list[dict], timestamp: Optional[float] = None) -> None:
+        """Append one sample per zone from a coordinator sensors list."""
+        now = time.time() if timestamp is None else timestamp
+        for sensor in sensors:
+            room_id = sensor.get("Room_id")
+            if room_id is None:
+                continue
+            zone = self.zones.get(room_id)
+            if zone is None:
+                zone = self.zones[room_id] = ZoneHistory(self.capacity)
+            zone.append(
+                now,
+                _to_float(sensor.get("Room_actual_temp")),
+                _to_float(sensor.get("Room_setpoint_temp")),
+                _to_code(sensor.get("Room_status")),
+                _to_code(sensor.get("Room_speed")),
+            )
+
+    def zone_stats(self, room_id: int, window: Optional[float] = None) -> Optional[dict[str, Any]]:
+        """Return windowed statistics for one zone (None if unknown)."""
+        zone = self.zones.get(room_id)
+        if zone is None:
+            return None
+        since = time.time() - window if window else 0.0
+        return zone.stats(since)
+
+    def all_stats(self, window: Optional[float] = None) -> dict[int, dict[str, Any]]:
+        """Return windowed statistics for every zone."""
+        since = time.time() - window if window else 0.0
+        return {room_id: zone.stats(since) for room_id, zone in self.zones.items()}
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return buffer usage and full-range statistics for diagnostics."""
+        return {
+            "capacity": self.capacity,
+            "zones": {
+                room_id: {"stored": len(zone), **zone.stats()}
+                for room_id, zone in self.zones.items()
+            },
+        }
@@ -2,14 +2,24 @@
 """Client for the Koolnova REST API."""
 
 import logging
+import threading
 import time
+from collections import deque
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Dict
 from typing import Optional
 
+from .exceptions import KoolnovaAuthError
 from .exceptions import KoolnovaError
-from .session import KoolnovaClientSession
-from .const import AUTH_FAILURE_COOLDOWN, COMMON_HEADERS, PATCH_HEADERS
+from .exceptions import KoolnovaUnauthorizedError
+from .deadline import Deadline
+from .const import AUTH_FAILURE_COOLDOWN, COMMON_HEADERS, DEFAULT_AUTH_TIMEOUT, PATCH_HEADERS
+from .const import MIN_TOKEN_LIFETIME, TOKEN_REFRESH_MARGIN, TOKEN_REVOCATION_SAMPLES
+
+if TYPE_CHECKING:
+    # requests (via session.py) is imported on the first login, not with the module
+    from .session import KoolnovaClientSession
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,7 +27,9 @@ _LOGGER = logging.getLogger(__name__)
 class KoolnovaAPIRestClient:
     """Proxy to the Koolnova REST API."""
 
-    # Token expires after 1 hour (3600 seconds) - use 50 minutes to be safe
+    # Token expires after 1 hour (3600 seconds) - use 50 minutes to be safe.
+    # Only a starting guess: tokens that announce their expiry (JWT exp) use
+    # it, and early revocations (401) lower the learned lifetime.
     TOKEN_LIFETIME = 3000  # 50 minutes in seconds
 
     def __init__(self, username: str, password: str, email: Optional[str] = None) -> None:
@@ -31,54 +43,191 @@ class KoolnovaAPIRestClient:
         self.username = username
         self.password = password
         self.email = email
-        self.session: Optional[KoolnovaClientSession] = None
+        self.session: Optional["KoolnovaClientSession"] = None
         self._last_auth_failure: float = 0.0
+        # Serializa la creacion de sesion: peticiones concurrentes (proyectos y
+        # sensores en paralelo, comandos) comparten un unico login
+        self._session_lock = threading.Lock()
+        # Presupuesto maximo de un login (reintentos incluidos)
+        self.auth_timeout: float = DEFAULT_AUTH_TIMEOUT
+        # Vida de los tokens aprendida de las revocaciones observadas (401)
+        self.token_lifetime: float = self.TOKEN_LIFETIME
+        self._revocation_ages: deque = deque(maxlen=TOKEN_REVOCATION_SAMPLES)
+        # Los tokens emitidos antes de un cambio de credenciales no cuentan
+        self._credentials_changed_at: float = 0.0
+        self.reauths = 0
+
+    def _session_lifetime(self, session: "KoolnovaClientSession") -> float:
+        """Return how long a session's token is used before a proactive refresh."""
+        if session.token_expires_in is not None:
+            return max(MIN_TOKEN_LIFETIME, session.token_expires_in - TOKEN_REFRESH_MARGIN)
+        return self.token_lifetime
 
     def _is_session_valid(self) -> bool:
         """Check if current session is valid and not expired."""
         if self.session is None:
             return False
+        if self.session.revoked:
+            return False
 
         # Check if token has expired
-        if hasattr(self.session, 'token_created'):
-            elapsed = time.time() - self.session.token_created
-            if elapsed > self.TOKEN_LIFETIME:
-                _LOGGER.debug("Session token expired (%.0f seconds old)", elapsed)
-                return False
+        elapsed = time.time() - self.session.token_created
+        if elapsed > self._session_lifetime(self.session):
+            _LOGGER.debug("Session token expired (%.0f seconds old)", elapsed)
+            if self.session.token_expires_in is None:
+                self._record_survival(elapsed)
+            return False
 
         return True
 
-    def _get_session(self) -> KoolnovaClientSession:
-        """Get a valid session, creating or refreshing if necessary."""
-        if not self._is_session_valid():
-            # Cooldown after a failed login: Koolnova auto-bans IPs that spam
-            # failed auth attempts (issue #4), so back off instead of retrying
-            # on every polling cycle.
-            since_failure = time.time() - self._last_auth_failure
-            if self._last_auth_failure and since_failure < AUTH_FAILURE_COOLDOWN:
-                raise KoolnovaError(
-                    f"Authentication recently failed; waiting "
-                    f"{AUTH_FAILURE_COOLDOWN - since_failure:.0f}s before retrying "
-                    "to avoid an IP ban from Koolnova"
+    def credentials_changed(self) -> None:
+        """Note a password change or reauth: 401s on older tokens say nothing about their lifetime."""
+        # Sin el lock: se llama desde el event loop y un login en curso lo retiene
+        self._credentials_changed_at = time.time()
+        self._last_auth_failure = 0.0
+
+    def _revoke(self, session: "KoolnovaClientSession") -> Optional[float]:
+        """Mark a session whose token got a 401 and return its age.
+
+        Returns None if a concurrent request already revoked it.
+        """
+        with self._session_lock:
+            if session.revoked:
+                return None  # otra peticion concurrente ya lo registro
+            session.revoked = True
+            return time.time() - session.token_created
+
+    def _record_revocation(self, session: "KoolnovaClientSession", age: float) -> None:
+        """Learn from a token rejected with 401 once the new login succeeded.
+
+        A single early 401 (password changed in the app, a login elsewhere)
+        must not shorten the refresh period: the lifetime only moves once
+        TOKEN_REVOCATION_SAMPLES revocations agree on it.
+        """
+        with self._session_lock:
+            if session.token_expires_in is not None or session.token_created < self._credentials_changed_at:
+                _LOGGER.info("Koolnova token rejected after %.0fs; logged in again", age)
+                return
+            self._revocation_ages.append(age)
+            if len(self._revocation_ages) == self._revocation_ages.maxlen:
+                ages = sorted(self._revocation_ages)
+                self.token_lifetime = min(
+                    self.TOKEN_LIFETIME,
+                    max(MIN_TOKEN_LIFETIME, ages[len(ages) // 2] - TOKEN_REFRESH_MARGIN),
                 )
+            _LOGGER.info("Koolnova token rejected after %.0fs; logged in again (token lifetime %.0fs, %d/%d samples)",
+                         age, self.token_lifetime, len(self._revocation_ages), self._revocation_ages.maxlen)
+
+    def _record_survival(self, age: float) -> None:
+        """Let the learned lifetime recover when a token outlived it.
+
+        Revocations younger than a token that was never rejected are
+        contradicted and dropped; without a full set of samples left the
+        lifetime doubles back towards TOKEN_LIFETIME. Called with the session
+        lock held.
+        """
+        if self.token_lifetime >= self.TOKEN_LIFETIME:
+            return
+        kept = [sample for sample in self._revocation_ages if sample > age]
+        self._revocation_ages.clear()
+        self._revocation_ages.extend(kept)
+        if len(self._revocation_ages) < self._revocation_ages.maxlen:
+            self.token_lifetime = min(self.TOKEN_LIFETIME, self.token_lifetime * 2)
+            _LOGGER.debug("Koolnova token lived %.0fs without a 401; token lifetime now %.0fs",
+                          age, self.token_lifetime)
+
+    def _session_call(self, deadline: Optional[Deadline], method: str, *args, **kwargs) -> Any:
+        """Call a session method; on a 401 log in again once and replay it.
+
+        The new login goes through _get_session, so it honours the auth
+        cooldown. A 401 means the request was not applied, so replaying a
+        command is safe too. The revocation only counts towards the learned
+        lifetime if the new login works: a rejected password means the
+        credentials changed, not that tokens expire early.
+        """
+        session = self._get_session(deadline)
+        try:
+            return getattr(session, method)(*args, deadline=deadline, **kwargs)
+        except KoolnovaUnauthorizedError:
+            age = self._revoke(session)
+            self.reauths += 1
+            new_session = self._get_session(deadline)
+            if age is not None:
+                self._record_revocation(session, age)
+            return getattr(new_session, method)(*args, deadline=deadline, **kwargs)
+
+    def token_info(self) -> Dict[str, Any]:
+        """Return the token lifetime state for diagnostics."""
+        session = self.session
+        return {
+            "lifetime": self._session_lifetime(session) if session is not None else self.token_lifetime,
+            "source": ("jwt" if session is not None and session.token_expires_in is not None
+                       else "learned" if self.token_lifetime != self.TOKEN_LIFETIME else "default"),
+            "age": time.time() - session.token_created if session is not None else None,
+            "revocation_ages": [round(age) for age in self._revocation_ages],
+            "reauths": self.reauths,
+        }
 
-            _LOGGER.debug("Creating new session (previous was invalid/expired)")
-            try:
-                self.session = KoolnovaClientSession(self.username, self.password, self.email)
-                self._last_auth_failure = 0.0
-            except Exception as e:
-                _LOGGER.error("Failed to create new session: %s", e)
-                self.session = None
-                self._last_auth_failure = time.time()
-                raise
+    def _get_session(self, deadline: Optional[Deadline] = None) -> "KoolnovaClientSession":
+        """Get a valid session, creating or refreshing if necessary.
 
-        return self.session
+        A login triggered by an operation gets the auth budget, capped by what
+        is left of the operation's own deadline.
+        """
+        with self._session_lock:
+            if not self._is_session_valid():
+                # Cooldown after a failed login: Koolnova auto-bans IPs that spam
+                # failed auth attempts (issue #4), so back off instead of retrying
+                # on every polling cycle.
+                since_failure = time.time() - self._last_auth_failure
+                if self._last_auth_failure and since_failure < AUTH_FAILURE_COOLDOWN:
+                    raise KoolnovaAuthError(
+                        f"Authentication recently failed; waiting "
+                        f"{AUTH_FAILURE_COOLDOWN - since_failure:.0f}s before retrying "
+                        "to avoid an IP ban from Koolnova"
+                    )
+
+                _LOGGER.debug("Creating new session (previous was invalid/expired)")
+                from .session import KoolnovaClientSession
+                try:
+                    auth_deadline = (deadline.child(self.auth_timeout) if deadline is not None
+                                     else Deadline(self.auth_timeout))
+                    previous = self.session
+                    self.session = KoolnovaClientSession(self.username, self.password, self.email, auth_deadline)
+                    if previous is not None:
+                        # Conservar validadores, resultados y estadisticas (transferencia, reintentos)
+                        self.session.conditional_cache = previous.conditional_cache
+                        self.session.transfer_stats = previous.transfer_stats
+                        self.session.retry_stats = previous.retry_stats
+                    self._last_auth_failure = 0.0
+                except Exception as e:
+                    _LOGGER.error("Failed to create new session: %s", e)
+                    self.session = None
+                    self._last_auth_failure = time.time()
+                    raise
+
+            return self.session
 
     
 
    
 
-    def get_project(self) -> Dict[str, Any]:
+    def authenticate(self, deadline: Optional[Deadline] = None) -> str:
+        """Log in without fetching any data (credential check).
+
+        The resulting session is kept, so the client can be handed over and
+        reused without a second login.
+
+        Returns:
+            The bearer token of the session that was checked, read under the
+            session lock so a concurrent re-login cannot swap it.
+
+        Raises:
+            KoolnovaInvalidCredentialsError: if the email/password are rejected.
+        """
+        return self._get_session(deadline).bearerToken
+
+    def get_project(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
 
         # Use the same endpoint shape as the webapp: trailing slash + common
         # query params. Add browser-like headers to match the web request.
@@ -91,9 +240,14 @@ class KoolnovaAPIRestClient:
         }
         headers = COMMON_HEADERS.copy()
 
-        response = self._get_session().rest_request("GET", "projects/", params=params, headers=headers)
-        response.raise_for_status()
-        json_resp = response.json()
+        # Sin cambios (304 o cuerpo identico): se devuelve la misma lista ya parseada
+        return self._session_call(
+            deadline, "conditional_get", "projects/", self._parse_projects, params=params, headers=headers
+        )
+
+    @staticmethod
+    def _parse_projects(json_resp: Any) -> list:
+        """Convert the projects/ response into the integration's project format."""
         if not json_resp:
             raise KoolnovaError(
                 f"Error : No data received for Koolnova by the API. "
@@ -109,8 +263,6 @@ class KoolnovaAPIRestClient:
                 )
         projects = []
         for project in json_resp["data"]:
-            _LOGGER.debug("Project Name : %s", project["name"])
-            _LOGGER.debug("Topic Name : %s", project["topic"]["name"])
             projects.append({
                 "Project_Name": project["name"],
                 "Topic_Name": project["topic"]["name"],
@@ -121,18 +273,24 @@ class KoolnovaAPIRestClient:
                 "eco": project["topic"]["eco"],
                 "last_sync": project["topic"]["last_sync"],
 
-
             })
 
+        # Solo un resumen por llamada, sin volcar cada elemento
+        _LOGGER.debug("Fetched %d projects", len(projects))
         return projects
 
-    def get_sensors(self) -> Dict[str, Any]:
+    def get_sensors(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
 
         # Request the sensors endpoint using trailing slash and browser-like headers
         headers = COMMON_HEADERS.copy()
 
-        resp = self._get_session().rest_request("GET", "topics/sensors/", headers=headers)
-        json_resp = resp.json()
+        return self._session_call(
+            deadline, "conditional_get", "topics/sensors/", self._parse_sensors, headers=headers
+        )
+
+    @classmethod
+    def _parse_sensors(cls, json_resp: Any) -> list:
+        """Convert the topics/sensors/ response into the integration's sensor format."""
         if not json_resp:
             raise KoolnovaError(
                 f"Error : No data received for Koolnova by the API. "
@@ -147,38 +305,59 @@ class KoolnovaAPIRestClient:
                 f"Error :  No data"
                 )
 
-        rooms = []
-        for room in json_resp["data"]:
-            _LOGGER.debug("Room Name : %s", room["name"])
-            _LOGGER.debug("Room Room_actual_temp : %s", room["temperature"])
-            _LOGGER.debug("Topic Info : %s", room.get("topic_info", {}))
-            # Récupérer l'id de topic_info
-            topic_id = room.get("topic_info", {}).get("id", "Unknown")
-            # Incluir toda la información de topic_info para acceder a RSSI, online, sync
-            topic_info = room.get("topic_info", {})
-
-            rooms.append({
-                "Room_Name": room["name"],
-                "Room_id": room["id"],
-                "Room_status": room["status"],
-                "Room_update_at": room["updated_at"],
-                "Room_actual_temp": room["temperature"],
-                "Room_setpoint_temp": room["setpoint_temperature"],
-                "Room_speed": room["speed"],
-                "Topic_id": topic_id,
-                "topic_info": topic_info  # AÑADIDO: Toda la información de conectividad
-            })
-
+        rooms = [cls.parse_room(room) for room in json_resp["data"]]
+        _LOGGER.debug("Fetched %d sensors", len(rooms))
         return rooms
        
 
-    def update_sensor(self, sensor_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def get_sensor(self, sensor_id: int, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Read a single sensor (zone), the smallest read available.
+
+        Args:
+            sensor_id: The ID of the sensor to read.
+            deadline: Optional time budget for the read.
+
+        Returns:
+            The sensor in the same format as the items returned by get_sensors.
+        """
+        url = f"topics/sensors/{sensor_id}/"
+        headers = COMMON_HEADERS.copy()
+
+        response = self._session_call(deadline, "rest_request", "GET", url, headers=headers)
+        room = response.json()
+        if not room or "id" not in room:
+            raise KoolnovaError(f"Error : No data received for sensor {sensor_id}")
+
+        return self.parse_room(room)
+
+    @staticmethod
+    def parse_room(room: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw API room into the integration's sensor format."""
+        # Récupérer l'id de topic_info
+        topic_info = room.get("topic_info") or {}
+        # Incluir toda la información de topic_info para acceder a RSSI, online, sync
+        return {
+            "Room_Name": room["name"],
+            "Room_id": room["id"],
+            "Room_status": room["status"],
+            "Room_update_at": room["updated_at"],
+            "Room_actual_temp": room["temperature"],
+            "Room_setpoint_temp": room["setpoint_temperature"],
+            "Room_speed": room["speed"],
+            "Topic_id": topic_info.get("id", "Unknown"),
+            "topic_info": topic_info  # AÑADIDO: Toda la información de conectividad
+        }
+
+    def update_sensor(self, sensor_id: int, payload: Dict[str, Any],
+                      deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Update specific attributes for a sensor.
 
         Args:
             sensor_id: The ID of the sensor to update.
             payload: A dictionary containing the attributes to update and their new values.
+            deadline: Optional time budget for the command.
 
         Returns:
             The JSON response from the API.
@@ -187,19 +366,21 @@ class KoolnovaAPIRestClient:
         headers = PATCH_HEADERS.copy()
 
         # Send the PUT request
-        response = self._get_session().rest_request("PUT", url, json=payload, headers=headers)
+        response = self._session_call(deadline, "rest_request", "PUT", url, json=payload, headers=headers)
         response.raise_for_status()
 
-        _LOGGER.debug("Sensor %s updated successfully with payload %s: %s", sensor_id, payload, response.json())
+        _LOGGER.debug("Sensor %s updated with payload %s", sensor_id, payload)
         return response.json()
 
-    def update_project(self, topic_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def update_project(self, topic_id: int, payload: Dict[str, Any],
+                       deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Update specific attributes for a project (topic).
 
         Args:
             topic_id: The ID of the topic/project to update.
             payload: A dictionary containing the attributes to update and their new values.
+            deadline: Optional time budget for the command.
 
         Returns:
             The JSON response from the API.
@@ -207,8 +388,8 @@ class KoolnovaAPIRestClient:
         url = f"topics/{topic_id}/"
         headers = PATCH_HEADERS.copy()
 
-        response = self._get_session().rest_request("PATCH", url, json=payload, headers=headers)
+        response = self._session_call(deadline, "rest_request", "PATCH", url, json=payload, headers=headers)
         response.raise_for_status()
 
-        _LOGGER.debug("Project %s updated successfully with payload %s: %s", topic_id, payload, response.json())
+        _LOGGER.debug("Project %s updated with payload %s", topic_id, payload)
         return response.json()
@@ -33,3 +33,34 @@ PATCH_HEADERS["content-type"] = "application/json"
 # Koolnova bans IPs automatically when it detects repeated failed logins
 # (see issue #4), so never re-attempt auth in a tight polling loop.
 AUTH_FAILURE_COOLDOWN = 300
+
+# Default time budgets (seconds) when the caller does not pass a Deadline.
+# Without them a hung connection would block an executor thread forever.
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_AUTH_TIMEOUT = 90
+# Upper bound for a single login attempt within the auth budget
+AUTH_ATTEMPT_TIMEOUT = 30
+
+# Read size when streaming (and decompressing) response bodies
+TRANSFER_CHUNK_SIZE = 16384
+
+# Token refresh: refresh this long before the expiry announced by the token
+# (JWT exp) or learned from early revocations, never before MIN_TOKEN_LIFETIME.
+# The learned lifetime is the median age of the last TOKEN_REVOCATION_SAMPLES
+# tokens rejected with 401 (it only changes once all samples are collected),
+# and doubles back towards the default when a token outlives it.
+TOKEN_REFRESH_MARGIN = 60
+MIN_TOKEN_LIFETIME = 120
+TOKEN_REVOCATION_SAMPLES = 5
+
+# Retry policy of data requests: only GETs, and only when no connection could
+# be opened (connect timeout, refused, DNS), with full jitter. Resets after
+# sending, read timeouts, 5xx and 429 are not retried: the request may have
+# reached the server, and Koolnova bans IPs that query more than once every
+# 30s (issue #4), so the circuit breaker and the next poll handle them.
+# Commands (PUT) are never retried here: a failed one is reported to the user.
+# Retries never outlive the caller's deadline.
+RETRY_METHODS = frozenset({"GET"})
+REQUEST_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Time budget propagated from the caller down to the HTTP transport."""
+
+import time
+from typing import Optional
+
+from .exceptions import KoolnovaTimeoutError
+
+
+class Deadline:
+    """Absolute deadline for an operation (poll, command, auth).
+
+    The caller creates it with the operation budget and passes it down; every
+    request uses the remaining time as its timeout and retry loops stop
+    sleeping once the budget is spent, so a slow cloud cannot pin executor
+    threads indefinitely.
+    """
+
+    __slots__ = ("expires",)
+
+    def __init__(self, seconds: float) -> None:
+        """Initialize a deadline `seconds` from now."""
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Return the seconds left (never negative)."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        """Return True once the budget is spent."""
+        return time.monotonic() >= self.expires
+
+    def child(self, seconds: float) -> "Deadline":
+        """Return a deadline of at most `seconds` that never outlives this one."""
+        child = Deadline(seconds)
+        child.expires = min(child.expires, self.expires)
+        return child
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Return the timeout for the next request.
+
+        Raises:
+            KoolnovaTimeoutError: if the budget is already spent.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise KoolnovaTimeoutError("Operation deadline exceeded")
+        return min(remaining, cap) if cap is not None else remaining
+
+    def sleep(self, delay: float) -> None:
+        """Sleep before a retry if the budget allows a new attempt afterwards.
+
+        Raises:
+            KoolnovaTimeoutError: if sleeping would exhaust the budget.
+        """
+        if delay >= self.remaining():
+            raise KoolnovaTimeoutError(
+                f"Operation deadline exceeded (retry in {delay:.1f}s, {self.remaining():.1f}s left)"
+            )
+        time.sleep(delay)
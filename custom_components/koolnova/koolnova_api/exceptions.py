@@ -13,3 +13,39 @@ class KoolnovaError(Exception):
             args: the message or root cause of the error
         """
         Exception.__init__(self, *args)
+
+
+class KoolnovaAuthError(KoolnovaError):
+    """Authentication rejected (bad credentials, revoked token) or in cooldown."""
+
+
+class KoolnovaInvalidCredentialsError(KoolnovaAuthError):
+    """The login endpoint rejected the email/password."""
+
+
+class KoolnovaUnauthorizedError(KoolnovaAuthError):
+    """A data request answered 401: the token expired or was revoked."""
+
+
+class KoolnovaRateLimitError(KoolnovaError):
+    """The API answered 429 Too Many Requests."""
+
+
+class KoolnovaServerError(KoolnovaError):
+    """The API answered with a 5xx status."""
+
+
+class KoolnovaConnectionError(KoolnovaError):
+    """The request did not get a response (DNS, reset, refused...)."""
+
+
+class KoolnovaTimeoutError(KoolnovaConnectionError):
+    """The request timed out."""
+
+
+class KoolnovaCircuitOpenError(KoolnovaError):
+    """The request was not sent: the account's circuit breaker is open."""
+
+
+class KoolnovaBusyError(KoolnovaError):
+    """The request was not sent: too many requests of the account are queued locally."""
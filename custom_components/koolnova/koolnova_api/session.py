@@ -1,20 +1,188 @@
 # -*- coding: utf-8 -*-
 """Session manager for the Koolnova REST API in order to maintain authentication token between calls."""
 
+import base64
+import hashlib
+import json
 import logging
+import random
 import time
+from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import Optional
+from urllib.parse import urlencode
 
+from requests import ConnectionError as RequestsConnectionError
+from requests import ConnectTimeout
+from requests import RequestException
 from requests import Response
 from requests import Session
+from requests import Timeout
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.request import ACCEPT_ENCODING
 
+from .exceptions import KoolnovaAuthError
+from .exceptions import KoolnovaConnectionError
+from .exceptions import KoolnovaError
+from .exceptions import KoolnovaInvalidCredentialsError
+from .exceptions import KoolnovaRateLimitError
+from .exceptions import KoolnovaServerError
+from .exceptions import KoolnovaTimeoutError
+from .exceptions import KoolnovaUnauthorizedError
+
+from .deadline import Deadline
+
+from .const import AUTH_ATTEMPT_TIMEOUT
 from .const import COMMON_HEADERS
+from .const import DEFAULT_AUTH_TIMEOUT
+from .const import DEFAULT_REQUEST_TIMEOUT
 from .const import FULL_USER_AGENT
 from .const import KOOLNOVA_API_URL
 from .const import KOOLNOVA_AUTH_URL
+from .const import REQUEST_MAX_ATTEMPTS
+from .const import RETRY_BASE_DELAY
+from .const import RETRY_MAX_DELAY
+from .const import RETRY_METHODS
+from .const import TRANSFER_CHUNK_SIZE
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def raise_for_status(response: Response, message: str = "") -> None:
+    """Raise the Koolnova exception matching an HTTP error status.
+
+    Args:
+        response: the response to check.
+        message: optional prefix for the error message.
+    """
+    if response.status_code < 400:
+        return
+
+    detail = f"{message}{response.status_code} {response.reason} for url: {response.url}"
+    if response.status_code == 429:
+        raise KoolnovaRateLimitError(detail)
+    if response.status_code >= 500:
+        raise KoolnovaServerError(detail)
+    if response.status_code == 401:
+        raise KoolnovaUnauthorizedError(detail)
+    if response.status_code == 403:
+        raise KoolnovaAuthError(detail)
+    raise KoolnovaError(detail)
+
+
+def jwt_lifetime(token: str) -> Optional[float]:
+    """Return the validity in seconds announced by a JWT (exp - iat), None if not a JWT."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+        expires = float(payload["exp"])
+        issued = float(payload.get("iat", time.time()))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return expires - issued
+
+
+class _ConditionalEntry:
+    """Validators, body hash and parsed result of the last response of a URL."""
+
+    __slots__ = ("etag", "last_modified", "digest", "value")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], digest: bytes, value: Any) -> None:
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.value = value
+
+
+class ConditionalCache:
+    """Per-URL state for conditional GETs, kept across re-logins.
+
+    Stats count the responses answered with 304 (not_modified), the 200
+    responses whose body was byte-identical to the previous one (identical)
+    and the ones that had to be decoded (changed).
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, _ConditionalEntry] = {}
+        self.stats = {"not_modified": 0, "identical": 0, "changed": 0}
+
+
+class TransferStats:
+    """Bytes on the wire vs decoded bytes per endpoint, kept across re-logins."""
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, path: str, wire: int, decoded: int, encoding: str) -> None:
+        """Add one response (304s count with 0 decoded bytes)."""
+        stats = self.endpoints.setdefault(path, {
+            "responses": 0, "wire_bytes": 0, "decoded_bytes": 0, "encodings": {},
+        })
+        stats["responses"] += 1
+        stats["wire_bytes"] += wire
+        stats["decoded_bytes"] += decoded
+        stats["encodings"][encoding] = stats["encodings"].get(encoding, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the totals per endpoint with mean sizes and compression ratio."""
+        return {
+            path: {
+                **stats,
+                "encodings": dict(stats["encodings"]),
+                "mean_wire_bytes": round(stats["wire_bytes"] / stats["responses"]),
+                "mean_decoded_bytes": round(stats["decoded_bytes"] / stats["responses"]),
+                "ratio": round(stats["wire_bytes"] / stats["decoded_bytes"], 3) if stats["decoded_bytes"] else None,
+            }
+            for path, stats in self.endpoints.items()
+        }
+
+
+class RetryStats:
+    """Retries of data requests, kept across re-logins."""
+
+    def __init__(self) -> None:
+        self.retries: Dict[str, int] = {}
+        self.recovered = 0
+        self.gave_up = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "retries": dict(self.retries),
+            "recovered": self.recovered,
+            "gave_up": self.gave_up,
+        }
+
+
+def _connection_refused(exc: BaseException) -> bool:
+    """Return True if a requests ConnectionError failed before connecting.
+
+    requests raises ConnectionError both for connections that were never
+    established (refused, DNS) and for resets or RemoteDisconnected after
+    the request was sent; only the first kind is safe to retry.
+    """
+    seen = set()
+    stack = [exc]
+    while stack:
+        cause = stack.pop()
+        if cause is None or id(cause) in seen:
+            continue
+        seen.add(id(cause))
+        if isinstance(cause, NewConnectionError):
+            return True
+        stack.extend((getattr(cause, "reason", None), cause.__cause__, cause.__context__))
+        stack.extend(arg for arg in getattr(cause, "args", ()) if isinstance(arg, BaseException))
+    return False
+
+
+def _retry_delay(attempt: int) -> float:
+    """Return the wait before the next attempt (full jitter)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
 class KoolnovaClientSession(Session):
     """HTTP session manager for Koolnova api.
 
@@ -24,14 +192,20 @@ class KoolnovaClientSession(Session):
 
     host: str = KOOLNOVA_API_URL
 
-    def __init__(self, username: str, password: str, email: Optional[str] = None) -> None:
+    def __init__(self, username: str, password: str, email: Optional[str] = None,
+                 deadline: Optional[Deadline] = None) -> None:
         """Initialize and authenticate.
 
         Args:
             username: the flipr registered user
             password: the flipr user's password
+            email: the account email (used as login)
+            deadline: time budget for the whole login, retries included
         """
         Session.__init__(self)
+        self.conditional_cache = ConditionalCache()
+        self.transfer_stats = TransferStats()
+        self.retry_stats = RetryStats()
         _LOGGER.debug("Starting authentication for username '%s' (email: %s)", username, email)
 
         # Build payload. The API authenticates under the 'email' field
@@ -48,16 +222,20 @@ class KoolnovaClientSession(Session):
         # sec-ch-ua / sec-fetch-* headers and a modern Chrome UA (issue #4).
         headers_token = COMMON_HEADERS.copy()
         headers_token["content-type"] = "application/json"
+        headers_token["accept-encoding"] = ACCEPT_ENCODING
 
         # Improved retry logic with exponential backoff for rate limiting
         response = None
         max_attempts = 5
         base_delay = 2.0  # Start with 2 seconds
         max_delay = 60.0  # Cap at 60 seconds
+        if deadline is None:
+            deadline = Deadline(DEFAULT_AUTH_TIMEOUT)
 
         for attempt in range(max_attempts):
+            timeout = deadline.timeout(AUTH_ATTEMPT_TIMEOUT)
             try:
-                response = super().request("POST", KOOLNOVA_AUTH_URL, json=payload, headers=headers_token, timeout=30)
+                response = super().request("POST", KOOLNOVA_AUTH_URL, json=payload, headers=headers_token, timeout=timeout)
             except Exception as e:
                 _LOGGER.exception("Exception when calling auth endpoint (attempt %d/%d): %s", attempt + 1, max_attempts, e)
                 response = None
@@ -67,7 +245,7 @@ class KoolnovaClientSession(Session):
                 if attempt < max_attempts - 1:
                     delay = min(base_delay * (2 ** attempt), max_delay)
                     _LOGGER.debug("Network error, retrying in %.1f seconds (attempt %d/%d)", delay, attempt + 1, max_attempts)
-                    time.sleep(delay)
+                    deadline.sleep(delay)
                 continue
 
             _LOGGER.debug("Auth response status: %s", response.status_code)
@@ -85,8 +263,12 @@ class KoolnovaClientSession(Session):
                     delay = min(32.0 + (attempt * 5), max_delay)
 
                 if attempt < max_attempts - 1:
+                    if delay >= deadline.remaining():
+                        # Sin presupuesto para esperar: reportar el 429 tal cual
+                        _LOGGER.warning("Rate limited (429) and no time left in the auth budget to retry")
+                        break
                     _LOGGER.warning("Rate limited (429), retrying in %.1f seconds (attempt %d/%d)", delay, attempt + 1, max_attempts)
-                    time.sleep(delay)
+                    deadline.sleep(delay)
                     continue
                 else:
                     _LOGGER.error("Rate limit persisted after %d attempts", max_attempts)
@@ -97,14 +279,16 @@ class KoolnovaClientSession(Session):
                     delay = min(base_delay * (2 ** attempt), 30.0)
                     _LOGGER.debug("Server error (%d), retrying in %.1f seconds (attempt %d/%d)",
                                 response.status_code, delay, attempt + 1, max_attempts)
-                    time.sleep(delay)
+                    if delay >= deadline.remaining():
+                        break
+                    deadline.sleep(delay)
                     continue
             else:
                 # Success or client error - break
                 break
 
         if response is None:
-            raise RuntimeError(f"Authentication request failed after {max_attempts} attempts (no response)")
+            raise KoolnovaConnectionError(f"Authentication request failed after {max_attempts} attempts (no response)")
 
         # Read body for easier debugging when failing (do not log it on
         # success: it contains the auth token)
@@ -113,30 +297,48 @@ class KoolnovaClientSession(Session):
         except Exception:
             body = "<unable to read response body>"
 
-        try:
-            response.raise_for_status()
-        except Exception as exc:
-            raise RuntimeError(f"Authentication failed: {exc} - {body}") from exc
+        if response.status_code in (400, 401, 403):
+            # Credenciales rechazadas (400 "Unable to log in...", 401, 403)
+            raise KoolnovaInvalidCredentialsError(
+                f"Authentication failed: {response.status_code} {response.reason} - {body}"
+            )
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise KoolnovaAuthError(f"Authentication failed: {response.status_code} {response.reason} - {body}")
+        raise_for_status(response, "Authentication failed: ")
 
         data = response.json()
         # Support common token field names
         token = data.get("access_token") or data.get("token") or data.get("accessToken")
         if not token:
-            raise RuntimeError(f"Authentication response did not contain a token: {data}")
+            raise KoolnovaAuthError(f"Authentication response did not contain a token: {data}")
 
         self.bearerToken = str(token)
         self.token_created = time.time()  # Track when token was created
+        # Validez anunciada por el token (JWT exp) y marca de token rechazado (401)
+        self.token_expires_in = jwt_lifetime(self.bearerToken)
+        self.revoked = False
         _LOGGER.debug("Authentication successful, token obtained")
 
-    def rest_request(self, method: str, path: str, **kwargs) -> Response:
+    def rest_request(self, method: str, path: str, deadline: Optional[Deadline] = None,
+                     conditional: Optional[_ConditionalEntry] = None, **kwargs) -> Response:
         """
         Make a request using token authentication.
 
         Args:
             method: HTTP method (e.g., "GET", "POST", "PATCH").
             path: Path of the REST API endpoint.
+            deadline: time budget of the calling operation; its remaining time
+                is used as the request timeout.
+            conditional: cached entry of a previous response; its validators
+                are sent as If-None-Match / If-Modified-Since.
             **kwargs: Additional arguments for the request (e.g., headers, json, data).
 
+        GET requests (see RETRY_METHODS) are retried only when no connection
+        could be opened (connect timeout, refused, DNS), as long as the wait
+        fits in the deadline. Resets after sending, read timeouts, 5xx and 429
+        may have reached the server and are left to the circuit breaker and
+        the next poll.
+
         Returns:
             The Response object corresponding to the result of the API request.
         """
@@ -144,11 +346,120 @@ class KoolnovaClientSession(Session):
             "Authorization": "Bearer " + self.bearerToken,
             "Cache-Control": "no-cache",
             "User-Agent": FULL_USER_AGENT,
+            # Compressed responses: gzip/deflate always, br (and zstd) only
+            # when urllib3 has a decoder installed, so the server never picks
+            # an encoding we cannot decode. Decompressed while streaming.
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
         # Fusionner les headers passés en argument
         headers = kwargs.pop("headers", {})
         headers_auth.update(headers)
+        if conditional is not None:
+            if conditional.etag:
+                headers_auth["If-None-Match"] = conditional.etag
+            if conditional.last_modified:
+                headers_auth["If-Modified-Since"] = conditional.last_modified
+        fixed_timeout = kwargs.pop("timeout", None)
+        attempts = REQUEST_MAX_ATTEMPTS if method.upper() in RETRY_METHODS else 1
 
-        response = super().request(method, f"{self.host}/{path}", headers=headers_auth, **kwargs)
-        response.raise_for_status()
-        return response
+        for attempt in range(1, attempts + 1):
+            if fixed_timeout is not None:
+                timeout = fixed_timeout
+            else:
+                timeout = deadline.timeout() if deadline is not None else DEFAULT_REQUEST_TIMEOUT
+            response = None
+            try:
+                response = super().request(
+                    method, f"{self.host}/{path}", headers=headers_auth, timeout=timeout, **kwargs
+                )
+                raise_for_status(response)
+            except ConnectTimeout as exc:
+                # Sin conexion: la peticion no llego al servidor, se puede reintentar
+                error, reason = KoolnovaTimeoutError(f"Timeout connecting for {path}: {exc}"), "connect_timeout"
+                error.__cause__ = exc
+            except RequestsConnectionError as exc:
+                if not _connection_refused(exc):
+                    # Reset o RemoteDisconnected: la peticion pudo llegar al
+                    # servidor y contar para el limite de 30 s por IP
+                    raise KoolnovaConnectionError(f"Error calling {path}: {exc}") from exc
+                error, reason = KoolnovaConnectionError(f"Error connecting for {path}: {exc}"), "connection_refused"
+                error.__cause__ = exc
+            except Timeout as exc:
+                # El servidor recibio la peticion: no insistir (limite de 30 s por IP)
+                raise KoolnovaTimeoutError(f"Timeout calling {path}: {exc}") from exc
+            except RequestException as exc:
+                raise KoolnovaConnectionError(f"Error calling {path}: {exc}") from exc
+            except KoolnovaError:
+                response.close()  # release the connection of streamed requests
+                raise
+            else:
+                if attempt > 1:
+                    self.retry_stats.recovered += 1
+                return response
+
+            delay = _retry_delay(attempt) if attempt < attempts else None
+            limit = deadline.remaining() if deadline is not None else RETRY_MAX_DELAY
+            if delay is None or delay >= limit:
+                if attempts > 1:
+                    self.retry_stats.gave_up += 1
+                raise error
+            _LOGGER.debug("%s %s failed (%s), retrying in %.1fs (attempt %d/%d)",
+                          method, path, reason, delay, attempt, attempts)
+            self.retry_stats.retries[reason] = self.retry_stats.retries.get(reason, 0) + 1
+            time.sleep(delay)
+
+    def conditional_get(self, path: str, parse: Callable[[Any], Any],
+                        deadline: Optional[Deadline] = None, **kwargs) -> Any:
+        """
+        GET an endpoint conditionally and return its parsed body.
+
+        On 304, or on a 200 whose body is byte-identical to the previous one
+        (servers that send no validators), the previously parsed object
+        itself is returned without decoding, so callers can tell "unchanged"
+        by identity. Callers must treat that object as read-only.
+
+        Args:
+            path: Path of the REST API endpoint.
+            parse: Converts the decoded JSON into the value to cache and return.
+            deadline: time budget of the calling operation.
+            **kwargs: Additional arguments for the request (params, headers).
+        """
+        params = kwargs.get("params")
+        key = f"{path}?{urlencode(sorted(params.items()))}" if params else path
+        cache = self.conditional_cache
+        entry = cache.entries.get(key)
+
+        response = self.rest_request("GET", path, deadline=deadline, conditional=entry, stream=True, **kwargs)
+        with response:
+            if entry is not None and response.status_code == 304:
+                cache.stats["not_modified"] += 1
+                self.transfer_stats.record(path, 0, 0, "not_modified")
+                return entry.value
+            body = self._read_body(response, path)
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if entry is not None and entry.digest == digest:
+            cache.stats["identical"] += 1
+            entry.etag, entry.last_modified = etag, last_modified
+            return entry.value
+
+        value = parse(json.loads(body))
+        cache.stats["changed"] += 1
+        cache.entries[key] = _ConditionalEntry(etag, last_modified, digest, value)
+        return value
+
+    def _read_body(self, response: Response, path: str) -> bytes:
+        """Read a streamed body, decompressing chunk by chunk, and record its sizes."""
+        try:
+            body = b"".join(response.iter_content(TRANSFER_CHUNK_SIZE))
+        except Timeout as exc:
+            raise KoolnovaTimeoutError(f"Timeout reading {path}: {exc}") from exc
+        except RequestException as exc:
+            raise KoolnovaConnectionError(f"Error reading {path}: {exc}") from exc
+        # raw.tell(): bytes read from the socket, before decompression
+        self.transfer_stats.record(
+            path, response.raw.tell(), len(body), response.headers.get("Content-Encoding", "identity")
+        )
+        return body
@@ -0,0 +1,142 @@
+"""Opt-in profiling of coordinator listeners, state writes and entity properties."""
+
+import functools
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from .const import PROFILING_MAX_PATHS, PROFILING_SAMPLES_PER_PATH, PROFILING_TOP_N
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _PathStats:
+    """Aggregated timings of one code path."""
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self, samples: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=samples)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.samples.append(duration)
+
+    def as_dict(self, path: str) -> dict[str, Any]:
+        recent = sorted(self.samples)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "path": path,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p95_ms": round(p95 * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class KoolnovaProfiler:
+    """Timings of the entity update path, kept only while profiling is enabled.
+
+    Memory is bounded: at most PROFILING_MAX_PATHS paths are tracked (new
+    paths beyond that are counted as dropped) and each keeps its totals plus
+    the last PROFILING_SAMPLES_PER_PATH durations for the p95. When disabled
+    the hooks cost a single attribute check.
+    """
+
+    def __init__(self, max_paths: int = PROFILING_MAX_PATHS,
+                 samples_per_path: int = PROFILING_SAMPLES_PER_PATH) -> None:
+        """Initialize the profiler (disabled)."""
+        self.max_paths = max_paths
+        self.samples_per_path = samples_per_path
+        self.enabled = False
+        self.since: Optional[float] = None
+        self.dropped_paths = 0
+        self._paths: dict[str, _PathStats] = {}
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Turn profiling on or off; enabling starts from empty statistics."""
+        if enabled and not self.enabled:
+            self._paths.clear()
+            self.dropped_paths = 0
+            self.since = time.time()
+            _LOGGER.info("Koolnova profiling enabled")
+        self.enabled = enabled
+
+    def record(self, path: str, duration: float) -> None:
+        """Add one measured duration (seconds) to a path."""
+        stats = self._paths.get(path)
+        if stats is None:
+            if len(self._paths) >= self.max_paths:
+                self.dropped_paths += 1
+                return
+            stats = self._paths[path] = _PathStats(self.samples_per_path)
+        stats.add(duration)
+
+    def wrap(self, path: str, func: Callable) -> Callable:
+        """Return func timed under path while profiling is enabled."""
+        @functools.wraps(func)
+        def _timed(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(path, time.perf_counter() - start)
+
+        return _timed
+
+    def top(self, count: int = PROFILING_TOP_N) -> list[dict[str, Any]]:
+        """Return the slowest paths by total time spent."""
+        ranked = sorted(self._paths.items(), key=lambda item: item[1].total, reverse=True)
+        return [stats.as_dict(path) for path, stats in ranked[:count]]
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return the profiling summary for diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "since": self.since,
+            "paths": len(self._paths),
+            "dropped_paths": self.dropped_paths,
+            "top": self.top(),
+        }
+
+
+def _timed_method(path: str, func: Callable) -> Callable:
+    """Time an entity method with its coordinator's profiler."""
+    @functools.wraps(func)
+    def _timed(self, *args, **kwargs):
+        profiler = self.coordinator.profiler
+        if not profiler.enabled:
+            return func(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            profiler.record(path, time.perf_counter() - start)
+
+    return _timed
+
+
+def profiled_entity(cls):
+    """Class decorator timing the properties and state writes of an entity.
+
+    Every property defined by the class and async_write_ha_state are timed
+    (per class, inclusive of nested calls) with the coordinator's profiler.
+    """
+    name = cls.__name__
+    for attr, value in list(vars(cls).items()):
+        if isinstance(value, property) and value.fget is not None:
+            setattr(cls, attr, property(
+                _timed_method(f"{name}.{attr}", value.fget), value.fset, value.fdel, value.__doc__
+            ))
+    cls.async_write_ha_state = _timed_method(f"{name}.async_write_ha_state", cls.async_write_ha_state)
+    return cls
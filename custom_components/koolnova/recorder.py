@@ -0,0 +1,171 @@
+"""Compact on-disk recorder of coordinator snapshots (one full snapshot, then deltas)."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import DEFAULT_RECORD_SNAPSHOTS, DOMAIN, SNAPSHOT_FORMAT, SNAPSHOT_SEGMENT_RECORDS
+
+_LOGGER = logging.getLogger(__name__)
+
+_KEYS = {"projects": "Topic_id", "sensors": "Room_id"}
+
+
+def normalize_snapshot(data: dict) -> dict[str, dict[str, dict]]:
+    """Index coordinator data by id: {"projects": {id: project}, "sensors": {id: sensor}}.
+
+    Items are kept by reference: the coordinator never edits a cached dict
+    (command responses replace it with a copy), so the last recorded snapshot
+    cannot change under the recorder.
+    """
+    return {
+        kind: {str(item.get(key)): item for item in data.get(kind, [])}
+        for kind, key in _KEYS.items()
+    }
+
+
+def diff_snapshots(old: dict, new: dict) -> tuple[dict, dict]:
+    """Return (set, del): changed fields per item and ids that disappeared."""
+    changed: dict[str, dict] = {}
+    removed: dict[str, list] = {}
+    for kind in _KEYS:
+        before, after = old.get(kind, {}), new.get(kind, {})
+        for item_id, item in after.items():
+            previous = before.get(item_id)
+            if previous is None:
+                fields = dict(item)
+            else:
+                fields = {field: value for field, value in item.items() if previous.get(field) != value}
+            if fields:
+                changed.setdefault(kind, {})[item_id] = fields
+        gone = [item_id for item_id in before if item_id not in after]
+        if gone:
+            removed[kind] = gone
+    return changed, removed
+
+
+class KoolnovaSnapshotRecorder:
+    """Bounded on-disk ring of coordinator snapshots.
+
+    Each poll appends one JSON line: the first line of a segment holds a full
+    snapshot and the following ones only the fields that changed (an
+    unchanged poll costs a bare timestamp). Two segment files are kept; when
+    the current one reaches SNAPSHOT_SEGMENT_RECORDS lines it replaces the
+    previous one and a new segment starts with a full snapshot, so disk use
+    is bounded and every segment can be replayed on its own.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str,
+                 segment_records: int = SNAPSHOT_SEGMENT_RECORDS) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.enabled = DEFAULT_RECORD_SNAPSHOTS
+        self.segment_records = segment_records
+        base = hass.config.path(STORAGE_DIR, f"{DOMAIN}.snapshots.{entry_id}")
+        self.current_path = f"{base}.0.jsonl"
+        self.previous_path = f"{base}.1.jsonl"
+        self._last: Optional[dict] = None
+        # Listas de la ultima grabacion: si el poll devuelve los mismos
+        # objetos (respuesta sin cambios) no hace falta normalizar ni comparar
+        self._last_sources: Optional[tuple] = None
+        self._count: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self.records_written = 0
+        self.bytes_written = 0
+
+    async def async_record(self, data: dict, timestamp: Optional[float] = None) -> None:
+        """Append the snapshot of a successful poll."""
+        if not self.enabled:
+            return
+        record: dict[str, Any] = {"t": round(timestamp or time.time(), 1)}
+        sources = tuple(data.get(kind) for kind in _KEYS)
+        if self._last is not None and self._last_sources is not None and all(
+            new is old for new, old in zip(sources, self._last_sources)
+        ):
+            snapshot = self._last
+        else:
+            snapshot = normalize_snapshot(data)
+        self._last_sources = sources
+        if self._last is None:
+            record["full"] = snapshot
+        elif snapshot is not self._last:
+            changed, removed = diff_snapshots(self._last, snapshot)
+            if changed:
+                record["set"] = changed
+            if removed:
+                record["del"] = removed
+        self._last = snapshot
+
+        async with self._lock:
+            try:
+                await self.hass.async_add_executor_job(self._write, record, snapshot)
+            except OSError as err:
+                _LOGGER.warning("Could not write Koolnova snapshot: %s", err)
+                # Start the next segment from a full snapshot again
+                self._last = self._last_sources = None
+
+    def _write(self, record: dict, snapshot: dict) -> None:
+        """Append a record, rotating segments when the current one is full."""
+        if self._count is None:
+            self._count = _count_lines(self.current_path)
+        if self._count >= self.segment_records:
+            os.replace(self.current_path, self.previous_path)
+            self._count = 0
+        if self._count == 0 and "full" not in record:
+            record = {"t": record["t"], "full": snapshot}
+
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with open(self.current_path, "a", encoding="utf-8") as file:
+            file.write(line)
+        self._count += 1
+        self.records_written += 1
+        self.bytes_written += len(line)
+
+    async def async_export(self) -> dict[str, Any]:
+        """Return all recorded lines, oldest first, for diagnostics."""
+        async with self._lock:
+            records = await self.hass.async_add_executor_job(self._read)
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "enabled": self.enabled,
+            "segment_records": self.segment_records,
+            "records": records,
+        }
+
+    def _read(self) -> list[dict]:
+        """Read both segments."""
+        records = []
+        for path in (self.previous_path, self.current_path):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    for line in file:
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            continue  # linea truncada (p. ej. apagado a mitad de escritura)
+            except FileNotFoundError:
+                continue
+        return records
+
+    def remove_files(self) -> None:
+        """Delete both segments (entry removed)."""
+        for path in (self.current_path, self.previous_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _count_lines(path: str) -> int:
+    """Return the number of lines of a segment (0 if missing)."""
+    try:
+        with open(path, "rb") as file:
+            return sum(1 for _ in file)
+    except FileNotFoundError:
+        return 0
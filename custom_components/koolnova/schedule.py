@@ -0,0 +1,168 @@
+"""Weekly schedule engine for Koolnova zones."""
+
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SCHEDULE_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _minute_of_week(moment: datetime) -> int:
+    """Return the minute of the week (Monday 00:00 = 0) of a local datetime."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def schedule_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the storage of the weekly program of an entry."""
+    return Store(hass, SCHEDULE_STORAGE_VERSION, f"{DOMAIN}.schedule.{entry_id}")
+
+
+class KoolnovaScheduler:
+    """Store weekly programs and apply them at each transition.
+
+    A program is a list of transitions. Each transition has:
+    - days: weekdays ("mon".."sun") on which it runs
+    - time: local time "HH:MM"
+    - zones: optional list of Room_id (all zones of the project if omitted)
+    - temperature / hvac_mode / fan_mode: targets, as in the climate services
+
+    Transitions are indexed by minute of the week in a sorted timeline, so the
+    next event is found with a binary search and a single timer is armed for
+    it. When it fires, every transition due at that minute is merged into one
+    scene and applied through the coordinator (diffed, one PUT per zone).
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, entry_id: str) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._store = schedule_store(hass, entry_id)
+        self.transitions: list[dict[str, Any]] = []
+        self._timeline: list[int] = []
+        self._by_minute: dict[int, list[dict[str, Any]]] = {}
+        self._unsub_timer = None
+        self.next_transition: Optional[datetime] = None
+        self.last_result: Optional[dict] = None
+
+    async def async_load(self) -> None:
+        """Load stored transitions and arm the timer."""
+        data = await self._store.async_load() or {}
+        self.transitions = data.get("transitions", [])
+        self._rebuild_index()
+        self._schedule_next(dt_util.now())
+
+    async def async_set_transitions(self, transitions: list[dict[str, Any]]) -> Optional[datetime]:
+        """Replace the program, persist it and re-arm the timer."""
+        self.transitions = transitions
+        await self._store.async_save({"transitions": transitions})
+        self._rebuild_index()
+        self._schedule_next(dt_util.now())
+        return self.next_transition
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def _rebuild_index(self) -> None:
+        """Build the minute-of-week timeline from the transitions."""
+        by_minute: dict[int, list[dict[str, Any]]] = {}
+        for transition in self.transitions:
+            hour, minute = (int(part) for part in transition["time"].split(":")[:2])
+            for day in transition["days"]:
+                key = WEEKDAYS.index(day) * MINUTES_PER_DAY + hour * 60 + minute
+                by_minute.setdefault(key, []).append(transition)
+        self._by_minute = by_minute
+        self._timeline = sorted(by_minute)
+
+    def _next_after(self, moment: datetime) -> Optional[tuple[int, datetime]]:
+        """Return (minute_of_week, local datetime) of the first transition after moment."""
+        if not self._timeline:
+            return None
+
+        current = _minute_of_week(moment)
+        pos = bisect_right(self._timeline, current)
+        if pos < len(self._timeline):
+            key = self._timeline[pos]
+            offset = key - current
+        else:
+            key = self._timeline[0]
+            offset = key + MINUTES_PER_WEEK - current
+
+        # Aritmetica en hora local (wall-clock): respeta cambios de horario
+        when = moment.replace(second=0, microsecond=0) + timedelta(minutes=offset)
+        return key, when
+
+    def _schedule_next(self, after: datetime) -> None:
+        """Arm a single timer for the next transition after the given moment."""
+        self.async_stop()
+        upcoming = self._next_after(after)
+        if upcoming is None:
+            self.next_transition = None
+            return
+
+        key, when = upcoming
+        self.next_transition = when
+        _LOGGER.debug("Next Koolnova schedule transition at %s", when)
+
+        @callback
+        def _fire(now: datetime) -> None:
+            self._unsub_timer = None
+            self.hass.async_create_task(self._async_run_transition(key, when))
+
+        self._unsub_timer = async_track_point_in_time(self.hass, _fire, when)
+
+    def _build_targets(self, key: int) -> dict[int, dict]:
+        """Merge every transition due at a minute into one payload per zone."""
+        all_zones = [
+            sensor.get("Room_id")
+            for sensor in self.coordinator.data.get("sensors", [])
+            if sensor.get("Room_id") is not None
+        ]
+        targets: dict[int, dict] = {}
+        for transition in self._by_minute.get(key, []):
+            try:
+                payload = self.coordinator.sensor_payload_from_targets(
+                    transition.get("temperature"), transition.get("hvac_mode"), transition.get("fan_mode")
+                )
+            except ValueError as err:
+                _LOGGER.warning("Skipping invalid schedule transition %s: %s", transition, err)
+                continue
+            for room_id in transition.get("zones") or all_zones:
+                targets.setdefault(room_id, {}).update(payload)
+        return targets
+
+    async def _async_run_transition(self, key: int, when: datetime) -> None:
+        """Apply the transitions due at a minute and arm the next timer."""
+        try:
+            targets = self._build_targets(key)
+            if targets:
+                _LOGGER.info("Applying Koolnova schedule transition for %d zones", len(targets))
+                self.last_result = await self.coordinator.async_apply_scene(targets)
+        except Exception as err:
+            _LOGGER.error("Error applying Koolnova schedule transition: %s", err)
+        finally:
+            # Siguiente evento estrictamente despues del minuto ejecutado
+            self._schedule_next(max(dt_util.now(), when))
+
+    def as_diagnostics(self) -> dict[str, Any]:
+        """Return the program and timer state for diagnostics."""
+        return {
+            "transitions": self.transitions,
+            "next_transition": self.next_transition.isoformat() if self.next_transition else None,
+            "last_result": self.last_result,
+        }
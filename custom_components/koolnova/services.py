@@ -0,0 +1,255 @@
+"""Services for the Koolnova integration."""
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components.climate import ATTR_FAN_MODE, ATTR_HVAC_MODE, HVACMode
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, WEEKDAYS
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    SERVICE_GET_ZONE_HISTORY,
+    SERVICE_APPLY_SCENE,
+    SERVICE_SET_SCHEDULE,
+    SERVICE_CLEAR_SCHEDULE,
+    ATTR_ROOM_ID,
+    ATTR_WINDOW,
+    ATTR_ZONES,
+    ATTR_TRANSITIONS,
+    ATTR_DAYS,
+    ATTR_TIME,
+    DEFAULT_HISTORY_WINDOW,
+    FAN_TO_KOOLNOVA,
+)
+from .coordinator import KoolnovaDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+GET_ZONE_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_ROOM_ID): vol.Coerce(int),
+        vol.Optional(ATTR_WINDOW, default=DEFAULT_HISTORY_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+    }
+)
+
+APPLY_SCENE_ZONE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(ATTR_ROOM_ID, "zone"): vol.Coerce(int),
+            vol.Exclusive(ATTR_ENTITY_ID, "zone"): cv.entity_id,
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_FAN_MODE): vol.In(list(FAN_TO_KOOLNOVA)),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ROOM_ID, ATTR_ENTITY_ID),
+)
+
+APPLY_SCENE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_ZONES): vol.All(cv.ensure_list, [APPLY_SCENE_ZONE_SCHEMA]),
+    }
+)
+
+SCHEDULE_TRANSITION_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_DAYS): vol.All(cv.ensure_list, [vol.In(WEEKDAYS)]),
+            vol.Required(ATTR_TIME): cv.time,
+            vol.Optional(ATTR_ZONES): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_FAN_MODE): vol.In(list(FAN_TO_KOOLNOVA)),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_TEMPERATURE, ATTR_HVAC_MODE, ATTR_FAN_MODE),
+)
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_TRANSITIONS): vol.All(cv.ensure_list, [SCHEDULE_TRANSITION_SCHEMA]),
+    }
+)
+
+CLEAR_SCHEDULE_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+def _get_coordinators(hass: HomeAssistant, entry_id=None) -> dict[str, KoolnovaDataUpdateCoordinator]:
+    """Return loaded coordinators keyed by config entry id."""
+    coordinators = {
+        key: value
+        for key, value in hass.data.get(DOMAIN, {}).items()
+        if isinstance(value, KoolnovaDataUpdateCoordinator)
+    }
+    if entry_id is None:
+        return coordinators
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Koolnova config entry {entry_id} is not loaded")
+    return {entry_id: coordinators[entry_id]}
+
+
+async def _async_get_zone_history(call: ServiceCall) -> ServiceResponse:
+    """Return windowed min/max/mean of the in-memory zone history."""
+    window = call.data[ATTR_WINDOW]
+    room_id = call.data.get(ATTR_ROOM_ID)
+    response = {}
+
+    for entry_id, coordinator in _get_coordinators(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID)).items():
+        if room_id is not None:
+            stats = coordinator.history.zone_stats(room_id, window)
+            zones = {str(room_id): stats} if stats is not None else {}
+        else:
+            zones = {
+                str(zone_id): stats
+                for zone_id, stats in coordinator.history.all_stats(window).items()
+            }
+        response[entry_id] = {"window": window, "zones": zones}
+
+    return {"entries": response}
+
+
+def _resolve_zone(hass: HomeAssistant, zone: dict, coordinators: dict) -> tuple[str, int]:
+    """Return (entry_id, Room_id) for a zone given by room_id or entity_id."""
+    if ATTR_ENTITY_ID in zone:
+        entity = er.async_get(hass).async_get(zone[ATTR_ENTITY_ID])
+        prefix = f"{entity.config_entry_id}_zone_" if entity else None
+        if not entity or entity.config_entry_id not in coordinators or not entity.unique_id.startswith(prefix):
+            raise ServiceValidationError(f"{zone[ATTR_ENTITY_ID]} is not a Koolnova zone")
+        return entity.config_entry_id, int(entity.unique_id[len(prefix):])
+
+    room_id = zone[ATTR_ROOM_ID]
+    for entry_id, coordinator in coordinators.items():
+        if any(sensor.get("Room_id") == room_id for sensor in coordinator.data.get("sensors", [])):
+            return entry_id, room_id
+    raise ServiceValidationError(f"Unknown Koolnova zone {room_id}")
+
+
+async def _async_apply_scene(call: ServiceCall) -> ServiceResponse:
+    """Apply per-zone targets, sending only the fields that change."""
+    hass = call.hass
+    coordinators = _get_coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+
+    # Validar todo antes de enviar nada: Room_id -> payload por entrada
+    targets: dict[str, dict[int, dict]] = {}
+    for zone in call.data[ATTR_ZONES]:
+        entry_id, room_id = _resolve_zone(hass, zone, coordinators)
+        try:
+            payload = coordinators[entry_id].sensor_payload_from_targets(
+                zone.get(ATTR_TEMPERATURE), zone.get(ATTR_HVAC_MODE), zone.get(ATTR_FAN_MODE)
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+        targets.setdefault(entry_id, {}).setdefault(room_id, {}).update(payload)
+
+    response = {}
+    for entry_id, entry_targets in targets.items():
+        response[entry_id] = await coordinators[entry_id].async_apply_scene(entry_targets)
+
+    if not call.return_response:
+        return None
+    return {"entries": response}
+
+
+def _get_single_coordinator(hass: HomeAssistant, entry_id=None) -> KoolnovaDataUpdateCoordinator:
+    """Return the coordinator targeted by a per-entry service call."""
+    coordinators = _get_coordinators(hass, entry_id)
+    if len(coordinators) != 1:
+        raise ServiceValidationError("Several Koolnova entries are loaded; config_entry_id is required")
+    return next(iter(coordinators.values()))
+
+
+async def _async_set_schedule(call: ServiceCall) -> ServiceResponse:
+    """Replace the weekly program of a Koolnova entry."""
+    coordinator = _get_single_coordinator(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+
+    transitions = []
+    for transition in call.data[ATTR_TRANSITIONS]:
+        # Validar consignas contra los limites configurados antes de guardar
+        try:
+            coordinator.sensor_payload_from_targets(
+                transition.get(ATTR_TEMPERATURE), transition.get(ATTR_HVAC_MODE), transition.get(ATTR_FAN_MODE)
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+        stored = {
+            ATTR_DAYS: transition[ATTR_DAYS],
+            ATTR_TIME: transition[ATTR_TIME].strftime("%H:%M"),
+        }
+        if ATTR_ZONES in transition:
+            stored[ATTR_ZONES] = transition[ATTR_ZONES]
+        if ATTR_TEMPERATURE in transition:
+            stored[ATTR_TEMPERATURE] = transition[ATTR_TEMPERATURE]
+        if ATTR_HVAC_MODE in transition:
+            stored[ATTR_HVAC_MODE] = transition[ATTR_HVAC_MODE].value
+        if ATTR_FAN_MODE in transition:
+            stored[ATTR_FAN_MODE] = transition[ATTR_FAN_MODE]
+        transitions.append(stored)
+
+    next_transition = await coordinator.scheduler.async_set_transitions(transitions)
+
+    if not call.return_response:
+        return None
+    return {"next_transition": next_transition.isoformat() if next_transition else None}
+
+
+async def _async_clear_schedule(call: ServiceCall) -> None:
+    """Remove the weekly program of a Koolnova entry."""
+    coordinator = _get_single_coordinator(call.hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+    await coordinator.scheduler.async_set_transitions([])
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register Koolnova services (once for all config entries)."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_ZONE_HISTORY):
+        return
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_ZONE_HISTORY,
+        _async_get_zone_history,
+        schema=GET_ZONE_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_SCENE,
+        _async_apply_scene,
+        schema=APPLY_SCENE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        _async_set_schedule,
+        schema=SET_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_SCHEDULE,
+        _async_clear_schedule,
+        schema=CLEAR_SCHEDULE_SCHEMA,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove Koolnova services when the last config entry is unloaded."""
+    if _get_coordinators(hass):
+        return
+    hass.services.async_remove(DOMAIN, SERVICE_GET_ZONE_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_APPLY_SCENE)
+    hass.services.async_remove(DOMAIN, SERVICE_SET_SCHEDULE)
+    hass.services.async_remove(DOMAIN, SERVICE_CLEAR_SCHEDULE)
@@ -0,0 +1,235 @@
+"""Pluggable update sources: the regular poller and push channels with polling fallback."""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .koolnova_api.client import KoolnovaAPIRestClient
+from .koolnova_api.const import COMMON_HEADERS
+from .koolnova_api.exceptions import KoolnovaAuthError
+from .const import (
+    PUSH_RECONNECT_MIN_BACKOFF,
+    PUSH_RECONNECT_MAX_BACKOFF,
+    PUSH_IDLE_TIMEOUT,
+    PUSH_LONG_POLL_MIN_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_POLLING = "polling"
+SOURCE_PUSH = "push"
+
+
+class KoolnovaUpdateSource(ABC):
+    """Base class of a source of zone updates for the coordinator."""
+
+    name = "base"
+
+    def __init__(self, hass: HomeAssistant, coordinator) -> None:
+        """Initialize the source."""
+        self.hass = hass
+        self.coordinator = coordinator
+
+    @property
+    @abstractmethod
+    def connected(self) -> bool:
+        """Return True while the source is delivering updates."""
+
+    async def async_start(self) -> None:
+        """Start delivering updates."""
+
+    async def async_stop(self) -> None:
+        """Stop delivering updates."""
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the source state for diagnostics."""
+        return {"name": self.name, "connected": self.connected}
+
+
+class KoolnovaPollingSource(KoolnovaUpdateSource):
+    """The DataUpdateCoordinator's own interval polling (always available)."""
+
+    name = SOURCE_POLLING
+
+    @property
+    def connected(self) -> bool:
+        """Polling needs no connection."""
+        return True
+
+
+class KoolnovaPushSource(KoolnovaUpdateSource):
+    """Zone updates streamed by the server over websocket, SSE or long-poll.
+
+    The transport follows the URL and the response: ws:// and wss:// use a
+    websocket; http(s) responses with text/event-stream are read as SSE, any
+    other response as one long-poll result (the request is then repeated).
+    Every message is JSON with rooms in the topics/sensors/ format (a room, a
+    list of rooms or {"data": [...]}), authenticated with the account token.
+
+    On disconnect the coordinator falls back to its regular polling interval
+    and the source reconnects with exponential backoff.
+    """
+
+    name = SOURCE_PUSH
+    # Espera entre reconexiones y entre peticiones long-poll
+    _sleep = staticmethod(asyncio.sleep)
+
+    def __init__(self, hass: HomeAssistant, coordinator, url: str) -> None:
+        """Initialize the push source."""
+        super().__init__(hass, coordinator)
+        self.url = url
+        self._connected = False
+        self._task: Optional[asyncio.Task] = None
+        self._backoff = PUSH_RECONNECT_MIN_BACKOFF
+        self.messages = 0
+        self.reconnects = 0
+        self.last_message: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the stream is open."""
+        return self._connected
+
+    async def async_start(self) -> None:
+        """Start the connection loop in the background."""
+        if self._task is None:
+            self._task = self.coordinator.config_entry.async_create_background_task(
+                self.hass, self._async_run(), f"koolnova push {self.url}"
+            )
+
+    async def async_stop(self) -> None:
+        """Close the stream."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._set_connected(False)
+
+    async def _async_run(self) -> None:
+        """Connect, consume and reconnect with backoff until stopped."""
+        while True:
+            try:
+                await self._async_connect()
+                self.last_error = "stream closed by server"
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self.last_error = str(err)
+                _LOGGER.debug("Push channel %s failed: %s", self.url, err)
+            self._set_connected(False)
+            self.reconnects += 1
+            await self._sleep(self._backoff)
+            self._backoff = min(self._backoff * 2, PUSH_RECONNECT_MAX_BACKOFF)
+
+    async def _async_headers(self) -> dict[str, str]:
+        """Return the request headers with a valid bearer token."""
+        # El token devuelto por el login, no el de client.session, que otro
+        # hilo puede haber sustituido o cerrado entretanto
+        token = await self.coordinator.account.async_request(self.coordinator.client.authenticate, key="authenticate")
+        if not token:
+            raise KoolnovaAuthError("Login returned no bearer token for the push channel")
+        return {**COMMON_HEADERS, "Authorization": f"Bearer {token}"}
+
+    async def _async_connect(self) -> None:
+        """Open the stream and consume it until it ends."""
+        # aiohttp solo se carga si hay un canal push configurado
+        import aiohttp
+        from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+        session = async_get_clientsession(self.hass)
+        headers = await self._async_headers()
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=PUSH_IDLE_TIMEOUT)
+
+        if self.url.startswith(("ws://", "wss://")):
+            async with session.ws_connect(self.url, headers=headers, heartbeat=PUSH_IDLE_TIMEOUT / 2) as ws:
+                self._set_connected(True)
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        self._handle_message(msg.data)
+                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        break
+            return
+
+        while True:
+            started = time.monotonic()
+            async with session.get(self.url, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                self._set_connected(True)
+                if response.content_type != "text/event-stream":
+                    # Long-poll: one result per request, then ask again (never
+                    # faster than PUSH_LONG_POLL_MIN_INTERVAL if the server
+                    # answers without holding the request)
+                    self._handle_message(await response.text())
+                    wait = PUSH_LONG_POLL_MIN_INTERVAL - (time.monotonic() - started)
+                    if wait > 0:
+                        await self._sleep(wait)
+                    continue
+                data: list[str] = []
+                async for raw in response.content:
+                    line = raw.decode("utf-8").rstrip("\r\n")
+                    if line.startswith("data:"):
+                        data.append(line[5:].lstrip())
+                    elif not line and data:
+                        self._handle_message("\n".join(data))
+                        data = []
+                return
+
+    @callback
+    def _set_connected(self, connected: bool) -> None:
+        """Update the connection state and let the coordinator pick its source."""
+        if connected == self._connected:
+            return
+        self._connected = connected
+        if connected:
+            _LOGGER.info("Koolnova push channel connected (%s)", self.url)
+        else:
+            _LOGGER.info("Koolnova push channel disconnected; falling back to polling")
+        self.coordinator.async_update_source_changed()
+
+    @callback
+    def _handle_message(self, text: str) -> None:
+        """Parse one message and hand its zones to the coordinator."""
+        if not text.strip():
+            return
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            _LOGGER.debug("Ignoring non-JSON push message: %.100s", text)
+            return
+
+        if isinstance(payload, dict):
+            rooms = payload.get("data", [payload])
+        else:
+            rooms = payload
+        sensors = []
+        for room in rooms if isinstance(rooms, list) else []:
+            try:
+                sensors.append(KoolnovaAPIRestClient.parse_room(room))
+            except (KeyError, TypeError, AttributeError):
+                continue
+        if not sensors:
+            return
+
+        self.messages += 1
+        self.last_message = time.time()
+        self._backoff = PUSH_RECONNECT_MIN_BACKOFF
+        self.coordinator.async_push_sensors(sensors)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the channel state for diagnostics."""
+        return {
+            **super().as_dict(),
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "last_message": self.last_message,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,207 @@
+"""Verification of write commands with batched zone reads."""
+
+import functools
+import logging
+import time
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .koolnova_api.deadline import Deadline
+from .const import VERIFY_BACKOFF, VERIFY_BATCH_WINDOW, SENSOR_PAYLOAD_TO_CACHE
+
+_LOGGER = logging.getLogger(__name__)
+
+VERIFY_PENDING = "pending"
+VERIFY_CONFIRMED = "confirmed"
+VERIFY_DRIFTED = "drifted"
+VERIFY_UNKNOWN = "unknown"
+
+
+def sensor_mismatch(sensor: dict, expected: dict) -> dict[str, Any]:
+    """Return payload fields whose value differs in the cached sensor data."""
+    differences = {}
+    for field, value in expected.items():
+        actual = sensor.get(SENSOR_PAYLOAD_TO_CACHE.get(field, field))
+        if field == "setpoint_temperature":
+            try:
+                if actual is not None and abs(float(actual) - float(value)) < 0.01:
+                    continue
+            except (TypeError, ValueError):
+                pass
+        elif actual is not None and str(actual) == str(value):
+            continue
+        differences[field] = {"expected": value, "actual": actual}
+    return differences
+
+
+class KoolnovaCommandVerifier:
+    """Re-read the zones touched by recent commands to confirm them.
+
+    After a command the zone is marked pending and due for a check following
+    VERIFY_BACKOFF. A single timer serves every zone: when it fires, all the
+    zones due within VERIFY_BATCH_WINDOW are checked together. A lone zone
+    is read with topics/sensors/<id>/, the smallest read; several zones share
+    one topics/sensors/ read (through the account cache, so a fresh enough
+    poll costs nothing), however many zones a scene touched. A zone is confirmed as soon as a read
+    (this one or a regular poll) shows the expected values, drifted if they
+    still differ after the last attempt, and unknown if the last read failed.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator) -> None:
+        """Initialize the verifier."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.enabled = False
+        self._pending: dict[int, dict[str, Any]] = {}
+        self.results: dict[int, dict[str, Any]] = {}
+        self._unsub_timer = None
+        self._timer_due: Optional[float] = None
+        self.reads = 0
+
+    @callback
+    def async_track(self, sensor_id: int, payload: dict) -> None:
+        """Start (or extend) the verification of a zone after a command."""
+        if not self.enabled:
+            return
+
+        pending = self._pending.get(sensor_id)
+        expected = {**pending["expected"], **payload} if pending is not None else dict(payload)
+        now = time.monotonic()
+        self._pending[sensor_id] = {
+            "expected": expected,
+            "attempt": 0,
+            "sent": now,
+            "due": now + VERIFY_BACKOFF[0],
+        }
+        self.results[sensor_id] = {"state": VERIFY_PENDING, "since": time.time()}
+        self._schedule()
+
+    def _schedule(self) -> None:
+        """Arm the single timer for the earliest due zone."""
+        if not self._pending:
+            self._cancel_timer()
+            return
+        due = min(pending["due"] for pending in self._pending.values())
+        if self._unsub_timer is not None and self._timer_due is not None and self._timer_due <= due:
+            return
+        self._cancel_timer()
+
+        @callback
+        def _check(_now) -> None:
+            self._unsub_timer = self._timer_due = None
+            self.hass.async_create_task(self._async_verify())
+
+        self._timer_due = due
+        self._unsub_timer = async_call_later(self.hass, max(0.0, due - time.monotonic()), _check)
+
+    def _cancel_timer(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+        self._unsub_timer = self._timer_due = None
+
+    async def _async_verify(self) -> None:
+        """Read the zones that are due (one request) and evaluate them."""
+        batch_until = time.monotonic() + VERIFY_BATCH_WINDOW
+        due = {sensor_id: pending for sensor_id, pending in self._pending.items() if pending["due"] <= batch_until}
+        if not due:
+            self._schedule()
+            return
+
+        # Lectura de fondo: no adelantar a los comandos del usuario
+        await self.coordinator.request_scheduler.async_background_turn()
+        # Sirve cualquier lectura posterior al ultimo comando de las zonas a comprobar
+        max_age = time.monotonic() - max(pending["sent"] for pending in due.values())
+        sensors = None
+        client = self.coordinator.client
+        try:
+            deadline = Deadline(self.coordinator.poll_timeout)
+            if len(due) == 1:
+                # Una sola zona: lectura individual en lugar de la lista completa
+                sensor_id = next(iter(due))
+                sensors = [await self.coordinator._async_fetch(
+                    f"sensor:{sensor_id}", functools.partial(client.get_sensor, sensor_id, deadline=deadline),
+                    max_age, deadline,
+                )]
+            else:
+                sensors = await self.coordinator._async_fetch(
+                    "sensors", functools.partial(client.get_sensors, deadline=deadline), max_age, deadline,
+                )
+            self.reads += 1
+        except Exception as err:
+            _LOGGER.debug("Verification read failed for sensors %s: %s", sorted(due), err)
+
+        by_id = {sensor.get("Room_id"): sensor for sensor in sensors or []}
+        fresh = []
+        settled = set()
+        for sensor_id, pending in due.items():
+            # Si un comando mas reciente ha reiniciado la verificacion no se evalua
+            if self._pending.get(sensor_id) is not pending:
+                continue
+            sensor = by_id.get(sensor_id)
+            if sensor is not None:
+                fresh.append(sensor)
+            final = pending["attempt"] + 1 >= len(VERIFY_BACKOFF)
+            if self._evaluate(sensor_id, sensor, final=final, read_failed=sensors is None):
+                settled.add(sensor_id)
+            else:
+                pending["attempt"] += 1
+                pending["due"] = time.monotonic() + VERIFY_BACKOFF[pending["attempt"]]
+
+        if fresh or settled:
+            self.coordinator.async_set_sensors(fresh, settled)
+        self._schedule()
+
+    def _evaluate(self, sensor_id: int, sensor: Optional[dict], final: bool, read_failed: bool = False) -> bool:
+        """Confirm a pending zone, or settle it on the last attempt; return True once settled.
+
+        On the last attempt a zone whose values still differ is drifted; one
+        that could not be read (failed request, zone missing from the
+        response) is unknown, since nothing says the command was not applied.
+        """
+        pending = self._pending[sensor_id]
+        differences = sensor_mismatch(sensor, pending["expected"]) if sensor is not None else None
+
+        if differences == {}:
+            _LOGGER.debug("Command confirmed for sensor %s", sensor_id)
+            self.results[sensor_id] = {"state": VERIFY_CONFIRMED, "since": time.time()}
+        elif final and differences is None:
+            _LOGGER.info("Could not verify the command for sensor %s: %s", sensor_id,
+                         "read failed" if read_failed else "zone missing from the response")
+            self.results[sensor_id] = {"state": VERIFY_UNKNOWN, "since": time.time()}
+        elif final:
+            _LOGGER.warning("Command not applied by the controller for sensor %s: %s", sensor_id, differences)
+            self.results[sensor_id] = {
+                "state": VERIFY_DRIFTED,
+                "since": time.time(),
+                "mismatch": differences,
+            }
+        else:
+            return False
+
+        del self._pending[sensor_id]
+        return True
+
+    @callback
+    def async_check_sensors(self, sensors: list[dict]) -> set:
+        """Use a regular poll to confirm pending zones without extra reads.
+
+        Returns the zones confirmed, whose attribute has to be written.
+        """
+        settled = set()
+        if not self._pending:
+            return settled
+        for sensor in sensors:
+            if sensor.get("Room_id") in self._pending and self._evaluate(sensor["Room_id"], sensor, final=False):
+                settled.add(sensor["Room_id"])
+        if not self._pending:
+            self._cancel_timer()
+        return settled
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel every pending verification."""
+        self._cancel_timer()
+        self._pending.clear()
@@ -0,0 +1,9 @@
+"""Fixtures for the Koolnova tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load custom_components/koolnova in every test."""
+    yield
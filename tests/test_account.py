@@ -0,0 +1,175 @@
+"""Tests for the shared Koolnova account registry."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.koolnova.account import (
+    KoolnovaRequestScheduler,
+    async_adopt_client,
+    async_get_account,
+    build_client,
+)
+from custom_components.koolnova.breaker import STATE_CLOSED
+from custom_components.koolnova.koolnova_api.exceptions import KoolnovaBusyError
+
+SETPOINT = ("sensor", 1, ("setpoint_temperature",))
+
+
+class RecordingSession:
+    """HTTP session stand-in that records the thread closing it."""
+
+    def __init__(self) -> None:
+        self.closed_in = None
+
+    def close(self) -> None:
+        self.closed_in = threading.current_thread().name
+
+
+async def test_replaced_sessions_close_in_account_pool(hass: HomeAssistant) -> None:
+    """Sessions dropped on a password change or reauth are closed by the account's own threads."""
+    account = async_get_account(hass, "entry", "user@example.com", "old")
+    first = account.client.session = RecordingSession()
+
+    assert async_get_account(hass, "entry", "user@example.com", "new") is account
+    assert account.client.session is None
+    await hass.async_block_till_done()
+    assert first.closed_in.startswith("koolnova")
+
+    second = account.client.session = RecordingSession()
+    client = build_client("user@example.com", "newer")
+    client.session = RecordingSession()
+    assert async_adopt_client(hass, "user@example.com", "newer", client) is account
+    assert account.client.session is client.session
+    await hass.async_block_till_done()
+    assert second.closed_in.startswith("koolnova")
+    assert client.session.closed_in is None
+
+    account.client.session = None
+    await account.async_shutdown()
+
+
+async def test_handed_over_read_is_reused_once(hass: HomeAssistant, freezer) -> None:
+    """The config flow's project list serves the first refresh however old it is."""
+    account = async_get_account(hass, "entry", "user@example.com", "secret")
+    calls = []
+
+    def get_project() -> list:
+        calls.append(time.monotonic())
+        return [{"Topic_id": len(calls)}]
+
+    projects = await account.async_fetch("projects", get_project, 0)
+    account.hand_over("projects")
+    freezer.tick(600)
+    assert await account.async_fetch("projects", get_project, 30) is projects
+    assert len(calls) == 1
+
+    # Solo una vez: despues manda la antiguedad
+    assert await account.async_fetch("projects", get_project, 30) == [{"Topic_id": 2}]
+    await account.async_shutdown()
+
+
+async def test_slider_drags_send_only_the_latest_value(hass: HomeAssistant) -> None:
+    """Commands for the same zone and attribute waiting their turn are merged."""
+    account = async_get_account(hass, "entry", "user@example.com", "secret")
+    account.command_limiter.min_interval = 0
+    release = threading.Event()
+    sent = []
+
+    def update_sensor(sensor_id: int, payload: dict, deadline=None) -> dict:
+        if not sent:
+            release.wait(5)
+        sent.append(payload["setpoint_temperature"])
+        return {"Room_id": sensor_id, **payload}
+
+    def _drag(value: float) -> asyncio.Task:
+        return hass.async_create_task(account.async_command(
+            update_sensor, 1, {"setpoint_temperature": value}, key=SETPOINT, timeout=5
+        ))
+
+    first = _drag(20.0)
+    while account.executor.as_dict()["running"] == 0:
+        await asyncio.sleep(0.01)
+    drags = [_drag(value) for value in (20.5, 21.0, 21.5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await first)["setpoint_temperature"] == 20.0
+    assert [(await drag)["setpoint_temperature"] for drag in drags] == [21.5] * 3
+    assert sent == [20.0, 21.5]
+    assert account.command_limiter.as_dict() == {"sent": 2, "merged": 2, "rejected": 0, "waiting": 0}
+    await account.async_shutdown()
+
+
+async def test_full_queues_do_not_trip_the_breaker(hass: HomeAssistant) -> None:
+    """A local queue limit refuses requests with KoolnovaBusyError, not as an API outage."""
+    account = async_get_account(hass, "entry", "user@example.com", "secret")
+    account.command_limiter.max_queue = 1
+    account.executor.max_queue = 0
+    release = threading.Event()
+
+    def update_sensor(sensor_id: int, payload: dict) -> dict:
+        release.wait(5)
+        return payload
+
+    running = hass.async_create_task(account.async_command(update_sensor, 1, {"speed": 1}))
+    while account.executor.as_dict()["running"] == 0:
+        await asyncio.sleep(0.01)
+    waiting = hass.async_create_task(account.async_command(update_sensor, 2, {"speed": 1}))
+    await asyncio.sleep(0)
+    for _ in range(3):
+        with pytest.raises(KoolnovaBusyError):
+            await account.async_command(update_sensor, 3, {"speed": 1})
+        with pytest.raises(KoolnovaBusyError):
+            await account.async_request(time.monotonic, key="sensors")
+    release.set()
+    await running
+    await waiting
+
+    assert account.breaker.state == STATE_CLOSED
+    assert account.breaker.consecutive_failures == 0
+    assert account.command_limiter.stats["rejected"] == 3
+    await account.async_shutdown()
+
+
+async def test_background_requests_wait_for_commands(hass: HomeAssistant) -> None:
+    """A poll waits while a command is queued or running, but never beyond max_wait."""
+    scheduler = KoolnovaRequestScheduler(max_wait=0.05)
+    order = []
+
+    async def _command() -> None:
+        async with scheduler.interactive():
+            await asyncio.sleep(0.01)
+            order.append("command")
+
+    async def _poll() -> None:
+        await scheduler.async_background_turn()
+        order.append("poll")
+
+    command = hass.async_create_task(_command())
+    await asyncio.sleep(0)
+    assert scheduler.interactive_busy
+    await _poll()
+    await command
+    assert order == ["command", "poll"]
+    assert not scheduler.interactive_busy
+
+    # Un comando colgado no bloquea el poll mas alla de max_wait
+    release = asyncio.Event()
+
+    async def _stuck_command() -> None:
+        async with scheduler.interactive():
+            await release.wait()
+
+    stuck = hass.async_create_task(_stuck_command())
+    await asyncio.sleep(0)
+    await _poll()
+    release.set()
+    await stuck
+
+    stats = scheduler.as_dict()
+    assert (stats["interactive"], stats["background_waits"], stats["background_wait_timeouts"]) == (2, 2, 1)
+    assert stats["interactive_in_flight"] == 0
@@ -0,0 +1,106 @@
+"""Tests for the account circuit breaker."""
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.koolnova.account import async_get_account
+from custom_components.koolnova.breaker import (
+    ERROR_AUTH,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    KoolnovaCircuitBreaker,
+)
+from custom_components.koolnova.const import DOMAIN
+from custom_components.koolnova.coordinator import KoolnovaDataUpdateCoordinator
+from custom_components.koolnova.koolnova_api.exceptions import (
+    KoolnovaCircuitOpenError,
+    KoolnovaInvalidCredentialsError,
+    KoolnovaServerError,
+)
+
+
+def test_open_half_open_closed(freezer: FrozenDateTimeFactory) -> None:
+    """Consecutive failures open the circuit; a probe after the backoff closes it."""
+    breaker = KoolnovaCircuitBreaker(failure_threshold=3, base_backoff=60, max_backoff=900)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure(KoolnovaServerError("502"))
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure(KoolnovaServerError("502"))
+    assert breaker.state == STATE_OPEN
+    assert breaker.blocked and not breaker.allow_request()
+
+    freezer.tick(61)
+    assert not breaker.blocked
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    # Una sola sonda a la vez
+    assert not breaker.allow_request()
+
+    # La sonda falla: backoff doble
+    breaker.record_failure(KoolnovaServerError("502"))
+    assert breaker.state == STATE_OPEN
+    freezer.tick(61)
+    assert not breaker.allow_request()
+    freezer.tick(60)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_auth_failure_trips_at_once() -> None:
+    """A rejected login opens the circuit on the first failure."""
+    breaker = KoolnovaCircuitBreaker()
+    assert breaker.record_failure(KoolnovaInvalidCredentialsError("bad")) == ERROR_AUTH
+    assert breaker.state == STATE_OPEN
+
+
+def test_cancelled_probe_is_released(freezer: FrozenDateTimeFactory) -> None:
+    """A cancelled probe does not leave the circuit half-open forever."""
+    breaker = KoolnovaCircuitBreaker(failure_threshold=1, base_backoff=60)
+    breaker.record_failure(KoolnovaServerError("502"))
+    freezer.tick(61)
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+async def test_account_breaker_covers_reads_and_commands(hass: HomeAssistant) -> None:
+    """Failed polls of one entry refuse the commands of every entry of the account."""
+    account = async_get_account(hass, "entry_1", "user@example.com", "secret")
+    assert async_get_account(hass, "entry_2", "user@example.com", "secret") is account
+
+    def _fail() -> None:
+        raise KoolnovaServerError("503")
+
+    for _ in range(3):
+        with pytest.raises(KoolnovaServerError):
+            await account.async_fetch("sensors", _fail, 0)
+    assert account.breaker.state == STATE_OPEN
+
+    calls = []
+    with pytest.raises(KoolnovaCircuitOpenError):
+        await account.async_command(lambda: calls.append("sent"))
+    with pytest.raises(KoolnovaCircuitOpenError):
+        await account.async_fetch("projects", lambda: calls.append("read"), 0)
+    assert calls == []
+    # Las peticiones rechazadas no cuentan como fallos de la API
+    assert account.breaker.consecutive_failures == 3
+
+    await account.async_shutdown()
+
+
+async def test_coordinators_share_the_account_breaker(hass: HomeAssistant) -> None:
+    """The zone and project coordinators of an entry both use the account's breaker."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"email": "user@example.com", "password": "secret"})
+    entry.add_to_hass(hass)
+    coordinator = KoolnovaDataUpdateCoordinator(hass, entry)
+
+    assert coordinator.breaker is coordinator.account.breaker
+    assert coordinator.project_coordinator.breaker is coordinator.account.breaker
+    await coordinator.account.async_shutdown()
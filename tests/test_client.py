@@ -0,0 +1,110 @@
+"""Tests for the token lifetime learned by the Koolnova API client."""
+
+import time
+
+import pytest
+
+from custom_components.koolnova.koolnova_api import session as session_module
+from custom_components.koolnova.koolnova_api.client import KoolnovaAPIRestClient
+from custom_components.koolnova.koolnova_api.const import (
+    MIN_TOKEN_LIFETIME,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REVOCATION_SAMPLES,
+)
+from custom_components.koolnova.koolnova_api.exceptions import (
+    KoolnovaInvalidCredentialsError,
+    KoolnovaUnauthorizedError,
+)
+
+
+class FakeSession:
+    """Stand-in for KoolnovaClientSession: a token that can be rejected."""
+
+    logins = 0
+    reject_password = None
+
+    def __init__(self, username, password, email, deadline) -> None:
+        if password == FakeSession.reject_password:
+            raise KoolnovaInvalidCredentialsError("bad password")
+        FakeSession.logins += 1
+        self.token_created = time.time()
+        self.token_expires_in = None
+        self.revoked = False
+        self.unauthorized = False
+        self.conditional_cache = self.transfer_stats = self.retry_stats = None
+
+    def ping(self, deadline=None):
+        if self.unauthorized:
+            raise KoolnovaUnauthorizedError("401")
+        return "pong"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Return a client whose logins create FakeSession objects."""
+    monkeypatch.setattr(session_module, "KoolnovaClientSession", FakeSession)
+    FakeSession.logins = 0
+    FakeSession.reject_password = None
+    return KoolnovaAPIRestClient(username="", email="user@example.com", password="secret")
+
+
+def _reject_at_age(client: KoolnovaAPIRestClient, age: float) -> None:
+    """Make the current token get a 401 once it is `age` seconds old."""
+    client._get_session()
+    client.session.token_created = time.time() - age
+    client.session.unauthorized = True
+    assert client._session_call(None, "ping") == "pong"
+
+
+def test_single_early_401_keeps_lifetime(client) -> None:
+    """One early revocation does not shorten the proactive refresh."""
+    _reject_at_age(client, 30)
+    assert client.token_lifetime == KoolnovaAPIRestClient.TOKEN_LIFETIME
+    assert client.reauths == 1
+
+
+def test_lifetime_learned_from_full_samples(client) -> None:
+    """The lifetime changes once every sample agrees, never below the floor."""
+    for _ in range(TOKEN_REVOCATION_SAMPLES - 1):
+        _reject_at_age(client, 600)
+        assert client.token_lifetime == KoolnovaAPIRestClient.TOKEN_LIFETIME
+    _reject_at_age(client, 600)
+    assert client.token_lifetime == pytest.approx(600 - TOKEN_REFRESH_MARGIN, abs=1)
+
+    for _ in range(TOKEN_REVOCATION_SAMPLES):
+        _reject_at_age(client, 10)
+    assert client.token_lifetime == MIN_TOKEN_LIFETIME
+
+
+def test_revocations_after_credential_change_ignored(client) -> None:
+    """A 401 on a token issued before a reauth is not a lifetime sample."""
+    client._get_session()
+    client.session.token_created = time.time() - 30
+    client.session.unauthorized = True
+    client.credentials_changed()
+    client._session_call(None, "ping")
+    assert not client._revocation_ages
+
+
+def test_revocation_with_failed_login_ignored(client) -> None:
+    """A 401 whose new login is rejected means the password changed."""
+    client._get_session()
+    client.session.unauthorized = True
+    FakeSession.reject_password = "secret"
+    with pytest.raises(KoolnovaInvalidCredentialsError):
+        client._session_call(None, "ping")
+    assert not client._revocation_ages
+
+
+def test_lifetime_recovers_when_tokens_survive(client) -> None:
+    """Tokens outliving the learned lifetime raise it back to the default."""
+    for _ in range(TOKEN_REVOCATION_SAMPLES):
+        _reject_at_age(client, 100)
+    assert client.token_lifetime == MIN_TOKEN_LIFETIME
+
+    while client.token_lifetime < KoolnovaAPIRestClient.TOKEN_LIFETIME:
+        lifetime = client.token_lifetime
+        client.session.token_created = time.time() - lifetime - 1
+        assert client._session_call(None, "ping") == "pong"
+        assert client.token_lifetime > lifetime
+    assert client.token_lifetime == KoolnovaAPIRestClient.TOKEN_LIFETIME
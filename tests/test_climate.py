@@ -0,0 +1,95 @@
+"""Tests for the zone entities added and retired at runtime."""
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.koolnova.climate import KoolnovaZoneDiscovery
+from custom_components.koolnova.const import DOMAIN, ZONE_REMOVAL_MIN_AGE, ZONE_REMOVAL_MISSED_POLLS
+from custom_components.koolnova.profiling import KoolnovaProfiler
+
+
+def _zone(room_id: int) -> dict:
+    return {"Room_id": room_id, "Room_Name": f"Zona {room_id}", "Topic_id": 1}
+
+
+class FakeCoordinator:
+    """Coordinator stand-in whose polls report a given set of zones."""
+
+    def __init__(self, room_ids) -> None:
+        self.data = {"projects": [{"Topic_id": 1, "is_online": True}], "sensors": [_zone(i) for i in room_ids]}
+        self.changed_zones = None
+        self.last_update_success = True
+        self.last_fresh_update = 0.0
+        self.profiler = KoolnovaProfiler()
+
+    def poll(self, room_ids) -> None:
+        previous = {sensor["Room_id"] for sensor in self.data["sensors"]}
+        self.data = {**self.data, "sensors": [_zone(i) for i in room_ids]}
+        # Como _changed_zones: zonas nuevas y desaparecidas desde el poll anterior
+        self.changed_zones = previous ^ set(room_ids)
+        self.last_fresh_update += 30
+
+
+def _discovery(hass: HomeAssistant, coordinator: FakeCoordinator, monkeypatch):
+    entry = MockConfigEntry(domain=DOMAIN, data={"email": "user@example.com"})
+    added = []
+    zones = KoolnovaZoneDiscovery(hass, coordinator, entry, added.extend)
+    for sensor in coordinator.data["sensors"]:
+        zones.create(sensor)
+    removed = []
+    for entity in zones.entities.values():
+        entity.hass = hass
+        entity.entity_id = f"climate.zona_{entity._sensor_id}"
+        monkeypatch.setattr(entity, "async_remove", lambda force_remove, entity=entity: _record(removed, entity))
+    return zones, added, removed
+
+
+async def _record(removed: list, entity) -> None:
+    removed.append(entity._sensor_id)
+
+
+async def test_missing_zone_needs_several_polls_and_time(hass: HomeAssistant, freezer, monkeypatch) -> None:
+    """A zone left out of some polls is unavailable, not removed, until the threshold."""
+    coordinator = FakeCoordinator([1, 2])
+    zones, _, removed = _discovery(hass, coordinator, monkeypatch)
+    zone_two = zones.entities[2]
+
+    # Un poll parcial: la zona queda no disponible y vuelve sin perder nada
+    coordinator.poll([1])
+    zones.async_sync()
+    assert not zone_two.available
+    coordinator.poll([1, 2])
+    zones.async_sync()
+    await hass.async_block_till_done()
+    assert zone_two.available and not zones.missing and not removed
+
+    # Muchos polls seguidos sin la zona, pero en poco tiempo: se conserva
+    for _ in range(ZONE_REMOVAL_MISSED_POLLS + 2):
+        coordinator.poll([1])
+        zones.async_sync()
+        # Un listener que no es un poll (comando) no cuenta
+        zones.async_sync()
+    await hass.async_block_till_done()
+    assert not removed and 2 in zones.entities
+
+    freezer.tick(ZONE_REMOVAL_MIN_AGE)
+    coordinator.poll([1])
+    zones.async_sync()
+    await hass.async_block_till_done()
+    assert removed == [2] and 2 not in zones.entities
+
+
+async def test_missing_polls_are_consecutive(hass: HomeAssistant, freezer, monkeypatch) -> None:
+    """The count starts again when the zone comes back."""
+    coordinator = FakeCoordinator([1, 2])
+    zones, _, removed = _discovery(hass, coordinator, monkeypatch)
+    for _ in range(ZONE_REMOVAL_MISSED_POLLS - 1):
+        coordinator.poll([1])
+        zones.async_sync()
+    coordinator.poll([1, 2])
+    zones.async_sync()
+    freezer.tick(ZONE_REMOVAL_MIN_AGE)
+    coordinator.poll([1])
+    zones.async_sync()
+    await hass.async_block_till_done()
+    assert not removed and zones.missing[2]["polls"] == 1
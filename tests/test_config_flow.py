@@ -0,0 +1,100 @@
+"""Tests for the Koolnova config flow."""
+
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.koolnova import config_flow
+from custom_components.koolnova.const import DATA_ACCOUNTS, DOMAIN
+
+PROJECTS = [
+    {"Topic_id": 1, "Project_Name": "Home", "Topic_Name": "Main"},
+    {"Topic_id": 2, "Project_Name": "Office", "Topic_Name": "Floor 1"},
+]
+CREDENTIALS = {"email": "user@example.com", "password": "secret"}
+
+
+class FakeClient:
+    """Client that logs in and lists two projects."""
+
+    def __init__(self, email: str, password: str) -> None:
+        self.email = email
+        self.password = password
+        self.session = None
+
+    def authenticate(self) -> None:
+        pass
+
+    def credentials_changed(self) -> None:
+        pass
+
+    def get_project(self) -> list:
+        return PROJECTS
+
+
+async def _async_start(hass: HomeAssistant) -> dict:
+    """Run the user step with valid credentials."""
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    return await hass.config_entries.flow.async_configure(result["flow_id"], CREDENTIALS)
+
+
+async def _async_finish(hass: HomeAssistant, flow_id: str, topic_ids: list) -> dict:
+    """Submit the project selection without setting the entry up."""
+    with patch("custom_components.koolnova.async_setup_entry", return_value=True):
+        result = await hass.config_entries.flow.async_configure(flow_id, {"topic_ids": topic_ids})
+        await hass.async_block_till_done()
+    return result
+
+
+async def _async_release_accounts(hass: HomeAssistant) -> None:
+    """Cancel the grace timers of the accounts adopted by the flow and stop their pools."""
+    for account in hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {}).values():
+        if account.release_unsub is not None:
+            account.release_unsub()
+            account.release_unsub = None
+        await account.async_shutdown()
+
+
+async def test_one_account_several_sites(hass: HomeAssistant) -> None:
+    """A second entry of the same account can take the projects left over."""
+    with patch.object(config_flow, "build_client", FakeClient):
+        result = await _async_start(hass)
+        assert result["step_id"] == "sites"
+        result = await _async_finish(hass, result["flow_id"], ["1"])
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["data"]["topic_ids"] == ["1"]
+        assert result["result"].unique_id == "user@example.com_1"
+
+        result = await _async_start(hass)
+        assert list(result["data_schema"].schema["topic_ids"].options) == ["2"]
+        result = await _async_finish(hass, result["flow_id"], ["2"])
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["result"].unique_id == "user@example.com_2"
+
+        # Sin proyectos libres la cuenta ya esta configurada
+        result = await _async_start(hass)
+        assert result["type"] == FlowResultType.ABORT
+        assert result["reason"] == "already_configured"
+    await _async_release_accounts(hass)
+
+
+async def test_entry_with_every_project(hass: HomeAssistant) -> None:
+    """An entry with every project keeps the email as unique_id and blocks new ones."""
+    with patch.object(config_flow, "build_client", FakeClient):
+        result = await _async_start(hass)
+        result = await _async_finish(hass, result["flow_id"], ["1", "2"])
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert "topic_ids" not in result["data"]
+        assert result["result"].unique_id == "user@example.com"
+    await _async_release_accounts(hass)
+
+    MockConfigEntry(domain=DOMAIN, data={"email": "other@example.com", "password": "x"}).add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"email": "Other@example.com", "password": "x"}
+    )
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
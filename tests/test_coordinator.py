@@ -0,0 +1,266 @@
+"""Tests for the zone coordinator: change tracking, scenes and the poll paths."""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.koolnova.const import ANALYSIS_REFRESH_INTERVAL, ANALYSIS_STUCK_WINDOW, DOMAIN
+from custom_components.koolnova.coordinator import KoolnovaDataUpdateCoordinator
+from custom_components.koolnova.history import KoolnovaHistory
+from custom_components.koolnova.koolnova_api.client import KoolnovaAPIRestClient
+from custom_components.koolnova.koolnova_api.exceptions import KoolnovaServerError
+
+ZONE = {"Room_id": 1, "Room_actual_temp": 21.0, "Room_setpoint_temp": 22.0,
+        "Room_status": "03", "Room_speed": "4", "Room_update_at": "2026-01-01T00:00:00"}
+
+
+def _room(room_id: int, setpoint: float = 22.0, updated_at: str = "2026-01-01T00:00:00", **fields: Any) -> dict:
+    """Return a zone in the raw topics/sensors/ format."""
+    return {"id": room_id, "name": f"Zona {room_id}", "status": "03", "updated_at": updated_at,
+            "temperature": 21.0, "setpoint_temperature": setpoint, "speed": "4",
+            "topic_info": {"id": 1, "last_sync": "2026-01-01T00:00:00", "is_online": True}, **fields}
+
+
+class FakeClient:
+    """Client stand-in for one project with a few zones, recording every call."""
+
+    session = None
+
+    def __init__(self, room_ids=(1, 2)) -> None:
+        self.calls: list[Any] = []
+        self.rooms = {room_id: _room(room_id) for room_id in room_ids}
+        self.fail_sensors: set[int] = set()
+        self.mode = 1
+        self.fail_projects = False
+
+    def authenticate(self, deadline=None) -> str:
+        self.calls.append("authenticate")
+        return "token"
+
+    def get_project(self, deadline=None) -> list:
+        self.calls.append("projects")
+        if self.fail_projects:
+            raise KoolnovaServerError("stand-in 502")
+        return [{"Project_Name": "Casa", "Topic_Name": "Planta", "Topic_id": 1, "Mode": self.mode,
+                 "is_stop": False, "is_online": True, "eco": False, "last_sync": "2026-01-01T00:00:00"}]
+
+    def get_sensors(self, deadline=None) -> list:
+        self.calls.append("sensors")
+        return [KoolnovaAPIRestClient.parse_room(room) for room in self.rooms.values()]
+
+    def update_sensor(self, sensor_id: int, payload: dict, deadline=None) -> dict:
+        self.calls.append(("update_sensor", sensor_id, payload))
+        if sensor_id in self.fail_sensors:
+            raise KoolnovaServerError("stand-in 500")
+        self.rooms[sensor_id] = {**self.rooms[sensor_id], **payload, "updated_at": f"cmd-{len(self.calls)}"}
+        return self.rooms[sensor_id]
+
+
+async def _coordinator(hass: HomeAssistant, client: FakeClient, **options: Any) -> KoolnovaDataUpdateCoordinator:
+    """Return a coordinator on a stand-in client, after its first refresh."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"email": "user@example.com", "password": "secret"}, options=options)
+    entry.add_to_hass(hass)
+    coordinator = KoolnovaDataUpdateCoordinator(hass, entry)
+    coordinator.client = coordinator.account.client = client
+    await coordinator.async_refresh()
+    return coordinator
+
+
+def test_stuck_sensor_reported_while_zone_data_is_unchanged() -> None:
+    """sensor_stuck flips with an unchanged watermark, so the zone must be written."""
+    coordinator = SimpleNamespace(history=KoolnovaHistory(), analysis={}, _last_full_analysis=None)
+    refresh = KoolnovaDataUpdateCoordinator._refresh_analysis.__get__(coordinator)
+
+    start = time.time() - ANALYSIS_STUCK_WINDOW - 600
+    for minute in range(0, 61, 5):
+        coordinator.history.async_record([ZONE], start + minute * 60)
+    assert refresh() == {1}
+    assert not coordinator.analysis[1]["sensor_stuck"]
+    assert refresh() == set()
+
+    # La misma lectura (mismo Room_update_at) durante toda la ventana
+    for minute in range(65, ANALYSIS_STUCK_WINDOW // 60 + 1, 5):
+        coordinator.history.async_record([ZONE], start + minute * 60)
+    assert refresh() == {1}
+    assert coordinator.analysis[1]["sensor_stuck"]
+
+
+def test_analysis_limited_to_changed_zones() -> None:
+    """Only zones with new data are re-analyzed, until the periodic full pass."""
+    coordinator = SimpleNamespace(history=KoolnovaHistory(), analysis={}, _last_full_analysis=None)
+    refresh = KoolnovaDataUpdateCoordinator._refresh_analysis.__get__(coordinator)
+    other = {**ZONE, "Room_id": 2}
+
+    start = time.time() - 3600
+    for minute in range(0, 60, 5):
+        coordinator.history.async_record([ZONE, other], start + minute * 60)
+    assert refresh() == {1, 2}
+    analysis = coordinator.analysis
+
+    # Poll sin zonas cambiadas: ni se recalcula ni se sustituye el dict
+    assert refresh(set()) == set()
+    assert coordinator.analysis is analysis
+
+    # Zona 2 calentando: solo se analiza la zona 1, la 2 conserva su resultado
+    for minute in range(60, 120, 5):
+        coordinator.history.async_record([{**other, "Room_actual_temp": 21.0 + minute / 30}], start + minute * 60)
+    assert refresh({1}) == set()
+    assert coordinator.analysis[2] is analysis[2]
+
+    # Pasado el intervalo se reanalizan todas
+    coordinator._last_full_analysis -= ANALYSIS_REFRESH_INTERVAL
+    assert refresh({1}) == {2}
+    assert coordinator.analysis[2]["temperature_trend"] > 0
+
+
+async def test_only_zones_with_a_moved_watermark_count_as_changed(hass: HomeAssistant, freezer) -> None:
+    """A poll reports the zones whose Room_update_at/last_sync moved; the rest are counted unchanged."""
+    client = FakeClient(room_ids=(1, 2, 3))
+    coordinator = await _coordinator(hass, client)
+    assert coordinator.watermark_stats == {"changed": 3, "unchanged": 0}
+
+    client.rooms[2] = {**client.rooms[2], "temperature": 23.5, "updated_at": "2026-01-01T00:05:00"}
+    client.rooms[3] = {**client.rooms[3], "topic_info": {**client.rooms[3]["topic_info"], "is_online": False}}
+    freezer.tick(coordinator.update_interval)
+    await coordinator.async_refresh()
+    assert coordinator.changed_zones == {2, 3}
+    assert coordinator.watermark_stats == {"changed": 5, "unchanged": 1}
+
+    # Zona desaparecida: cuenta como cambiada
+    del client.rooms[1]
+    freezer.tick(coordinator.update_interval)
+    await coordinator.async_refresh()
+    assert coordinator.changed_zones == {1}
+    assert coordinator.watermark_stats == {"changed": 6, "unchanged": 3}
+    await coordinator.account.async_shutdown()
+
+
+async def test_unchanged_response_reuses_the_filtered_zones(hass: HomeAssistant) -> None:
+    """The same response object (a 304 from the cache) is not filtered again."""
+    coordinator = await _coordinator(hass, FakeClient())
+    raw = coordinator._raw_sensors
+    sensors = coordinator.data["sensors"]
+    assert coordinator._use_sensors(raw) is sensors
+    assert coordinator._use_sensors(list(raw)) is not sensors
+    await coordinator.account.async_shutdown()
+
+
+async def test_scene_sends_one_combined_command_per_changed_zone(hass: HomeAssistant) -> None:
+    """apply_scene skips zones already at their targets and reports each zone's outcome."""
+    client = FakeClient(room_ids=(1, 2, 3))
+    client.fail_sensors = {3}
+    coordinator = await _coordinator(hass, client)
+    client.calls.clear()
+
+    summary = await coordinator.async_apply_scene({
+        1: {"setpoint_temperature": 22.0, "speed": "4"},
+        2: {"setpoint_temperature": 24.0, "speed": "2", "status": "03"},
+        3: {"setpoint_temperature": 19.0},
+        9: {"setpoint_temperature": 20.0},
+    })
+
+    assert summary["updated"] == [2]
+    assert summary["unchanged"] == [1]
+    assert list(summary["failed"]) == [3]
+    assert summary["unknown"] == [9]
+    # Un solo PUT por zona, solo con los campos que cambian
+    assert client.calls == [
+        ("update_sensor", 2, {"setpoint_temperature": 24.0, "speed": "2"}),
+        ("update_sensor", 3, {"setpoint_temperature": 19.0}),
+    ]
+    zone = next(sensor for sensor in coordinator.data["sensors"] if sensor["Room_id"] == 2)
+    assert (zone["Room_setpoint_temp"], zone["Room_speed"]) == (24.0, "2")
+    await coordinator.account.async_shutdown()
+
+
+async def test_poll_skipped_after_commands_refreshed_the_zones(hass: HomeAssistant, freezer) -> None:
+    """Command responses covering most zones push the next poll back once, never twice."""
+    client = FakeClient()
+    coordinator = await _coordinator(hass, client)
+    coordinator.account.command_limiter.min_interval = 0
+    freezer.tick(5)
+    for room_id in (1, 2):
+        await coordinator.async_update_sensor_data(room_id, {"speed": "2"})
+    client.calls.clear()
+
+    freezer.tick(30)
+    await coordinator.async_refresh()
+    assert client.calls == []
+    assert coordinator.polls_skipped == 1
+    assert coordinator.changed_zones == set()
+
+    freezer.tick(30)
+    await coordinator.async_refresh()
+    assert client.calls == ["sensors"]
+    assert coordinator.polls_skipped == 1
+    await coordinator.account.async_shutdown()
+
+
+class ConcurrentClient(FakeClient):
+    """Client whose project and zone reads only return once both are in flight."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def get_project(self, deadline=None) -> list:
+        self.barrier.wait()
+        return super().get_project(deadline)
+
+    def get_sensors(self, deadline=None) -> list:
+        self.barrier.wait()
+        return super().get_sensors(deadline)
+
+
+async def test_initial_refresh_fetches_projects_and_zones_concurrently(hass: HomeAssistant) -> None:
+    """One login first, then both reads in flight at the same time."""
+    client = ConcurrentClient()
+    coordinator = await _coordinator(hass, client)
+
+    assert coordinator.last_update_success
+    assert client.calls[0] == "authenticate"
+    assert sorted(client.calls[1:]) == ["projects", "sensors"]
+    assert [project["Topic_id"] for project in coordinator.data["projects"]] == [1]
+    assert {sensor["Room_id"] for sensor in coordinator.data["sensors"]} == {1, 2}
+    await coordinator.account.async_shutdown()
+
+
+async def test_projects_poll_on_their_own_coordinator(hass: HomeAssistant, freezer) -> None:
+    """Project polls read only projects and leave the zone listeners alone, and vice versa."""
+    client = FakeClient()
+    coordinator = await _coordinator(hass, client)
+    projects = coordinator.project_coordinator
+    client.calls.clear()
+    client.mode = 2
+    # Fuera de la cache de la cuenta, antes de que los listeners armen temporizadores
+    freezer.tick(projects.update_interval)
+    zone_updates, project_updates = [], []
+    unsubs = [
+        coordinator.async_add_listener(lambda: zone_updates.append(True)),
+        projects.async_add_listener(lambda: project_updates.append(True)),
+    ]
+
+    await projects.async_refresh()
+    assert client.calls == ["projects"]
+    assert project_updates and not zone_updates
+    # Las zonas ven los proyectos nuevos en su proxima escritura
+    assert coordinator.data["projects"][0]["Mode"] == 2
+
+    client.calls.clear()
+    await coordinator.async_refresh()
+    assert client.calls == ["sensors"]
+    for unsub in unsubs:
+        unsub()
+
+    # Un fallo del poll de proyectos no afecta a las zonas ni a sus proyectos en cache
+    client.fail_projects = True
+    freezer.tick(projects.update_interval)
+    await projects.async_refresh()
+    assert not projects.last_update_success
+    assert coordinator.last_update_success
+    assert coordinator.data["projects"][0]["Mode"] == 2
+    await coordinator.account.async_shutdown()
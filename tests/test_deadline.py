@@ -0,0 +1,32 @@
+"""Tests for the per-operation time budget."""
+
+import pytest
+
+from custom_components.koolnova.koolnova_api.deadline import Deadline
+from custom_components.koolnova.koolnova_api.exceptions import KoolnovaTimeoutError
+
+
+def test_child_never_outlives_its_parent(freezer) -> None:
+    """A login inside a poll gets the auth budget capped by what the poll has left."""
+    poll = Deadline(10)
+    freezer.tick(8)
+    assert poll.child(30).remaining() == pytest.approx(2)
+    assert poll.child(1).remaining() == pytest.approx(1)
+
+
+def test_timeout_follows_the_remaining_budget(freezer) -> None:
+    """Each request gets what is left (capped), and none once it is spent."""
+    deadline = Deadline(10)
+    assert deadline.timeout(cap=4) == pytest.approx(4)
+    freezer.tick(7)
+    assert deadline.timeout(cap=4) == pytest.approx(3)
+    freezer.tick(3)
+    assert deadline.expired()
+    with pytest.raises(KoolnovaTimeoutError):
+        deadline.timeout()
+
+
+def test_no_retry_sleep_past_the_deadline() -> None:
+    """A retry delay that would exhaust the budget fails at once instead of sleeping."""
+    with pytest.raises(KoolnovaTimeoutError):
+        Deadline(0.5).sleep(1.0)
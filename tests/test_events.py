@@ -0,0 +1,79 @@
+"""Tests for the koolnova_update_completed event policy."""
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.koolnova.const import (
+    EVENT_MODE_AGGREGATE,
+    EVENT_MODE_OFF,
+    EVENT_MODE_ON_CHANGE,
+    EVENT_UPDATE_COMPLETED,
+)
+from custom_components.koolnova.events import KoolnovaUpdateEventPolicy
+
+PROJECTS = [{"Topic_id": 1, "last_sync": "2024-01-01T10:00:00"}]
+
+
+def _zone(room_id: int, setpoint: float) -> dict:
+    """Return a zone whose last_sync does not move when it changes."""
+    return {
+        "Room_id": room_id,
+        "Room_setpoint_temp": setpoint,
+        "Room_actual_temp": 21.0,
+        "topic_info": {"last_sync": "2024-01-01T10:00:00", "is_online": True},
+    }
+
+
+async def test_on_change_sees_every_zone(hass: HomeAssistant) -> None:
+    """A change in the second zone fires an event although the first is unchanged."""
+    events = async_capture_events(hass, EVENT_UPDATE_COMPLETED)
+    policy = KoolnovaUpdateEventPolicy(hass, "entry", EVENT_MODE_ON_CHANGE)
+
+    sensors = [_zone(1, 21.0), _zone(2, 21.0)]
+    policy.async_record("sensors_only", True, 0.1, {"projects": PROJECTS, "sensors": sensors})
+    # Mismas listas (GET condicional sin cambios): sin evento
+    policy.async_record("sensors_only", True, 0.1, {"projects": PROJECTS, "sensors": sensors})
+    policy.async_record("sensors_only", True, 0.1, {"projects": PROJECTS, "sensors": [_zone(1, 21.0), _zone(2, 21.0)]})
+    await hass.async_block_till_done()
+    assert len(events) == 1
+
+    policy.async_record("sensors_only", True, 0.1, {"projects": PROJECTS, "sensors": [_zone(1, 21.0), _zone(2, 23.0)]})
+    await hass.async_block_till_done()
+    assert len(events) == 2
+
+
+async def test_on_change_after_failure(hass: HomeAssistant) -> None:
+    """Recovering with the same data as before the failure fires an event."""
+    events = async_capture_events(hass, EVENT_UPDATE_COMPLETED)
+    policy = KoolnovaUpdateEventPolicy(hass, "entry", EVENT_MODE_ON_CHANGE)
+    data = {"projects": PROJECTS, "sensors": [_zone(1, 21.0)]}
+
+    policy.async_record("sensors_only", True, 0.1, data)
+    policy.async_record("failed", False, 0.1, error="boom")
+    policy.async_record("failed", False, 0.1, error="boom")
+    policy.async_record("sensors_only", True, 0.1, data)
+    await hass.async_block_till_done()
+    assert [event.data["success"] for event in events] == [True, False, True]
+
+
+async def test_aggregate_and_off(hass: HomeAssistant) -> None:
+    """Aggregate fires one summary per window; off fires nothing."""
+    events = async_capture_events(hass, EVENT_UPDATE_COMPLETED)
+    policy = KoolnovaUpdateEventPolicy(hass, "entry", EVENT_MODE_AGGREGATE, aggregate_polls=3)
+    data = {"projects": PROJECTS, "sensors": [_zone(1, 21.0)]}
+
+    policy.async_record("sensors_only", True, 0.2, data)
+    policy.async_record("failed", False, 0.4, error="boom")
+    policy.async_record("skipped", True, 0.0, data)
+    await hass.async_block_till_done()
+    assert len(events) == 1
+    summary = events[0].data
+    assert summary["polls"] == 3
+    assert summary["failures"] == 1
+    assert summary["update_types"] == {"sensors_only": 1, "failed": 1, "skipped": 1}
+    assert summary["latency_max"] == 0.4
+
+    policy.configure(EVENT_MODE_OFF, 3)
+    policy.async_record("sensors_only", True, 0.2, data)
+    await hass.async_block_till_done()
+    assert len(events) == 1
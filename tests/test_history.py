@@ -0,0 +1,104 @@
+"""Tests for the zone history and its running window sums."""
+
+import random
+
+from custom_components.koolnova.analysis import analyze_zone
+from custom_components.koolnova.const import ANALYSIS_MIN_SAMPLES, ANALYSIS_STUCK_WINDOW, ANALYSIS_TREND_WINDOW
+from custom_components.koolnova.history import KoolnovaHistory, ZoneHistory
+
+
+def test_ring_buffer_keeps_the_newest_samples() -> None:
+    """A full buffer overwrites its oldest sample and windows count only recent ones."""
+    zone = ZoneHistory(4)
+    for step in range(6):
+        zone.append(1000.0 + step * 60, 20.0 + step, 22.0, 3, 4)
+
+    assert len(zone) == 4
+    assert [zone.timestamps[i] for i in zone.indices()] == [1120.0, 1180.0, 1240.0, 1300.0]
+    stats = zone.stats(since=1200.0)
+    assert stats["samples"] == 2
+    assert stats["actual_temp"] == {"min": 24.0, "max": 25.0, "mean": 24.5}
+    assert stats["first_sample"] == 1240.0
+
+
+def test_history_records_api_values() -> None:
+    """API strings become floats and codes; missing readings are NaN and skipped by the stats."""
+    history = KoolnovaHistory(capacity=10)
+    history.async_record([
+        {"Room_id": 1, "Room_actual_temp": "21.5", "Room_setpoint_temp": 22, "Room_status": "02", "Room_speed": "4"},
+        {"Room_actual_temp": 30.0},
+    ], timestamp=1000.0)
+    history.async_record([{"Room_id": 1, "Room_actual_temp": None, "Room_setpoint_temp": "x"}], timestamp=1060.0)
+
+    assert list(history.zones) == [1]
+    stats = history.zones[1].stats()
+    assert stats["samples"] == 2
+    assert stats["actual_temp"] == {"min": 21.5, "max": 21.5, "mean": 21.5}
+    assert stats["setpoint_temp"] == {"min": 22.0, "max": 22.0, "mean": 22.0}
+    assert (stats["status"], stats["speed"]) == (-1, -1)
+    assert history.zone_stats(2) is None
+    assert history.as_diagnostics()["zones"][1]["stored"] == 2
+
+
+def _brute_force(zone: ZoneHistory, now: float) -> dict:
+    """Rescan the buffer like the analysis did before the running sums."""
+    idx = zone.indices(now - ANALYSIS_STUCK_WINDOW)
+    origin = zone.timestamps[idx[0]]
+    trend = [(zone.timestamps[i] - origin, zone.actual[i]) for i in idx
+             if zone.timestamps[i] >= now - ANALYSIS_TREND_WINDOW and zone.actual[i] == zone.actual[i]]
+    values = {zone.actual[i] for i in idx if zone.actual[i] == zone.actual[i]}
+    valid = sum(1 for i in idx if zone.actual[i] == zone.actual[i])
+    covered = zone.timestamps[idx[-1]] - zone.timestamps[idx[0]] >= ANALYSIS_STUCK_WINDOW * 0.9
+    slope = None
+    n = len(trend)
+    sx = sum(x for x, _ in trend)
+    sy = sum(y for _, y in trend)
+    denominator = n * sum(x * x for x, _ in trend) - sx * sx
+    if n >= ANALYSIS_MIN_SAMPLES and denominator > 0:
+        slope = (n * sum(x * y for x, y in trend) - sx * sy) / denominator * 3600
+    return {
+        "temperature_trend": round(slope, 2) if slope is not None else None,
+        "sensor_stuck": bool(covered and valid >= ANALYSIS_MIN_SAMPLES and len(values) == 1),
+    }
+
+
+def test_running_sums_match_a_rescan() -> None:
+    """Appends, expiry and ring overwrites keep the sums equal to a full rescan."""
+    rng = random.Random(7)
+    zone = ZoneHistory(200)
+    now = 1_700_000_000.0
+    value = 21.0
+    for step in range(3000):
+        now += 30 + rng.random() * 60
+        if rng.random() < 0.3:
+            value = round(value + rng.choice((-0.5, 0.5)), 1)
+        actual = float("nan") if rng.random() < 0.05 else value
+        zone.append(now, actual, 22.0, 3, 4)
+        if step % 37 == 0:
+            later = now + rng.random() * 120
+            result = analyze_zone(zone, later)
+            expected = _brute_force(zone, later)
+            if expected["temperature_trend"] is None:
+                assert result["temperature_trend"] is None
+            else:
+                # Solo puede diferir el redondeo del ultimo decimal
+                assert abs(result["temperature_trend"] - expected["temperature_trend"]) <= 0.011
+            assert result["sensor_stuck"] == expected["sensor_stuck"]
+
+
+def test_stuck_after_a_constant_window() -> None:
+    """A reading that stops changing is flagged once it covers the whole window."""
+    zone = ZoneHistory(1000)
+    now = 1_700_000_000.0
+    for step in range(20):
+        zone.append(now + step * 60, 20.0 + step * 0.1, 22.0, 3, 4)
+    now += 20 * 60
+    for step in range(ANALYSIS_STUCK_WINDOW // 60):
+        zone.append(now + step * 60, 23.0, 22.0, 3, 4)
+    now += ANALYSIS_STUCK_WINDOW
+    assert analyze_zone(zone, now)["sensor_stuck"]
+
+    zone.append(now, 23.5, 22.0, 3, 4)
+    assert not analyze_zone(zone, now)["sensor_stuck"]
+    # Sin muestras en la ventana no hay analisis
+    assert analyze_zone(zone, now + ANALYSIS_STUCK_WINDOW + 1) is None
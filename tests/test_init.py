@@ -0,0 +1,22 @@
+"""Tests for the Koolnova config entry lifecycle."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.koolnova import async_remove_entry
+from custom_components.koolnova.const import DOMAIN
+from custom_components.koolnova.schedule import schedule_store
+
+
+async def test_remove_entry_deletes_schedule(hass: HomeAssistant, hass_storage: dict[str, Any]) -> None:
+    """Removing an entry deletes its stored weekly program."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"email": "user@example.com", "password": "secret"})
+    entry.add_to_hass(hass)
+    await schedule_store(hass, entry.entry_id).async_save({"transitions": []})
+    assert f"{DOMAIN}.schedule.{entry.entry_id}" in hass_storage
+
+    await async_remove_entry(hass, entry)
+
+    assert f"{DOMAIN}.schedule.{entry.entry_id}" not in hass_storage
@@ -0,0 +1,70 @@
+"""Tests for the opt-in profiler of the entity update path."""
+
+from types import SimpleNamespace
+
+from custom_components.koolnova.profiling import KoolnovaProfiler, profiled_entity
+
+
+def test_disabled_profiler_records_nothing() -> None:
+    """Hooks only measure while enabled, and enabling starts from empty statistics."""
+    profiler = KoolnovaProfiler()
+    timed = profiler.wrap("listener:climate.salon", lambda value: value * 2)
+    assert timed(2) == 4
+    assert profiler.as_diagnostics()["paths"] == 0
+
+    profiler.set_enabled(True)
+    for _ in range(3):
+        timed(2)
+    assert profiler.top()[0]["path"] == "listener:climate.salon"
+    assert profiler.top()[0]["count"] == 3
+
+    profiler.set_enabled(False)
+    profiler.set_enabled(True)
+    assert profiler.top() == []
+
+
+def test_paths_are_bounded_and_ranked() -> None:
+    """Paths beyond max_paths are dropped; top() ranks by total time."""
+    profiler = KoolnovaProfiler(max_paths=2, samples_per_path=4)
+    profiler.set_enabled(True)
+    profiler.record("slow", 0.010)
+    profiler.record("fast", 0.001)
+    profiler.record("fast", 0.001)
+    profiler.record("extra", 1.0)
+
+    diagnostics = profiler.as_diagnostics()
+    assert diagnostics["paths"] == 2
+    assert diagnostics["dropped_paths"] == 1
+    assert [entry["path"] for entry in diagnostics["top"]] == ["slow", "fast"]
+    assert diagnostics["top"][0]["max_ms"] == 10.0
+    assert diagnostics["top"][1]["mean_ms"] == 1.0
+
+
+def test_profiled_entity_times_properties_and_state_writes() -> None:
+    """The decorator times every property and async_write_ha_state per class."""
+
+    class Base:
+        def async_write_ha_state(self) -> None:
+            self.written = True
+
+    @profiled_entity
+    class Zone(Base):
+        def __init__(self, coordinator) -> None:
+            self.coordinator = coordinator
+
+        @property
+        def current_temperature(self) -> float:
+            return 21.5
+
+    coordinator = SimpleNamespace(profiler=KoolnovaProfiler())
+    zone = Zone(coordinator)
+    assert zone.current_temperature == 21.5
+    assert coordinator.profiler.top() == []
+
+    coordinator.profiler.set_enabled(True)
+    assert zone.current_temperature == 21.5
+    zone.async_write_ha_state()
+    assert zone.written
+    assert {entry["path"] for entry in coordinator.profiler.top()} == {
+        "Zone.current_temperature", "Zone.async_write_ha_state",
+    }
@@ -0,0 +1,26 @@
+"""Tests for the Koolnova snapshot recorder."""
+
+import os
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.koolnova.recorder import KoolnovaSnapshotRecorder
+
+SENSORS = [{"Room_id": 1, "Room_actual_temp": 21.0}]
+
+
+async def test_recording_is_opt_in(hass: HomeAssistant, tmp_path) -> None:
+    """Nothing is written to disk until the option enables the recorder."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / ".storage").mkdir()
+    recorder = KoolnovaSnapshotRecorder(hass, "entry")
+    await recorder.async_record({"sensors": SENSORS})
+    assert not os.path.exists(recorder.current_path)
+
+    recorder.enabled = True
+    await recorder.async_record({"sensors": SENSORS})
+    # Un comando sustituye el dict (copia), nunca lo modifica in situ
+    await recorder.async_record({"sensors": [{**SENSORS[0], "Room_actual_temp": 22.0}]})
+    exported = await recorder.async_export()
+    assert exported["records"][0]["full"]["sensors"]["1"]["Room_actual_temp"] == 21.0
+    assert exported["records"][1]["set"] == {"sensors": {"1": {"Room_actual_temp": 22.0}}}
@@ -0,0 +1,73 @@
+"""Tests for the weekly schedule engine."""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.koolnova.schedule import KoolnovaScheduler
+
+
+class FakeCoordinator:
+    """Coordinator stand-in that records the scenes applied by the scheduler."""
+
+    def __init__(self) -> None:
+        self.data = {"sensors": [{"Room_id": 1}, {"Room_id": 2}]}
+        self.scenes: list[dict] = []
+
+    def sensor_payload_from_targets(self, temperature=None, hvac_mode=None, fan_mode=None) -> dict:
+        if temperature is not None and temperature > 30:
+            raise ValueError("out of range")
+        payload: dict[str, Any] = {}
+        if temperature is not None:
+            payload["setpoint_temperature"] = temperature
+        if fan_mode is not None:
+            payload["speed"] = fan_mode
+        return payload
+
+    async def async_apply_scene(self, targets: dict) -> dict:
+        self.scenes.append(targets)
+        return {"updated": sorted(targets)}
+
+
+async def test_transitions_due_together_become_one_scene(hass: HomeAssistant, freezer) -> None:
+    """Transitions of the same minute are merged per zone and the timer moves on."""
+    # Lunes 07:59 en hora local
+    monday = dt_util.start_of_local_day(datetime(2026, 1, 5)) + timedelta(hours=7, minutes=59)
+    freezer.move_to(monday)
+    coordinator = FakeCoordinator()
+    scheduler = KoolnovaScheduler(hass, coordinator, "entry")
+
+    next_transition = await scheduler.async_set_transitions([
+        {"days": ["mon"], "time": "08:00", "zones": [1], "temperature": 21.0},
+        {"days": ["mon"], "time": "08:00", "fan_mode": "1"},
+        {"days": ["mon"], "time": "08:00", "zones": [2], "temperature": 35.0},
+        {"days": ["mon", "fri"], "time": "22:30", "temperature": 18.0},
+    ])
+    assert next_transition == monday + timedelta(minutes=1)
+
+    freezer.move_to(next_transition)
+    async_fire_time_changed(hass, next_transition)
+    await hass.async_block_till_done()
+
+    # La transicion invalida se omite; las demas se fusionan en una escena
+    assert coordinator.scenes == [{1: {"setpoint_temperature": 21.0, "speed": "1"}, 2: {"speed": "1"}}]
+    assert scheduler.next_transition == monday.replace(hour=22, minute=30)
+    assert scheduler.last_result == {"updated": [1, 2]}
+    scheduler.async_stop()
+
+
+async def test_next_transition_wraps_to_next_week(hass: HomeAssistant, freezer) -> None:
+    """After the last transition of the week the timer points at the first one."""
+    sunday = dt_util.start_of_local_day(datetime(2026, 1, 11)) + timedelta(hours=23)
+    freezer.move_to(sunday)
+    scheduler = KoolnovaScheduler(hass, FakeCoordinator(), "entry")
+
+    await scheduler.async_set_transitions([{"days": ["mon"], "time": "06:15", "temperature": 20.0}])
+    assert scheduler.next_transition == sunday + timedelta(hours=7, minutes=15)
+
+    await scheduler.async_set_transitions([])
+    assert scheduler.next_transition is None
+    scheduler.async_stop()
@@ -0,0 +1,26 @@
+"""Tests for the Koolnova service registration."""
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.koolnova.const import (
+    DOMAIN,
+    SERVICE_APPLY_SCENE,
+    SERVICE_CLEAR_SCHEDULE,
+    SERVICE_GET_ZONE_HISTORY,
+    SERVICE_SET_SCHEDULE,
+)
+from custom_components.koolnova.services import async_setup_services, async_unload_services
+
+
+async def test_setup_services_registers_every_service(hass: HomeAssistant) -> None:
+    """All services are registered once and removed with the last entry."""
+    async_setup_services(hass)
+    # Una segunda entrada no vuelve a registrarlos
+    async_setup_services(hass)
+
+    for service in (SERVICE_GET_ZONE_HISTORY, SERVICE_APPLY_SCENE, SERVICE_SET_SCHEDULE, SERVICE_CLEAR_SCHEDULE):
+        assert hass.services.has_service(DOMAIN, service)
+
+    hass.data[DOMAIN] = {}
+    async_unload_services(hass)
+    assert not hass.services.async_services().get(DOMAIN)
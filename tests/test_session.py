@@ -0,0 +1,213 @@
+"""Tests for the Koolnova session (retries, deadlines, conditional GETs, compression) against a stand-in server."""
+
+import gzip
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from custom_components.koolnova.koolnova_api import session as session_module
+from custom_components.koolnova.koolnova_api.deadline import Deadline
+from custom_components.koolnova.koolnova_api.session import KoolnovaClientSession
+from custom_components.koolnova.koolnova_api.exceptions import (
+    KoolnovaConnectionError,
+    KoolnovaServerError,
+    KoolnovaTimeoutError,
+)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local Koolnova stand-in: logs in and answers GETs with a fixed status and body."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests: list[str] = []
+        self.request_headers: list[dict] = []
+        self.status = 200
+        self.body: dict = {"data": []}
+        self.etag = None
+        self.gzip = False
+        self.delay = 0.0
+        self.drop = False
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        if self.server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        if self.server.etag:
+            self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(200, {"token": "stand-in-token"})
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        self.server.request_headers.append(dict(self.headers))
+        if self.server.drop:
+            # Cierra sin responder: el cliente ve RemoteDisconnected
+            self.close_connection = True
+            return
+        time.sleep(self.server.delay)
+        if self.server.etag and self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.server.etag)
+            self.end_headers()
+            return
+        self._reply(self.server.status, self.server.body)
+
+
+@pytest.fixture
+def server(socket_enabled, monkeypatch):
+    """Run the stand-in server and point the session at it."""
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(session_module, "KOOLNOVA_AUTH_URL", f"{server.url}/auth/v2/login/")
+    monkeypatch.setattr(KoolnovaClientSession, "host", server.url)
+    monkeypatch.setattr(session_module, "RETRY_BASE_DELAY", 0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _session() -> KoolnovaClientSession:
+    return KoolnovaClientSession("", "secret", "user@example.com")
+
+
+def test_server_errors_are_not_retried(server) -> None:
+    """A 503 reached the server: one GET per poll, the breaker handles the rest."""
+    server.status = 503
+    session = _session()
+    for _ in range(3):
+        with pytest.raises(KoolnovaServerError):
+            session.rest_request("GET", "topics/sensors/")
+    assert len(server.requests) == 3
+    assert not session.retry_stats.retries
+
+
+def test_read_timeouts_are_not_retried(server) -> None:
+    """A slow answer is not asked for again."""
+    server.delay = 0.5
+    session = _session()
+    with pytest.raises(KoolnovaTimeoutError):
+        session.rest_request("GET", "topics/sensors/", timeout=0.1)
+    assert len(server.requests) == 1
+
+
+def test_request_timeout_comes_from_the_deadline(server) -> None:
+    """A slow answer is abandoned when the operation budget runs out, not after a fixed timeout."""
+    server.delay = 0.5
+    session = _session()
+    started = time.monotonic()
+    with pytest.raises(KoolnovaTimeoutError):
+        session.rest_request("GET", "topics/sensors/", deadline=Deadline(0.1))
+    assert time.monotonic() - started < 0.4
+
+    # Sin presupuesto no se envia nada
+    with pytest.raises(KoolnovaTimeoutError):
+        session.rest_request("GET", "topics/sensors/", deadline=Deadline(0))
+    assert len(server.requests) == 1
+
+
+def test_connection_failures_are_retried(server, monkeypatch) -> None:
+    """A refused connection never reached the server and is retried."""
+    session = _session()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+    monkeypatch.setattr(session, "host", f"http://127.0.0.1:{closed_port}")
+    with pytest.raises(KoolnovaConnectionError):
+        session.rest_request("GET", "topics/sensors/")
+    assert session.retry_stats.retries == {"connection_refused": session_module.REQUEST_MAX_ATTEMPTS - 1}
+    assert session.retry_stats.gave_up == 1
+
+
+def test_disconnect_after_sending_is_not_retried(server) -> None:
+    """A connection dropped after the request was sent counts against the 30s window."""
+    server.drop = True
+    session = _session()
+    with pytest.raises(KoolnovaConnectionError):
+        session.rest_request("GET", "topics/sensors/")
+    assert len(server.requests) == 1
+    assert not session.retry_stats.retries
+
+
+def test_commands_are_not_retried(server, monkeypatch) -> None:
+    """A PUT is sent once even when the connection is refused."""
+    session = _session()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+    monkeypatch.setattr(session, "host", f"http://127.0.0.1:{closed_port}")
+    with pytest.raises(KoolnovaConnectionError):
+        session.rest_request("PUT", "topics/sensors/1/", json={"speed": "1"})
+    assert not session.retry_stats.retries
+
+
+def test_not_modified_is_served_from_the_cache(server) -> None:
+    """A 304 returns the previously parsed object itself, without decoding anything."""
+    server.etag = '"v1"'
+    server.body = {"data": [{"id": 1}]}
+    session = _session()
+    parsed = []
+
+    def _parse(data: dict) -> list:
+        parsed.append(data)
+        return data["data"]
+
+    first = session.conditional_get("topics/sensors/", _parse)
+    second = session.conditional_get("topics/sensors/", _parse)
+    assert second is first
+    assert len(parsed) == 1
+    assert server.request_headers[-1]["If-None-Match"] == '"v1"'
+    assert session.conditional_cache.stats == {"not_modified": 1, "identical": 0, "changed": 1}
+
+    # Sin validadores: un cuerpo identico tambien devuelve el mismo objeto
+    server.etag = None
+    assert session.conditional_get("topics/sensors/", _parse) is first
+    server.body = {"data": [{"id": 2}]}
+    assert session.conditional_get("topics/sensors/", _parse) == [{"id": 2}]
+    assert session.conditional_cache.stats == {"not_modified": 1, "identical": 1, "changed": 2}
+    assert len(parsed) == 2
+
+
+def test_compressed_responses_are_asked_for_and_measured(server) -> None:
+    """The session asks for gzip and records wire vs decoded bytes per endpoint."""
+    server.gzip = True
+    server.etag = '"v1"'
+    server.body = {"data": [{"id": room_id, "name": f"Zona {room_id}", "status": "03"} for room_id in range(50)]}
+    session = _session()
+
+    rooms = session.conditional_get("topics/sensors/", lambda data: data["data"])
+    assert len(rooms) == 50
+    assert "gzip" in server.request_headers[-1]["Accept-Encoding"]
+    session.conditional_get("topics/sensors/", lambda data: data["data"])
+
+    stats = session.transfer_stats.as_dict()["topics/sensors/"]
+    decoded = len(json.dumps(server.body).encode())
+    assert stats["responses"] == 2
+    assert stats["encodings"] == {"gzip": 1, "not_modified": 1}
+    assert stats["decoded_bytes"] == decoded
+    assert 0 < stats["wire_bytes"] < decoded / 4
+    assert stats["ratio"] == round(stats["wire_bytes"] / decoded, 3)
@@ -0,0 +1,147 @@
+"""Tests for the push update source against a local stand-in server."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.koolnova.const import PUSH_LONG_POLL_MIN_INTERVAL
+from custom_components.koolnova.update_source import KoolnovaPushSource, KoolnovaUpdateSource
+
+ROOM = {
+    "id": 7, "name": "Salon", "status": "03", "updated_at": "2026-01-01T00:00:00",
+    "temperature": 21.5, "setpoint_temperature": 22.0, "speed": "4", "topic_info": {"id": 1},
+}
+
+
+class FakeCoordinator:
+    """Coordinator stand-in that records what the push source delivers."""
+
+    def __init__(self, hass: HomeAssistant, token: str = "token") -> None:
+        self.pushed: list[list[dict]] = []
+        self.source_changes = 0
+        # La sesion del cliente ya no tiene token (otro hilo la cerro): manda el del login
+        self.client = SimpleNamespace(authenticate=lambda: token, session=None)
+        self.config_entry = SimpleNamespace(
+            async_create_background_task=lambda hass, coro, name: hass.async_create_background_task(coro, name)
+        )
+
+        async def _run(func, *args, **kwargs):
+            return func(*args)
+
+        self.account = SimpleNamespace(async_request=_run)
+
+    def async_update_source_changed(self) -> None:
+        self.source_changes += 1
+
+    def async_push_sensors(self, sensors: list[dict]) -> None:
+        self.pushed.append(sensors)
+
+
+def test_update_source_is_abstract() -> None:
+    """The base class cannot be used without a connected property."""
+    with pytest.raises(TypeError):
+        KoolnovaUpdateSource(None, None)
+
+
+async def test_sse_stream(hass: HomeAssistant, socket_enabled, aiohttp_server) -> None:
+    """Zones streamed over SSE reach the coordinator with the bearer token."""
+    headers = []
+
+    async def _events(request: web.Request) -> web.StreamResponse:
+        headers.append(request.headers.get("Authorization"))
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(f"data: {json.dumps(ROOM)}\n\n".encode())
+        await asyncio.sleep(10)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/events", _events)
+    server = await aiohttp_server(app)
+
+    coordinator = FakeCoordinator(hass)
+    source = KoolnovaPushSource(hass, coordinator, str(server.make_url("/events")))
+    await source.async_start()
+    for _ in range(100):
+        if coordinator.pushed:
+            break
+        await asyncio.sleep(0.02)
+    assert source.connected
+    await source.async_stop()
+
+    assert headers == ["Bearer token"]
+    assert coordinator.pushed[0][0]["Room_id"] == 7
+    assert not source.connected
+
+
+async def test_long_poll_respects_poll_budget(hass: HomeAssistant, socket_enabled, aiohttp_server) -> None:
+    """A long-poll endpoint answering at once is asked again only after the minimum interval."""
+    requests = []
+
+    async def _poll(request: web.Request) -> web.Response:
+        requests.append(request.path)
+        return web.json_response({"data": [ROOM]})
+
+    app = web.Application()
+    app.router.add_get("/poll", _poll)
+    server = await aiohttp_server(app)
+
+    coordinator = FakeCoordinator(hass)
+    source = KoolnovaPushSource(hass, coordinator, str(server.make_url("/poll")))
+    # (request, espera) en orden: la primera espera vuelve enseguida, la segunda no
+    timeline = []
+    resume = asyncio.Event()
+
+    async def _sleep(delay: float) -> None:
+        timeline.append(("wait", delay, len(requests)))
+        if len(timeline) > 1:
+            await resume.wait()
+
+    source._sleep = _sleep
+    await source.async_start()
+    for _ in range(100):
+        if len(timeline) > 1:
+            break
+        await asyncio.sleep(0.02)
+    await source.async_stop()
+
+    # Cada peticion va precedida de una espera de casi todo el intervalo
+    assert len(requests) == 2
+    assert [requests_before for _, _, requests_before in timeline] == [1, 2]
+    assert all(delay > PUSH_LONG_POLL_MIN_INTERVAL - 1 for _, delay, _ in timeline)
+    assert len(coordinator.pushed) == 2
+
+
+async def test_missing_token_is_not_sent(hass: HomeAssistant, socket_enabled, aiohttp_server) -> None:
+    """A login without token fails the connection instead of sending "Bearer None"."""
+    headers = []
+
+    async def _events(request: web.Request) -> web.Response:
+        headers.append(request.headers.get("Authorization"))
+        return web.json_response({"data": [ROOM]})
+
+    app = web.Application()
+    app.router.add_get("/events", _events)
+    server = await aiohttp_server(app)
+
+    coordinator = FakeCoordinator(hass, token=None)
+    source = KoolnovaPushSource(hass, coordinator, str(server.make_url("/events")))
+    reconnected = asyncio.Event()
+
+    async def _sleep(delay: float) -> None:
+        reconnected.set()
+        await asyncio.Event().wait()
+
+    source._sleep = _sleep
+    await source.async_start()
+    await asyncio.wait_for(reconnected.wait(), 5)
+    await source.async_stop()
+
+    assert headers == []
+    assert "no bearer token" in source.last_error
+    assert not coordinator.pushed
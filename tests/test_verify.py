@@ -0,0 +1,118 @@
+"""Tests for the batched command verification."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.koolnova.account import KoolnovaRequestScheduler
+from custom_components.koolnova.const import VERIFY_BACKOFF
+from custom_components.koolnova.verify import (
+    VERIFY_CONFIRMED,
+    VERIFY_DRIFTED,
+    VERIFY_UNKNOWN,
+    KoolnovaCommandVerifier,
+)
+
+
+class FakeCoordinator:
+    """Coordinator stand-in that serves (or fails) the zone reads."""
+
+    poll_timeout = 10
+
+    def __init__(self, sensors: list[dict]) -> None:
+        self.request_scheduler = KoolnovaRequestScheduler()
+        self.client = SimpleNamespace(
+            get_sensors=lambda deadline=None: self.sensors,
+            get_sensor=lambda sensor_id, deadline=None: next(
+                sensor for sensor in self.sensors if sensor["Room_id"] == sensor_id
+            ),
+        )
+        self.sensors = sensors
+        self.fail = False
+        self.fetches: list[str] = []
+        self.updated: list[tuple[list[dict], set]] = []
+
+    async def _async_fetch(self, key: str, func, max_age: float, deadline) -> Any:
+        self.fetches.append(key)
+        if self.fail:
+            raise ConnectionError("stand-in outage")
+        return func()
+
+    def async_set_sensors(self, sensors: list[dict], settled=()) -> None:
+        self.updated.append((sensors, set(settled)))
+
+
+async def _advance(hass: HomeAssistant, seconds: float) -> None:
+    """Fire the timers due within `seconds`."""
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+def _zone(room_id: int, setpoint: float) -> dict:
+    return {"Room_id": room_id, "Room_setpoint_temp": setpoint}
+
+
+async def test_scene_is_verified_with_one_read(hass: HomeAssistant, freezer) -> None:
+    """N zones touched together are checked with a single read per tick."""
+    coordinator = FakeCoordinator([_zone(room_id, 22.0) for room_id in range(1, 6)])
+    verifier = KoolnovaCommandVerifier(hass, coordinator)
+    verifier.enabled = True
+    for room_id in range(1, 6):
+        verifier.async_track(room_id, {"setpoint_temperature": 22.0})
+
+    freezer.tick(VERIFY_BACKOFF[0])
+    await _advance(hass, 0)
+
+    assert coordinator.fetches == ["sensors"]
+    assert {result["state"] for result in verifier.results.values()} == {VERIFY_CONFIRMED}
+    # Las zonas confirmadas se escriben aunque sus datos no cambien
+    assert coordinator.updated[-1][1] == set(range(1, 6))
+    verifier.async_stop()
+
+
+async def test_single_zone_reads_only_that_zone(hass: HomeAssistant, freezer) -> None:
+    """A lone pending zone is checked with topics/sensors/<id>/ instead of the full list."""
+    coordinator = FakeCoordinator([_zone(1, 20.0), _zone(2, 22.0)])
+    verifier = KoolnovaCommandVerifier(hass, coordinator)
+    verifier.enabled = True
+    verifier.async_track(2, {"setpoint_temperature": 22.0})
+
+    freezer.tick(VERIFY_BACKOFF[0])
+    await _advance(hass, 0)
+
+    assert coordinator.fetches == ["sensor:2"]
+    assert verifier.results[2]["state"] == VERIFY_CONFIRMED
+    assert coordinator.updated[-1] == ([_zone(2, 22.0)], {2})
+    verifier.async_stop()
+
+
+async def test_failed_last_read_is_unknown(hass: HomeAssistant, freezer) -> None:
+    """A zone that could never be read is unknown, a mismatching one drifted."""
+    coordinator = FakeCoordinator([_zone(1, 20.0)])
+    verifier = KoolnovaCommandVerifier(hass, coordinator)
+    verifier.enabled = True
+    verifier.async_track(1, {"setpoint_temperature": 22.0})
+    verifier.async_track(2, {"setpoint_temperature": 22.0})
+
+    for delay in VERIFY_BACKOFF[:-1]:
+        freezer.tick(delay)
+        await _advance(hass, 0)
+    coordinator.fail = True
+    freezer.tick(VERIFY_BACKOFF[-1])
+    await _advance(hass, 0)
+
+    assert len(coordinator.fetches) == len(VERIFY_BACKOFF)
+    assert verifier.results[1]["state"] == VERIFY_UNKNOWN
+    assert verifier.results[2]["state"] == VERIFY_UNKNOWN
+
+    coordinator.fail = False
+    verifier.async_track(1, {"setpoint_temperature": 22.0})
+    for delay in VERIFY_BACKOFF:
+        freezer.tick(delay)
+        await _advance(hass, 0)
+    assert verifier.results[1]["state"] == VERIFY_DRIFTED
+    verifier.async_stop()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Measure the import time of the Koolnova integration modules.
+
+Every measurement runs in a fresh interpreter (nothing cached in
+sys.modules, bytecode compiled beforehand) and reports the median of several
+runs, plus which heavy modules the import itself pulled in.
+
+By default the Home Assistant modules that core has already loaded when it
+imports a custom integration (core, config entries, the update coordinator
+helper, the climate and sensor components) are imported first and not
+timed, so the figure is the integration's own cost at startup. --cold times
+everything from an empty interpreter instead.
+
+--against REV measures the same modules in the tree of a git revision too
+and prints before/after figures.
+
+Usage:
+    python tools/koolnova_import_bench.py
+    python tools/koolnova_import_bench.py --against HEAD~5 --runs 20
+    python tools/koolnova_import_bench.py --cold --module custom_components.koolnova.climate
+    python tools/koolnova_import_bench.py --preload homeassistant.helpers.aiohttp_client
+
+The integration modules need Home Assistant installed; koolnova_api.client
+is measured standalone.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = (
+    "koolnova_api.client",
+    "custom_components.koolnova.coordinator",
+    "custom_components.koolnova.climate",
+)
+HEAVY_MODULES = (
+    "requests",
+    "urllib3",
+    "statistics",
+    "aiohttp",
+    "homeassistant.components.persistent_notification",
+)
+# Ya cargados por Home Assistant antes de importar una integracion
+HA_PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.climate",
+    "homeassistant.components.sensor",
+)
+
+_PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {path!r})
+try:
+    for name in {preload!r}:
+        importlib.import_module(name)
+except Exception as err:
+    print(json.dumps({{"error": f"preload {{type(err).__name__}}: {{err}}"}}))
+    raise SystemExit
+before = set(sys.modules)
+start = time.perf_counter()
+try:
+    importlib.import_module({module!r})
+    error = None
+except Exception as err:
+    error = f"{{type(err).__name__}}: {{err}}"
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "error": error,
+                  "loaded": [name for name in {heavy!r} if name in sys.modules and name not in before]}}))
+"""
+
+
+def module_path(module, tree):
+    """Return the sys.path entry a module is imported from inside a tree."""
+    if module.startswith("koolnova_api"):
+        return os.path.join(tree, "custom_components", "koolnova")
+    return tree
+
+
+def measure(module, tree, runs, preload):
+    """Return (median ms, heavy modules loaded, error) of importing a module."""
+    times, loaded = [], []
+    for _ in range(runs):
+        code = _PROBE.format(path=module_path(module, tree), module=module,
+                             heavy=HEAVY_MODULES, preload=preload)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                check=True, cwd=tree)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        if result["error"]:
+            return None, [], result["error"]
+        times.append(result["ms"])
+        loaded = result["loaded"]
+    return statistics.median(times), loaded, None
+
+
+def compile_tree(tree):
+    """Write the bytecode of a tree so no run pays for compiling it."""
+    subprocess.run([sys.executable, "-m", "compileall", "-q", os.path.join(tree, "custom_components")], check=True)
+
+
+def export_tree(rev, target):
+    """Extract the integration of a git revision into target."""
+    archive = subprocess.run(["git", "archive", rev, "custom_components"], cwd=ROOT,
+                             capture_output=True, check=True).stdout
+    with tempfile.TemporaryFile() as file:
+        file.write(archive)
+        file.seek(0)
+        with tarfile.open(fileobj=file) as tar:
+            tar.extractall(target)
+    compile_tree(target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per module (default 7)")
+    parser.add_argument("--module", action="append", help="module to measure (repeatable, from the repo root)")
+    parser.add_argument("--against", metavar="REV", help="also measure the tree of a git revision")
+    parser.add_argument("--cold", action="store_true", help="do not preload the Home Assistant modules")
+    parser.add_argument("--preload", action="append", default=[], help="extra module loaded before timing (repeatable)")
+    args = parser.parse_args()
+
+    modules = args.module or DEFAULT_MODULES
+    preload = (() if args.cold else HA_PRELOAD) + tuple(args.preload)
+
+    compile_tree(ROOT)
+    with tempfile.TemporaryDirectory() as before_tree:
+        if args.against:
+            export_tree(args.against, before_tree)
+            print(f"{'module':42} {args.against[:10]:>10} {'now':>10} {'saved':>8}  heavy modules loaded now")
+        else:
+            print(f"{'module':42} {'median ms':>10}  heavy modules loaded")
+        for module in modules:
+            elapsed, loaded, error = measure(module, ROOT, args.runs, preload)
+            if error:
+                print(f"{module:42} {'skipped':>10}  ({error})")
+                continue
+            heavy = ", ".join(loaded) or "-"
+            if not args.against:
+                print(f"{module:42} {elapsed:10.1f}  {heavy}")
+                continue
+            previous, _, error = measure(module, before_tree, args.runs, preload)
+            if error:
+                print(f"{module:42} {'n/a':>10} {elapsed:10.1f} {'':>8}  {heavy}")
+            else:
+                print(f"{module:42} {previous:10.1f} {elapsed:10.1f} {previous - elapsed:8.1f}  {heavy}")
+
+    print()
+    print(f"{'heavy module (cold import on its own)':42} {'median ms':>10}")
+    for module in HEAVY_MODULES:
+        elapsed, _, error = measure(module, ROOT, args.runs, ())
+        print(f"{module:42} {'not installed' if error else f'{elapsed:10.1f}':>10}")
+
+
+if __name__ == "__main__":
+    main()
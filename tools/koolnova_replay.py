@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Replay Koolnova state snapshots offline.
+
+Reads the "snapshots" section of a Koolnova diagnostics download (or the raw
+.storage/koolnova.snapshots.<entry_id>.*.jsonl segments) and prints how the
+zones and projects changed over time, without Home Assistant installed.
+
+Usage:
+    python tools/koolnova_replay.py config_entry-koolnova-XXXX.json
+    python tools/koolnova_replay.py koolnova.snapshots.ID.1.jsonl koolnova.snapshots.ID.0.jsonl
+    python tools/koolnova_replay.py diagnostics.json --zone Salon --csv > salon.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+
+ZONE_FIELDS = ("Room_actual_temp", "Room_setpoint_temp", "Room_status", "Room_speed")
+
+
+def load_records(paths):
+    """Return the recorded lines from diagnostics files or raw segments, in order."""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            if path.endswith(".jsonl"):
+                records.extend(json.loads(line) for line in file if line.strip())
+                continue
+            document = json.load(file)
+        data = document.get("data", document)
+        snapshots = data.get("snapshots")
+        if not snapshots:
+            sys.exit(f"{path}: no 'snapshots' section (snapshot recording disabled?)")
+        records.extend(snapshots["records"])
+    return records
+
+
+def apply_record(state, record):
+    """Apply one line (full snapshot or delta) to the replayed state."""
+    if "full" in record:
+        return {kind: {item_id: dict(item) for item_id, item in items.items()}
+                for kind, items in record["full"].items()}
+    if state is None:
+        return None  # deltas before the first full snapshot cannot be applied
+    for kind, items in record.get("set", {}).items():
+        for item_id, fields in items.items():
+            state.setdefault(kind, {}).setdefault(item_id, {}).update(fields)
+    for kind, item_ids in record.get("del", {}).items():
+        for item_id in item_ids:
+            state.get(kind, {}).pop(item_id, None)
+    return state
+
+
+def zone_matches(zone_id, zone, selector):
+    """Return True if a zone matches --zone (id or case-insensitive name)."""
+    if selector is None:
+        return True
+    return selector == zone_id or selector.lower() == str(zone.get("Room_Name", "")).lower()
+
+
+def describe_changes(previous, state, record, selector):
+    """Yield human readable lines for the changes of one record."""
+    if "full" in record:
+        for zone_id, zone in sorted(state.get("sensors", {}).items()):
+            if zone_matches(zone_id, zone, selector):
+                values = ", ".join(f"{field}={zone.get(field)}" for field in ZONE_FIELDS)
+                yield f"  [full] {zone.get('Room_Name', zone_id)}: {values}"
+        return
+    for kind, items in record.get("set", {}).items():
+        for item_id, fields in items.items():
+            item = state.get(kind, {}).get(item_id, {})
+            if kind == "sensors" and not zone_matches(item_id, item, selector):
+                continue
+            name = item.get("Room_Name") or item.get("Project_Name") or item_id
+            old = (previous or {}).get(kind, {}).get(item_id, {})
+            for field, value in fields.items():
+                yield f"  {name}.{field}: {old.get(field)!r} -> {value!r}"
+    for kind, item_ids in record.get("del", {}).items():
+        for item_id in item_ids:
+            yield f"  {kind} {item_id} removed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", help="diagnostics .json or snapshot .jsonl segments (oldest first)")
+    parser.add_argument("--zone", help="only this zone (Room_id or name)")
+    parser.add_argument("--csv", action="store_true", help="print the zone state after every poll as CSV")
+    args = parser.parse_args()
+
+    records = load_records(args.files)
+    writer = None
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(("timestamp", "room_id", "room_name") + ZONE_FIELDS)
+
+    state = None
+    unchanged = 0
+    for record in records:
+        previous = {kind: {i: dict(item) for i, item in items.items()} for kind, items in state.items()} if state else None
+        state = apply_record(state, record)
+        if state is None:
+            continue
+        when = datetime.fromtimestamp(record["t"]).isoformat(sep=" ", timespec="seconds")
+
+        if writer is not None:
+            for zone_id, zone in sorted(state.get("sensors", {}).items()):
+                if zone_matches(zone_id, zone, args.zone):
+                    writer.writerow((when, zone_id, zone.get("Room_Name")) + tuple(zone.get(f) for f in ZONE_FIELDS))
+            continue
+
+        lines = list(describe_changes(previous, state, record, args.zone))
+        if not lines:
+            unchanged += 1
+            continue
+        print(when)
+        print("\n".join(lines))
+
+    if writer is None:
+        print(f"{len(records)} records replayed, {unchanged} without changes")
+
+
+if __name__ == "__main__":
+    main()